@@ -0,0 +1,98 @@
+"""Detecção de aberrações do VigiLeish: linhas de base móveis e sinais EARS/CUSUM.
+
+Todas as séries (indicadores anuais e casos por regional) são alinhadas numa
+matriz séries x anos e processadas de uma vez com NumPy, na carga dos dados.
+Cada ano é comparado só com os anos anteriores a ele: o ano avaliado nunca
+entra na própria linha de base.
+"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# --- 1. PARÂMETROS ---
+JANELA = 7          # anos anteriores na linha de base (como o EARS C1/C2)
+MIN_BASE = 3        # com menos anos válidos a linha de base é expansiva até chegar aqui; antes, sem alerta
+LIMIAR_Z = 2.0      # média + 2 DP da linha de base
+DP_MINIMO = 1.0     # evita alerta por qualquer variação quando a base é constante (ex.: zeros)
+CUSUM_K = 0.5       # folga por ano, em desvios padrão
+CUSUM_H = 3.0       # soma acumulada que dispara o alerta (aumento persistente)
+
+INDICADORES = ('Casos', 'Letalidade', 'Taxa_Positividade')
+
+
+# --- 2. MOTOR VETORIZADO ---
+def detectar(matriz):
+    """Recebe séries x anos (NaN = sem dado) e devolve Z, limiar, CUSUM e alerta, todos no mesmo formato."""
+    x = np.asarray(matriz, dtype='float64')
+    n_series, n_anos = x.shape
+
+    # Janela dos JANELA anos anteriores a cada ano: preenche com NaN à esquerda
+    # e descarta a última janela, que incluiria o próprio ano
+    preenchido = np.concatenate([np.full((n_series, JANELA), np.nan), x], axis=1)
+    janelas = sliding_window_view(preenchido, JANELA, axis=1)[:, :n_anos]
+
+    validos = ~np.isnan(janelas)
+    n = validos.sum(axis=2)
+    soma = np.where(validos, janelas, 0).sum(axis=2)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media = soma / n
+        desvios = np.where(validos, janelas - media[..., None], 0)
+        dp = np.sqrt((desvios ** 2).sum(axis=2) / (n - 1))
+    dp = np.maximum(np.nan_to_num(dp), DP_MINIMO)
+
+    base_ok = n >= MIN_BASE
+    media = np.where(base_ok, media, np.nan)
+    z = (x - media) / dp
+    limiar = media + LIMIAR_Z * dp
+
+    # CUSUM unilateral sobre os Z: acumula anos seguidos acima do esperado e
+    # recomeça do zero depois de cada sinal. O laço é só nos anos; cada passo
+    # trata todas as séries de uma vez.
+    cusum = np.zeros_like(x)
+    acumulado = np.zeros(n_series)
+    for t in range(n_anos):
+        acumulado = np.maximum(0, acumulado + np.nan_to_num(z[:, t] - CUSUM_K))
+        cusum[:, t] = acumulado
+        acumulado[acumulado > CUSUM_H] = 0
+    cusum[~base_ok] = np.nan
+
+    alerta = (np.nan_to_num(z) > LIMIAR_Z) | (np.nan_to_num(cusum) > CUSUM_H)
+    return {'z': z, 'limiar': limiar, 'cusum': cusum, 'alerta': alerta}
+
+
+# --- 3. APLICAÇÃO ÀS TABELAS ---
+def calcular(df_anual, df_m):
+    """Acrescenta Z/Limiar/Alerta de cada indicador à tabela anual e Z/Limiar/Alerta a cada (ano, regional).
+
+    Indicadores anuais e regionais vão para a mesma matriz (alinhados pelo ano)
+    e passam por uma única chamada de detectar().
+    """
+    # Eixo de anos comum; a seção regional normalmente cobre só parte da série
+    anos = df_anual.index if df_m.empty else df_anual.index.union(df_m.index.unique('Ano'))
+    indicadores = [c for c in INDICADORES if c in df_anual.columns]
+    anual = df_anual[indicadores].reindex(anos).to_numpy(dtype='float64', na_value=np.nan).T
+
+    if not df_m.empty:
+        casos = df_m['Casos'].unstack('Ano').reindex(columns=anos)
+        regional = casos.to_numpy(dtype='float64', na_value=np.nan)
+    else:
+        casos, regional = None, np.empty((0, len(anos)))
+
+    resultado = detectar(np.vstack([anual, regional]))
+
+    posicoes = anos.get_indexer(df_anual.index)
+    for i, nome in enumerate(indicadores):
+        df_anual[f'Z_{nome}'] = resultado['z'][i, posicoes].astype('float32')
+        df_anual[f'Limiar_{nome}'] = resultado['limiar'][i, posicoes].astype('float32')
+        df_anual[f'Alerta_{nome}'] = resultado['alerta'][i, posicoes]
+
+    if casos is None:
+        return df_anual, df_m
+
+    # Volta ao formato longo por posição: linha da regional x coluna do ano
+    linhas = casos.index.get_indexer(df_m.index.get_level_values('Regional'))
+    colunas = anos.get_indexer(df_m.index.get_level_values('Ano'))
+    inicio = len(indicadores)
+    df_m['Z'] = resultado['z'][inicio + linhas, colunas].astype('float32')
+    df_m['Limiar'] = resultado['limiar'][inicio + linhas, colunas].astype('float32')
+    df_m['Alerta'] = resultado['alerta'][inicio + linhas, colunas]
+    return df_anual, df_m
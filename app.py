@@ -1,12 +1,16 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 from datetime import datetime
 import logging
+import uuid
 import streamlit.components.v1 as components 
-import numpy as np 
+
+import aquecimento
+import dados
+import figuras
+import paginas
+import rastreio
+from paginas import guardar_diagnostico, rerun_de_fragmento
 
 # --- 0. CONFIGURAÇÃO DE LOGGING ---
 logging.basicConfig(level=logging.ERROR)
@@ -14,12 +18,47 @@ logging.basicConfig(level=logging.ERROR)
 # --- 1. CONFIGURAÇÃO DA PÁGINA ---
 st.set_page_config(page_title="VigiLeish Dashboard", layout="wide", page_icon=None)
 
-# --- 2. LOGO E SIDEBAR ---
+# --- 1.1 RASTREIO ---
+# Cada execução vira um rerun no rastreio (ver rastreio.py), marcado com a sessão
+if 'sessao_id' not in st.session_state:
+    st.session_state.sessao_id = uuid.uuid4().hex[:8]
+rastreio.iniciar_rerun("app", sessao=st.session_state.sessao_id)
+
+# --- 2. MUNICÍPIOS ---
+# Armazém único do processo: lê só o catálogo na partida e carrega cada município
+# (partição em municipios/<código>/) no primeiro acesso, mantendo os mais usados.
+# O vigia relê em segundo plano só as fontes cujo CSV mudou e troca o conjunto
+# do município; cada sessão passa a ver os dados novos no rerun seguinte, inclusive
+# nos que só refazem o painel (ver seção 7).
+# Com `streamlit run app.py` o aquecimento começa aqui; pelo servidor.py ele já
+# está rodando desde a partida e a chamada não faz nada.
+@st.cache_resource
+def armazem():
+    armazem = dados.armazem_do_processo()
+    aquecimento.iniciar(armazem)
+    return armazem
+
+catalogo = armazem().catalogo()
+
+if 'municipio' not in st.session_state or st.session_state.municipio not in catalogo.index:
+    st.session_state.municipio = dados.MUNICIPIO_PADRAO if dados.MUNICIPIO_PADRAO in catalogo.index else catalogo.index[0]
+
+# --- 3. LOGO E SIDEBAR ---
 with st.sidebar:
     st.image("dog.png", width=120) 
     
     st.markdown("### Preferências")
     
+    st.markdown("#### Município")
+    st.selectbox(
+        "Município:",
+        options=catalogo.index.tolist(),
+        format_func=lambda codigo: f"{catalogo.at[codigo, 'Municipio']} ({catalogo.at[codigo, 'UF']})",
+        key="municipio",
+        label_visibility="collapsed"
+    )
+    municipio = catalogo.loc[st.session_state.municipio]
+
     # --- CONTROLE DE ACESSIBILIDADE ---
     st.markdown("#### Acessibilidade")
     tamanho_fonte = st.radio(
@@ -39,18 +78,29 @@ with st.sidebar:
         css_root = "100%" 
         plotly_font = 14
 
+    # --- NAVEGAÇÃO POR ANO ---
+    # Com a opção ligada, o Painel Geral e o Mapa recebem todos os anos de uma
+    # vez e o ano é trocado no próprio navegador, sem voltar ao servidor
+    st.markdown("#### Navegação por Ano")
+    st.toggle("Trocar o ano no navegador", key="ano_no_navegador",
+              help="Indicadores e mapa de todos os anos são enviados de uma vez; a troca de ano fica instantânea.")
+
+    # --- DIAGNÓSTICO (opcional) ---
+    st.markdown("#### Diagnóstico")
+    st.toggle("Mostrar tempos de execução", key="diagnostico")
+
     st.markdown("---")
     
     # CRÉDITOS
-    st.link_button("Informações Oficiais (PBH)", "https://prefeitura.pbh.gov.br/saude/leishmaniose-visceral-canina", use_container_width=True)
+    st.link_button(f"Informações Oficiais ({municipio['Orgao']})", municipio['Link'], use_container_width=True)
     st.markdown("---")
     st.caption(f"Atualização: {datetime.now().strftime('%d/%m/%Y')}")
     st.caption("O painel apresenta análise descritiva dos dados oficiais públicos, sem inferência causal, utilizando estatística básica e visualização interativa para apoio à vigilância epidemiológica.")
-    st.caption("Fonte: DIZO/SUPVISA/SMSA/PBH")
+    st.caption(f"Fonte: {municipio['Fonte']}")
     st.caption("Atividades Extensionistas II - Tecnologia Aplicada à Inclusão Digital - Projeto - UNINTER")
     st.caption("Analista: Aline Alice Ferreira da Silva | RU: 5277514")
 
-# --- 3. CSS DINÂMICO ---
+# --- 4. CSS DINÂMICO ---
 st.markdown(f"""
     <style>
     @import url('https://fonts.googleapis.com/css2?family=Lora:ital,wght@0,400;0,700;1,400&display=swap');
@@ -110,84 +160,32 @@ st.markdown(f"""
     </style>
     """, unsafe_allow_html=True)
 
-# --- 4. CARREGAMENTO DE DADOS ---
-@st.cache_data
-def load_data():
-    try:
-        # A. HUMANOS
-        df_h_raw = pd.read_csv('dados_novos.csv', skiprows=1, nrows=60, encoding='iso-8859-1', sep=None, engine='python')
-        df_h_raw = df_h_raw.iloc[:, :7]
-        df_h_raw.columns = ['Ano', 'Casos', 'Pop', 'Inc', 'Prev', 'Obitos', 'Letalidade']
-        df_h_raw['Ano'] = pd.to_numeric(df_h_raw['Ano'], errors='coerce')
-        df_h_raw = df_h_raw.dropna(subset=['Ano'])
-        df_h_raw['Ano'] = df_h_raw['Ano'].astype(int)
-        
-        media_let = df_h_raw['Letalidade'].mean()
-        dp_let = df_h_raw['Letalidade'].std()
-        limiar_letalidade = media_let + (2 * dp_let)
-
-        # B. REGIONAIS
-        df_reg_raw = pd.read_csv('dados_novos.csv', skiprows=39, nrows=11, encoding='iso-8859-1', sep=None, engine='python')
-        coords = {
-            'Barreiro': [-19.974, -44.022], 'Centro Sul': [-19.933, -43.935], 'Leste': [-19.921, -43.902],
-            'Nordeste': [-19.892, -43.911], 'Noroeste': [-19.914, -43.962], 'Norte': [-19.831, -43.918],
-            'Oeste': [-19.952, -43.984], 'Pampulha': [-19.855, -43.971], 'Venda Nova': [-19.812, -43.955]
-        }
-        regionais_lista = []
-        for index, row in df_reg_raw.iterrows():
-            reg_nome = str(row.iloc[0]).strip()
-            if reg_nome in coords:
-                for i in range(1, len(row)): 
-                    try:
-                        ano = 2006 + i 
-                        val = row.iloc[i]
-                        val_num = pd.to_numeric(val, errors='coerce')
-                        if pd.isna(val_num): val_num = 0
-                        regionais_lista.append({
-                            'Regional': reg_nome, 'Ano': int(ano),
-                            'Casos': val_num,
-                            'Lat': coords[reg_nome][0], 'Lon': coords[reg_nome][1]
-                        })
-                    except: continue
-        df_mapa = pd.DataFrame(regionais_lista)
-
-        # C. CÃES
-        df_c_raw = pd.read_csv('caninos_novos.csv', sep=';', encoding='iso-8859-1', dtype=str)
-        df_c_raw.columns = ['Ano', 'Sorologias', 'Positivos', 'Eutanasiados']
-        for col in df_c_raw.columns:
-            df_c_raw[col] = df_c_raw[col].str.strip().str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
-            df_c_raw[col] = pd.to_numeric(df_c_raw[col], errors='coerce').fillna(0)
-        df_c_raw['Ano'] = df_c_raw['Ano'].astype(int)
-        df_c_clean = df_c_raw.copy()
-        df_c_clean['Taxa_Positividade'] = np.where(df_c_clean['Sorologias'] > 0, (df_c_clean['Positivos'] / df_c_clean['Sorologias'] * 100), 0)
-
-        # D. VETOR
-        df_v_raw = pd.read_csv('vetor.csv', sep=';', encoding='iso-8859-1', dtype=str)
-        df_v_raw = df_v_raw.iloc[:, :2]
-        df_v_raw.columns = ['Ano', 'Borrifados']
-        for col in df_v_raw.columns:
-            df_v_raw[col] = df_v_raw[col].str.strip().str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
-            df_v_raw[col] = pd.to_numeric(df_v_raw[col], errors='coerce').fillna(0)
-        df_v_raw['Ano'] = df_v_raw['Ano'].astype(int)
-        df_v_clean = df_v_raw.copy()
-
-        min_ano_encontrado = int(df_h_raw['Ano'].min())
-        min_ano_global = min(1994, min_ano_encontrado)
-        max_ano_global = int(df_h_raw['Ano'].max())
-
-        return df_h_raw, df_mapa, df_c_clean, df_v_clean, limiar_letalidade, min_ano_global, max_ano_global
-
-    except Exception as e:
-        logging.error(f"ERRO: {e}")
-        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame(), pd.DataFrame(), 10, 1994, 2025
-
-df_h, df_m, df_c, df_v, limiar_stat, min_ano, max_ano = load_data()
-
-# --- 5. CABEÇALHO ---
+# --- 5. CARREGAMENTO DE DADOS ---
+# As tabelas limpas ficam compiladas em disco (ver dados.py), então um cold start
+# após redeploy só relê os CSVs que mudaram. Os dados do conjunto carregado são
+# compartilhados pelo armazém e somente leitura: cada rerun recebe só uma cópia
+# rasa das tabelas (dados.Conjunto.para_sessao), sem o unpickle que st.cache_data
+# fazia a cada rerun.
+def load_data(codigo):
+    with rastreio.span("carga", municipio=codigo):
+        try:
+            return armazem().obter(codigo).para_sessao()
+
+        except Exception as e:
+            # O painel abre vazio, mas o traceback vai para o log e o erro para o rastreio
+            logging.exception(f"Falha ao carregar o município {codigo}")
+            rastreio.anotar(erro=type(e).__name__)
+            return dados.Conjunto.vazio()
+
+# O conjunto é obtido dentro do painel (seção 7), que também roda sozinho como
+# fragmento: assim a navegação e a troca de ano já usam o conjunto que o vigia
+# tiver trocado, sem esperar uma execução completa do script.
+
+# --- 6. CABEÇALHO ---
 st.markdown(f"""
     <div class="header-container">
         <h1 class="header-title">VigiLeish: Painel de Monitoramento</h1>
-        <p class="header-subtitle">Vigilância Epidemiológica de Leishmaniose Visceral em Belo Horizonte</p>
+        <p class="header-subtitle">Vigilância Epidemiológica de Leishmaniose Visceral em {municipio['Municipio']}</p>
     </div>
     """, unsafe_allow_html=True)
 
@@ -200,373 +198,149 @@ if 'segment' not in st.session_state:
     st.session_state.segment = "Geral"
 
 # 2. Ano Selecionado (Persistência)
-# Garante que 'ano_selecionado' exista no session_state
-if 'ano_selecionado' not in st.session_state:
-    if not df_h.empty:
-        # Define o ano mais recente como padrão inicial
-        st.session_state.ano_selecionado = int(df_h['Ano'].max())
-    else:
-        st.session_state.ano_selecionado = 2025
+# Garante que 'ano_selecionado' exista no session_state (e seja válido para o
+# município atual, que pode ter sido trocado na sidebar)
+def garantir_ano(df_anual):
+    if 'ano_selecionado' not in st.session_state or st.session_state.ano_selecionado not in df_anual.index:
+        if not df_anual.empty:
+            # Define o ano mais recente como padrão inicial
+            st.session_state.ano_selecionado = int(df_anual.index.max())
+        else:
+            st.session_state.ano_selecionado = 2025
+
+rastreio.marcar(municipio=st.session_state.municipio, segmento=st.session_state.segment)
 
 # ---------------------------------------------------------------------
 # BARRA DE NAVEGAÇÃO E FILTRO
 # ---------------------------------------------------------------------
+# Os cliques só atualizam o estado, em callbacks que rodam antes do rerun.
+# Assim não é preciso chamar st.rerun(), que fazia cada interação executar
+# o script duas vezes.
 def get_btn_type(btn_name):
     return "primary" if st.session_state.segment == btn_name else "secondary"
 
-c1, c2, c3, c4, c_ano = st.columns([1, 1, 1, 1, 1.5])
-
-with c1:
-    if st.button("Painel Geral", type=get_btn_type("Geral"), use_container_width=True):
-        st.session_state.segment = "Geral"
-        st.rerun()
-with c2:
-    if st.button("Mapa", type=get_btn_type("Mapa"), use_container_width=True):
-        st.session_state.segment = "Mapa"
-        st.rerun()
-with c3:
-    if st.button("Cães", type=get_btn_type("Canina"), use_container_width=True):
-        st.session_state.segment = "Canina"
-        st.rerun()
-with c4:
-    if st.button("Histórico", type=get_btn_type("Historico"), use_container_width=True):
-        st.session_state.segment = "Historico"
-        st.rerun()
-
-with c_ano:
-    if not df_h.empty:
-        lista_anos = sorted(df_h['Ano'].unique().tolist(), reverse=True)
-        
-        try:
-            indice_atual = lista_anos.index(st.session_state.ano_selecionado)
-        except ValueError:
-            indice_atual = 0 # Se der erro (ano não existe), pega o primeiro
-         
-        sel = st.selectbox(
-            "Selecione o Ano:", 
-            options=lista_anos, 
-            index=indice_atual, # Força o valor visual a ser o que está na memória
-            key="ano_widget",   # Nome interno do widget
-            label_visibility="collapsed"
-        )
-        
-        if sel != st.session_state.ano_selecionado:
-            st.session_state.ano_selecionado = sel
-            st.rerun() # Recarrega para aplicar o filtro
+def ir_para(segmento):
+    st.session_state.segment = segmento
+    st.session_state.navegacoes = st.session_state.get('navegacoes', 0) + 1
+
+def ao_mudar_ano():
+    st.session_state.ano_selecionado = st.session_state.ano_widget
+
+def barra_navegacao(df_anual):
+    c1, c2, c3, c4, c_ano = st.columns([1, 1, 1, 1, 1.5])
+
+    with c1:
+        st.button("Painel Geral", type=get_btn_type("Geral"), use_container_width=True, on_click=ir_para, args=("Geral",))
+    with c2:
+        st.button("Mapa", type=get_btn_type("Mapa"), use_container_width=True, on_click=ir_para, args=("Mapa",))
+    with c3:
+        st.button("Cães", type=get_btn_type("Canina"), use_container_width=True, on_click=ir_para, args=("Canina",))
+    with c4:
+        st.button("Histórico", type=get_btn_type("Historico"), use_container_width=True, on_click=ir_para, args=("Historico",))
+
+    with c_ano:
+        if st.session_state.get('ano_no_navegador'):
+            st.caption("Ano: use o controle dentro do painel ou do mapa.")
+        elif not df_anual.empty:
+            lista_anos = df_anual.index[::-1].tolist()
             
-    else:
-        st.session_state.ano_selecionado = 2025
-
-ano_sel = st.session_state.ano_selecionado
+            try:
+                indice_atual = lista_anos.index(st.session_state.ano_selecionado)
+            except ValueError:
+                indice_atual = 0 # Se der erro (ano não existe), pega o primeiro
+             
+            st.selectbox(
+                "Selecione o Ano:", 
+                options=lista_anos, 
+                index=indice_atual, # Força o valor visual a ser o que está na memória
+                key="ano_widget",   # Nome interno do widget
+                on_change=ao_mudar_ano,
+                label_visibility="collapsed"
+            )
+                
+        else:
+            st.session_state.ano_selecionado = 2025
 
 # -----------------------------------------------------
 # FIX DE SCROLL
 # -----------------------------------------------------
-components.html(
-    f"""
-        <script>
-            window.parent.scrollTo(0, 0);
-            var main = window.parent.document.querySelector(".main");
-            if (main) {{ main.scrollTop = 0; }}
-        </script>
-        """,
-    height=0,
-    width=0
-)
-
-# --- 7. CONTEÚDO ---
-
-if st.session_state.segment == "Geral":
-    st.subheader(f"Visão Consolidada | {ano_sel}")
-
-    st.markdown("""
-    <div style="margin-bottom: 20px;">
-        Abaixo apresentamos um resumo rápido da situação da doença no ano selecionado, dividido por categorias:
-    </div>
-    """, unsafe_allow_html=True)
-    
-    dh = df_h[df_h['Ano']==ano_sel]
-    dc = df_c[df_c['Ano']==ano_sel]
-    dv = df_v[df_v['Ano']==ano_sel]
-    
-    # --- BLOCO 1: SAÚDE HUMANA ---
-    st.markdown("##### 1. Indicadores Humanos")
-    st.markdown(f"""
-    <div class="info-box">
-        <ul>
-            <li><strong>Casos Humanos:</strong> Quantas pessoas foram diagnosticadas com leishmaniose no ano selecionado.</li>
-            <li><strong>Óbitos:</strong> Número de pessoas que faleceram em decorrência da doença.</li>
-            <li><strong>Letalidade (%):</strong> Indica a gravidade dos casos. Se este número aumenta, significa que a doença está sendo mais fatal. <br><i><b>Nota:</b> Valores acima de {limiar_stat:.1f}% aparecem com alerta em laranja (Cálculo estatístico: Média + 2 Desvios Padrão).</i></li>
-        </ul>
-    </div>
-    """, unsafe_allow_html=True)
-
-    col1, col2, col3 = st.columns(3)
-    if not dh.empty:
-        col1.metric("Casos Humanos", f"{int(dh['Casos'].iloc[0])}")
-        col2.metric("Óbitos", f"{int(dh['Obitos'].iloc[0])}")
-        
-        letalidade = dh['Letalidade'].iloc[0]
-        if letalidade >= limiar_stat:
-            cor_borda = "#C2410C" 
-            icone = "ALTA"
-            cor_texto = "#C2410C"
-        else:
-            cor_borda = "#1e293b"
-            icone = "Estável"
-            cor_texto = "#1e293b"
-
-        col3.markdown(f"""
-            <div style="background-color: #ffffff; padding: 15px; border-radius: 8px; border: 1px solid #e2e8f0; border-left: 6px solid {cor_borda};">
-                <p style="color: #64748b; font-size: 0.9rem; margin-bottom: 5px; font-family: 'Lora', serif;">Letalidade</p>
-                <div style="display: flex; align-items: center; gap: 10px;">
-                    <p style="color: {cor_texto}; font-size: 1.8rem; font-weight: 700; margin: 0; font-family: 'Lora', serif;">{letalidade:.1f}%</p>
-                    <span style="font-size: 0.9rem; font-weight: bold; color: {cor_texto}; background: #fff3e0; padding: 2px 6px; border-radius: 4px;">{icone}</span>
-                </div>
-            </div>
-        """, unsafe_allow_html=True)
-    else:
-        col1.metric("Casos Humanos", "0"); col2.metric("Óbitos", "0"); col3.metric("Letalidade", "0%")
-
-    st.markdown("---")
-
-    # --- BLOCO 2: RESERVATÓRIO CANINO ---
-    st.markdown("##### 2. Vigilância Canina")
-    st.markdown("""
-    <div class="info-box">
-        <ul>
-            <li><strong>Cães Positivos:</strong> Quantidade de animais que fizeram o exame e tiveram a doença confirmada.</li>
-            <li><strong>Eutanásias:</strong> Medida de saúde pública recomendada para interromper o ciclo de transmissão da doença (cão infectado → mosquito → humano).</li>
-            <li><strong>Taxa de Positividade (%):</strong> Proporção de cães doentes entre todos os que foram testados no ano. Funciona como um "termômetro". Se essa taxa sobe, é um sinal de que a leishmaniose está circulando com mais intensidade entre os animais.</li>
-        </ul>
-    </div>
-    """, unsafe_allow_html=True)
-
-    col4, col5, col6 = st.columns(3)
-    if not dc.empty:
-        col4.metric("Cães Positivos", f"{int(dc['Positivos'].iloc[0]):,}".replace(',', '.'))
-        col5.metric("Eutanásias", f"{int(dc['Eutanasiados'].iloc[0]):,}".replace(',', '.'))
-        col6.metric("Taxa Positividade", f"{dc['Taxa_Positividade'].iloc[0]:.1f}%")
-    else:
-        col4.metric("Cães Positivos", "0"); col5.metric("Eutanásias", "0"); col6.metric("Taxa Positividade", "0.0%")
-
-    st.markdown("---")
-
-    # --- BLOCO 3: AÇÕES DE CONTROLE ---
-    st.markdown("##### 3. Ações de Controle e Testes")
-    st.markdown("""
-    <div class="info-box">
-        <ul>
-            <li><strong>Total Sorologias (Testes):</strong> Representa o esforço da vigilância em testar a população canina para identificar os animais infectados.</li>
-            <li><strong>Imóveis Borrifados:</strong> <b>Controle Vetorial</b>, ou seja, quantas casas receberam aplicação de inseticida (o famoso "fumacê" ou borrifação residual) para eliminar o mosquito palha transmissor da doença (vetor).</li>
-        </ul>
-    </div>
-    """, unsafe_allow_html=True)
-
-    col7, col8 = st.columns(2)
-    if not dc.empty:
-        col7.metric("Total Sorologias (Testes)", f"{int(dc['Sorologias'].iloc[0]):,}".replace(',', '.'))
-    else: col7.metric("Total Sorologias", "0")
-
-    if not dv.empty:
-        col8.metric("Imóveis Borrifados", f"{int(dv['Borrifados'].iloc[0]):,}".replace(',', '.'))
-    else: col8.metric("Imóveis Borrifados", "0")
-
-elif st.session_state.segment == "Canina":
-    st.subheader("Vigilância Canina e Controle Vetorial")
-
-    # --- PARTE 1: BARRAS ---
-    st.markdown("""
-    <div class="info-box">
-        <span class="info-title">Por que monitoramos os cães?</span>
-        Em áreas urbanas, o cão é a principal fonte de infecção. O mosquito pica o cão doente e depois transmite, através da picada, para o ser humano.
-        <br><br>
-        <b>Guia visual do gráfico:</b>
-        <ul>
-            <li><span style='color:#C2410C; font-weight:bold;'>■ Barras Laranjas:</span> <strong>Cães Positivos: </strong> Número de animais que foram confirmados com a doença.</li>
-            <li><span style='color:#5D3A9B; font-weight:bold;'>■ Barras Roxas:</span> <strong>Eutanásias:</strong> Medida de saúde pública para controle de reservatório. <br><i>(<b>Nota:</b> Embora controversa, é a medida técnica oficial vigente para interrupção do ciclo de transmissão em massa).</i>
-        </ul>
-    </div>
-    """, unsafe_allow_html=True)
-
-    fig_bar = go.Figure()
-    fig_bar.add_trace(go.Bar(x=df_c['Ano'], y=df_c['Positivos'], name="Cães Positivos", marker_color='#C2410C'))
-    fig_bar.add_trace(go.Bar(x=df_c['Ano'], y=df_c['Eutanasiados'], name="Eutanásias", marker_color='#5D3A9B'))
-    
-    fig_bar.update_layout(height=400, plot_bgcolor='white', font_family="Lora", barmode='group',
-                          font=dict(size=plotly_font),
-                          title="Casos Positivos e Eutanásias em Cães",
-                          legend=dict(orientation="h", y=1.15, x=0.5, xanchor="center"))
-    
-    fig_bar.update_yaxes(tickformat=".,d", gridcolor='#f1f5f9', title_text="Qtd. Animais")
-    fig_bar.update_xaxes(dtick=1, range=[min_ano-0.5, max_ano+0.5], title_text="Ano")
-    st.plotly_chart(fig_bar, use_container_width=True)
-
-    st.markdown("---")
-
-    # --- PARTE 2: LINHA ---
-    st.markdown("""
-    <div class="info-box">
-        <span class="info-title">Monitoramento de Testes</span>
-        <ul>
-            <li><span style='color:#117733; font-weight:bold;'>● Linha Verde:</span> <strong>Total de Testes</strong> Mostra o volume de trabalho da vigilância epidemiológica na busca por animais infectados. Quanto maior o número de testes, maior a capacidade de identificar e controlar a doença.</li>
-        </ul>
-    </div>
-    """, unsafe_allow_html=True)
-
-    fig_line = go.Figure()
-    fig_line.add_trace(go.Scatter(x=df_c['Ano'], y=df_c['Sorologias'], name="Total de Testes", mode='lines+markers', line=dict(color='#117733', width=3)))
-    
-    fig_line.update_layout(height=400, plot_bgcolor='white', font_family="Lora",
-                           font=dict(size=plotly_font),
-                           title="Total de Sorologias (Testes) Realizados",
-                           legend=dict(orientation="h", y=1.1, x=0.5, xanchor="center"))
-    
-    fig_line.update_yaxes(tickformat=".,d", gridcolor='#f1f5f9', title_text="Total Testes")
-    fig_line.update_xaxes(dtick=1, range=[min_ano-0.5, max_ano+0.5], title_text="Ano")
-    st.plotly_chart(fig_line, use_container_width=True)
-    
-    st.markdown("---")
-    
-    # --- PARTE 3: BORRIFAÇÃO ---
-    st.subheader("Controle Químico (Imóveis Borrifados)")
-    
-    st.markdown("""
-    <div class="info-box">
-        O gráfico abaixo mostra a evolução do <b>Controle Vetorial</b> (visitas para aplicação de inseticida).
-    </div>
-    """, unsafe_allow_html=True)
-
-    fig_v = px.line(df_v, x='Ano', y='Borrifados', markers=True, color_discrete_sequence=['#374151'])
-    fig_v.update_layout(plot_bgcolor='white', font_family="Lora", yaxis_title="Qtd. Imóveis",
-                        font=dict(size=plotly_font),
-                        legend=dict(orientation="h", y=1.1, x=0.5))
-    fig_v.update_yaxes(tickformat=".,d") 
-    fig_v.update_xaxes(dtick=1, range=[min_ano, max_ano])
-    st.plotly_chart(fig_v, use_container_width=True)
-
-elif st.session_state.segment == "Mapa":
-    st.subheader(f"Distribuição Geográfica | {ano_sel}")
-
-    st.markdown("""
-    <div class="info-box">
-        <span class="info-title">Como ler este mapa?</span>
-        <ul>
-            <li style="margin-bottom: 8px;">
-                <span style='background-color: #FDE725; padding: 2px 6px; color: black; border-radius: 4px; font-weight: bold;'>Amarelo / Claro / Círculos menores:</span>
-                Regiões com <b>menos casos</b>.
-            </li>
-            <li>
-                <span style='background-color: #440154; padding: 2px 6px; color: white; border-radius: 4px; font-weight: bold;'>Roxo / Escuro / Círculos maiores:</span>
-                Regiões com <b>maior concentração de casos</b> (Alerta).
-            </li>
-        </ul>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    df_f = df_m[df_m['Ano'] == ano_sel]
-    if not df_f.empty:
-        fig = px.scatter_mapbox(df_f, lat="Lat", lon="Lon", size="Casos", color="Casos", zoom=10, 
-                                mapbox_style="carto-positron", 
-                                color_continuous_scale="Viridis_r",
-                                hover_name="Regional",
-                                hover_data={"Lat": False, "Lon": False, "Casos": True}) 
-        fig.update_layout(margin={"r":0,"t":0,"l":0,"b":0}, height=500, font=dict(size=plotly_font))
-        st.plotly_chart(fig, use_container_width=True)
-    else:
-        st.info("Sem dados regionais para o ano selecionado.")
-
-    st.markdown("---")
-    
-    st.subheader("Histórico por Regional")
-
-    st.markdown("""
-    <div class="info-box">
-        <span class="info-title">História da Regional</span>
-        Este gráfico permite analisar o passado. Selecione uma regional na lista abaixo para ver se o número de casos aumentou ou diminuiu naquela área específica ao longo dos anos.
-        <ul>
-            <li><span style='color:#117733; font-weight:bold;'>● Linha Verde:</span> Mostra a variação dos casos confirmados.</li>
-        </ul>
-    </div>
-    """, unsafe_allow_html=True)
-
-    if not df_m.empty:
-        c_reg, c_slider = st.columns([1, 2])
-        lista_regionais = sorted(df_m['Regional'].unique().tolist())
-        min_ano_regional = 2007
-        
-        with c_reg:
-            reg_sel = st.selectbox("Selecione a Regional:", options=lista_regionais)
-        
-        with c_slider:
-            intervalo_anos = st.slider(
-                "Filtrar Período (Anos):",
-                min_value=min_ano_regional,
-                max_value=max_ano,
-                value=(min_ano_regional, max_ano)
-            )
-        
-        df_reg_hist = df_m[
-            (df_m['Regional'] == reg_sel) & 
-            (df_m['Ano'] >= intervalo_anos[0]) & 
-            (df_m['Ano'] <= intervalo_anos[1])
-        ].sort_values('Ano')
-        
-        fig_hist_reg = px.line(df_reg_hist, x='Ano', y='Casos', markers=True,
-                               title=f"Evolução dos Casos Humanos: {reg_sel} ({intervalo_anos[0]}-{intervalo_anos[1]})",
-                               color_discrete_sequence=['#117733']) 
-        fig_hist_reg.update_layout(plot_bgcolor='white', font_family="Lora", font=dict(size=plotly_font))
-        fig_hist_reg.update_xaxes(dtick=1, range=[intervalo_anos[0]-0.5, intervalo_anos[1]+0.5]) 
-        st.plotly_chart(fig_hist_reg, use_container_width=True)
-
-elif st.session_state.segment == "Historico":
-    st.subheader("Análise de Tendência: Humanos vs Caninos")
-
-    st.markdown("""
-    <div class="info-box">
-        <span class="info-title">Correlação Histórica</span>
-        Acompanhe a relação entre as populações ao longo das décadas.
-        <ul>
-            <li><span style='color:#C2410C; font-weight:bold;'>● Linha Laranja (Eixo Esquerdo):</span> <strong>Cães Positivos</strong>.</li>
-            <li><span style='color:#5D3A9B; font-weight:bold;'>● Linha Roxa (Eixo Direito):</span> <strong>Casos Humanos</strong>.</li>
-        </ul>
-        Este gráfico permite visualizar a conexão ao longo do tempo. Geralmente, um aumento no número de cães infectados
-        pode preceder ou acompanhar o aumento de casos em humanos. O controle da doença nos animais é essencial para proteger as pessoas.
-    </div>
-    """, unsafe_allow_html=True)
-    
-    df_merged = pd.merge(df_h[['Ano', 'Casos']], df_c[['Ano', 'Positivos']], on='Ano', how='outer').sort_values('Ano')
-    df_merged = df_merged[(df_merged['Ano'] >= min_ano) & (df_merged['Ano'] <= max_ano)]
-    
-    fig = make_subplots(specs=[[{"secondary_y": True}]])
-
-    fig.add_trace(
-        go.Scatter(
-            x=df_merged['Ano'], y=df_merged['Positivos'], name="Cães Positivos",
-            mode='lines+markers', line=dict(color='#C2410C', width=3), marker=dict(size=6)
-        ), secondary_y=False
-    )
-
-    fig.add_trace(
-        go.Scatter(
-            x=df_merged['Ano'], y=df_merged['Casos'], name="Casos Humanos",
-            mode='lines+markers', line=dict(color='#5D3A9B', width=3, dash='dot'), marker=dict(size=6)
-        ), secondary_y=True
+# O contador de navegações muda o conteúdo do iframe, forçando o script a rodar
+# de novo (e voltar ao topo) somente quando o usuário troca de segmento.
+def fix_scroll():
+    components.html(
+        f"""
+            <script>
+                // navegação {st.session_state.get('navegacoes', 0)}
+                window.parent.scrollTo(0, 0);
+                var main = window.parent.document.querySelector(".main");
+                if (main) {{ main.scrollTop = 0; }}
+            </script>
+            """,
+        height=0,
+        width=0
     )
 
-    fig.update_layout(
-        title="<b>Correlação: Humano vs Canino</b>",
-        font_family="Lora", plot_bgcolor='white', hovermode="x unified",
-        font=dict(size=plotly_font),
-        legend=dict(orientation="h", y=1.1, x=0.5, xanchor="center")
-    )
-    
-    fig.update_xaxes(title_text="Ano", dtick=1, range=[min_ano, max_ano], showgrid=False)
-    fig.update_yaxes(title_text="Cães Positivos", tickformat=".,d", secondary_y=False, showgrid=True, gridcolor='#f1f5f9')
-    fig.update_yaxes(title_text="Casos Humanos", tickformat=".,d", secondary_y=True, showgrid=False)
-
-    st.plotly_chart(fig, use_container_width=True)
-
-
-
-
+# --- 7. CONTEÚDO ---
+# Cada segmento é um módulo em paginas/, importado na primeira vez que é aberto
+# Só o painel (navegação + segmento ativo) re-executa quando o usuário clica ou
+# troca o ano; CSS, sidebar, cabeçalho e carregamento ficam fora do fragmento.
+# A troca de fonte na sidebar continua disparando a execução completa.
+@st.fragment
+def painel():
+    with rerun_de_fragmento():
+        # Lido a cada execução do painel: depois de uma recarga do vigia, o próximo
+        # clique já mostra os dados novos (o armazém devolve o conjunto da memória)
+        conjunto = load_data(st.session_state.municipio)
+        garantir_ano(conjunto.anual)
+        ctx = paginas.Contexto(conjunto, plotly_font, css_root, st.session_state.municipio)
+
+        barra_navegacao(conjunto.anual)
+        fix_scroll()
+
+        ano_sel = st.session_state.ano_selecionado
+        rastreio.marcar(segmento=st.session_state.segment, ano=ano_sel)
+        with rastreio.span("segmento"):
+            with rastreio.span("pagina.import", pagina=st.session_state.segment):
+                pagina = paginas.carregar(st.session_state.segment)
+            pagina.renderizar(ctx, ano_sel)
+
+painel()
+guardar_diagnostico(rastreio.finalizar_rerun())
+
+# --- 8. PAINEL DE DIAGNÓSTICO ---
+CAMPOS_FIXOS = ('span', 'nivel', 'ms', 'tipo', 'sessao', 'municipio', 'segmento', 'ano')
+
+# Opcional, na sidebar. Como a maioria das interações re-executa só o fragmento
+# do painel, a tabela se atualiza sozinha enquanto estiver ligada.
+@st.fragment(run_every="2s")
+def painel_diagnostico():
+    spans = st.session_state.get('diagnostico_ultimo', [])
+    if not spans:
+        return
+    total = spans[0]
+    st.caption(f"Último rerun ({total['tipo']}): {total['ms']:.0f} ms · sessão {total.get('sessao', '-')} · "
+               f"{total.get('segmento', '-')} · {total.get('ano', '-')}")
+    st.dataframe(pd.DataFrame([{
+        'Etapa': "\u00a0\u00a0" * s['nivel'] + s['span'],
+        'ms': s['ms'],
+        'Detalhes': ", ".join(f"{k}={v}" for k, v in s.items() if k not in CAMPOS_FIXOS),
+    } for s in spans[1:]]), hide_index=True, use_container_width=True)
+
+    historico = pd.DataFrame(st.session_state.get('diagnostico_historico', []))
+    st.caption("Últimos reruns")
+    st.dataframe(historico, hide_index=True, use_container_width=True)
+
+    cache = figuras.CACHE.estatisticas()
+    st.caption(f"Cache de figuras: {cache['itens']} itens, {cache['bytes'] / 1024 / 1024:.1f} MB, "
+               f"{cache['acertos']} acertos, {cache['falhas']} falhas")
+
+    aquecido = aquecimento.estado()
+    if aquecido['situacao'] == 'aquecendo':
+        st.caption(f"Aquecimento: {aquecido['feitos']}/{aquecido['total']} · {aquecido['etapa']}")
+    elif aquecido['situacao'] == 'pronto':
+        st.caption(f"Aquecimento: {aquecido['feitos']} etapas em {aquecido['ms'] / 1000:.1f} s"
+                   + (f", {aquecido['erros']} erros" if aquecido['erros'] else ""))
+
+if st.session_state.get('diagnostico'):
+    with st.sidebar:
+        painel_diagnostico()
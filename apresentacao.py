@@ -0,0 +1,100 @@
+"""Textos e formatação compartilhados entre o painel (app.py) e as páginas estáticas (estatico.py).
+
+Tudo aqui depende só das tabelas do Conjunto, sem Streamlit: o mesmo número
+aparece com o mesmo texto no painel ao vivo e no snapshot pré-gerado.
+"""
+import pandas as pd
+
+import alertas
+
+
+# --- 1. FORMATAÇÃO ---
+# Células vazias no boletim chegam como ausentes (NA) e aparecem como "s/d" (sem dado)
+def fmt_int(valor):
+    return "s/d" if pd.isna(valor) else f"{int(valor):,}".replace(',', '.')
+
+def fmt_pct(valor):
+    return "s/d" if pd.isna(valor) else f"{valor:.1f}%"
+
+# Alertas já vêm calculados na tabela anual (ver alertas.py); aqui só viram texto
+def alerta_kpi(fato, indicador, fmt):
+    if not fato[f'Alerta_{indicador}']:
+        return None
+    limiar = fato[f'Limiar_{indicador}']
+    return "ALTA" if pd.isna(limiar) else f"ALTA · esperado até {fmt(limiar)}"
+
+
+# --- 2. TEXTOS DO PAINEL GERAL ---
+INFO_HUMANOS = f"""
+<div class="info-box">
+    <ul>
+        <li><strong>Casos Humanos:</strong> Quantas pessoas foram diagnosticadas com leishmaniose no ano selecionado.</li>
+        <li><strong>Óbitos:</strong> Número de pessoas que faleceram em decorrência da doença.</li>
+        <li><strong>Letalidade (%):</strong> Indica a gravidade dos casos. Se este número aumenta, significa que a doença está sendo mais fatal. </li>
+    </ul>
+    <i><b>Nota:</b> Cada ano é comparado com os {alertas.JANELA} anos anteriores. Valores acima da média + 2 desvios padrão desse período, ou altas seguidas ao longo dos anos (CUSUM), aparecem com alerta em laranja.</i>
+</div>
+"""
+
+INFO_CANINOS = """
+<div class="info-box">
+    <ul>
+        <li><strong>Cães Positivos:</strong> Quantidade de animais que fizeram o exame e tiveram a doença confirmada.</li>
+        <li><strong>Eutanásias:</strong> Medida de saúde pública recomendada para interromper o ciclo de transmissão da doença (cão infectado → mosquito → humano).</li>
+        <li><strong>Taxa de Positividade (%):</strong> Proporção de cães doentes entre todos os que foram testados no ano. Funciona como um "termômetro". Se essa taxa sobe, é um sinal de que a leishmaniose está circulando com mais intensidade entre os animais.</li>
+    </ul>
+</div>
+"""
+
+INFO_CONTROLE = """
+<div class="info-box">
+    <ul>
+        <li><strong>Total Sorologias (Testes):</strong> Representa o esforço da vigilância em testar a população canina para identificar os animais infectados.</li>
+        <li><strong>Imóveis Borrifados:</strong> <b>Controle Vetorial</b>, ou seja, quantas casas receberam aplicação de inseticida (o famoso "fumacê" ou borrifação residual) para eliminar o mosquito palha transmissor da doença (vetor).</li>
+    </ul>
+</div>
+"""
+
+
+# --- 3. CARTÕES DE INDICADORES ---
+# Cartões por bloco: (coluna, rótulo, formatação, indicador com alerta)
+GRUPOS_KPI = [
+    ("1. Indicadores Humanos", INFO_HUMANOS, [('Casos', "Casos Humanos", fmt_int, 'Casos'),
+                                             ('Obitos', "Óbitos", fmt_int, None),
+                                             ('Letalidade', "Letalidade", fmt_pct, 'Letalidade')]),
+    ("2. Vigilância Canina", INFO_CANINOS, [('Positivos', "Cães Positivos", fmt_int, None),
+                                           ('Eutanasiados', "Eutanásias", fmt_int, None),
+                                           ('Taxa_Positividade', "Taxa Positividade", fmt_pct, 'Taxa_Positividade')]),
+    ("3. Ações de Controle e Testes", INFO_CONTROLE, [('Sorologias', "Total Sorologias (Testes)", fmt_int, None),
+                                                      ('Borrifados', "Imóveis Borrifados", fmt_int, None)]),
+]
+
+CSS_CARTOES = """
+h5 { font-size: 1.05rem; margin: 18px 0 8px; }
+.linha { display: grid; grid-template-columns: repeat(3, 1fr); gap: 16px; }
+.card { background: #fff; padding: 12px 15px; border-radius: 8px; border: 1px solid #e2e8f0;
+        border-left: 5px solid #5D3A9B; box-shadow: 0 1px 3px rgba(0,0,0,0.05); }
+.card.alta { border-left-color: #C2410C; }
+.rotulo { color: #64748b; font-size: 0.9rem; margin: 0 0 4px; }
+.valor { font-size: 1.8rem; font-weight: 700; margin: 0; }
+.card.alta .valor { color: #C2410C; }
+.nota { color: #64748b; font-size: 0.8rem; margin: 4px 0 0; min-height: 1em; }
+.card.alta .nota { color: #C2410C; font-weight: 700; }
+"""
+
+
+def kpis_por_ano(df_anual):
+    # Todos os anos já formatados, com o mesmo texto dos st.metric:
+    # {ano: {coluna: [valor, nota, alerta]}}
+    anos = {}
+    for ano, fato in df_anual.iterrows():
+        cartoes = {}
+        for _, _, itens in GRUPOS_KPI:
+            for coluna, _, fmt, indicador in itens:
+                alerta = bool(indicador and fato[f'Alerta_{indicador}'])
+                nota = alerta_kpi(fato, indicador, fmt) if indicador else None
+                if indicador == 'Letalidade' and not alerta and not pd.isna(fato['Limiar_Letalidade']):
+                    nota = f"Estável · esperado até {fmt_pct(fato['Limiar_Letalidade'])}"
+                cartoes[coluna] = [fmt(fato[coluna]), nota or "", alerta]
+        anos[int(ano)] = cartoes
+    return anos
@@ -0,0 +1,138 @@
+"""Aquecimento do servidor: dados e gráficos do ano padrão prontos antes do primeiro visitante.
+
+Roda numa thread de fundo quando o servidor sobe (ver servidor.py) ou, com
+`streamlit run app.py`, na primeira execução do script. Carrega os municípios
+configurados no armazém do processo e monta, para cada tamanho de fonte, os
+gráficos que cada segmento mostra ao abrir, pedidos a figuras.pedido como as
+páginas (paginas/) fazem: o primeiro visitante só encontra acertos de cache.
+É também nesta thread que plotly.express e plotly.subplots são importados pela
+primeira vez, já que figuras.py só os importa ao montar um gráfico.
+
+O progresso fica em estado() (mostrado no painel de diagnóstico) e o resumo vai
+para o rastreio como um rerun do tipo 'aquecimento'.
+"""
+import logging
+import os
+import threading
+import time
+
+import dados
+import figuras
+import rastreio
+
+# --- 1. PARÂMETROS ---
+# Códigos separados por vírgula, 'todos' (até MAX_MUNICIPIOS) ou vazio para desligar
+MUNICIPIOS = os.environ.get('VIGILEISH_AQUECER', dados.MUNICIPIO_PADRAO)
+TAMANHOS_FONTE = (14, 16, 20)  # os três tamanhos do seletor de acessibilidade
+
+_logger = logging.getLogger('vigileish.aquecimento')
+_lock = threading.Lock()
+_thread = None
+_estado = {'situacao': 'parado', 'etapa': '', 'feitos': 0, 'total': 0, 'ms': None, 'erros': 0}
+
+
+def estado():
+    """Cópia do progresso: situação (parado, aquecendo, pronto), etapa, feitos/total, ms e erros."""
+    with _lock:
+        return dict(_estado)
+
+
+def _atualizar(**campos):
+    with _lock:
+        _estado.update(campos)
+
+
+def _somar(**incrementos):
+    with _lock:
+        for campo, valor in incrementos.items():
+            _estado[campo] += valor
+
+
+# --- 2. GRÁFICOS DO ANO PADRÃO ---
+def graficos_padrao(conjunto, plotly_font):
+    """(chave, construtor, args) de cada gráfico que os segmentos mostram ao abrir.
+
+    Os valores iniciais dos widgets de paginas/: último ano, primeira regional
+    com o período completo e o primeiro escopo das correlações.
+    """
+    df_anual, df_m, df_corr = conjunto.anual, conjunto.regionais, conjunto.correlacoes
+    if df_anual.empty:
+        return []
+    ano = int(df_anual.index.max())
+
+    nomes = ["Canina/barras", "Canina/sorologias", "Canina/borrifacao", "Historico/correlacao"]
+    graficos = [figuras.pedido(conjunto, nome, plotly_font) for nome in nomes]
+    if not df_corr.empty:
+        escopo = df_corr['Escopo'].unique().tolist()[0]
+        graficos.append(figuras.pedido(conjunto, "Historico/defasagens", plotly_font, extra=escopo))
+    if not df_m.empty:
+        df_f = figuras.recorte_mapa(conjunto, ano)
+        if not df_f.empty:
+            graficos.append(figuras.pedido(conjunto, "Mapa/regionais", plotly_font, ano=ano, recorte=df_f))
+        graficos.append(figuras.pedido(conjunto, "Mapa/regionais_anos", plotly_font, ano=ano))
+        regional = sorted(df_m.index.unique('Regional').tolist())[0]
+        intervalo = (int(df_m.index.levels[0].min()), conjunto.max_ano)
+        graficos.append(figuras.pedido(conjunto, "Mapa/historico", plotly_font, extra=regional, intervalo=intervalo))
+    return graficos
+
+
+# --- 3. THREAD DE AQUECIMENTO ---
+def _municipios(armazem):
+    if not MUNICIPIOS.strip():
+        return []
+    catalogo = armazem.catalogo()
+    if MUNICIPIOS.strip() == 'todos':
+        return catalogo.index.tolist()[:armazem.max_municipios]
+    return [c.strip() for c in MUNICIPIOS.split(',') if c.strip() in catalogo.index]
+
+
+def aquecer(armazem, tamanhos=TAMANHOS_FONTE):
+    """Carrega os municípios e monta os gráficos padrão; devolve o estado final."""
+    inicio = time.perf_counter()
+    rastreio.iniciar_rerun('aquecimento')
+    municipios = _municipios(armazem)
+    # Cada município conta como uma etapa, além dos gráficos (estimados depois da carga)
+    _atualizar(situacao='aquecendo', etapa='', feitos=0, total=len(municipios), ms=None, erros=0)
+
+    for codigo in municipios:
+        _atualizar(etapa=f"carga {codigo}")
+        try:
+            with rastreio.span('aquecimento.carga', municipio=codigo):
+                conjunto = armazem.obter(codigo)
+            graficos = [g for f in tamanhos for g in graficos_padrao(conjunto, f)]
+        except Exception:
+            _logger.exception(f"Aquecimento: falha ao carregar o município {codigo}")
+            _somar(feitos=1, erros=1)
+            continue
+        _somar(feitos=1, total=len(graficos))
+
+        for chave, construtor, args in graficos:
+            _atualizar(etapa=f"{codigo} {chave[1]} ({chave[3]})")
+            try:
+                with rastreio.span('aquecimento.figura', municipio=codigo, figura=chave[1], fonte=chave[3]):
+                    figuras.CACHE.obter(chave, construtor, *args)
+            except Exception:
+                _logger.exception(f"Aquecimento: falha no gráfico {chave[1]} de {codigo}")
+                _somar(erros=1)
+            _somar(feitos=1)
+        progresso = estado()
+        _logger.info(f"Aquecimento: {codigo} pronto ({progresso['feitos']}/{progresso['total']} etapas)")
+
+    _atualizar(situacao='pronto', etapa='', ms=round((time.perf_counter() - inicio) * 1e3, 1))
+    final = estado()
+    rastreio.marcar(municipios=municipios, feitos=final['feitos'], erros=final['erros'])
+    rastreio.finalizar_rerun()
+    _logger.info(f"Aquecimento concluído em {final['ms'] / 1000:.1f} s: "
+                 f"{final['feitos']} etapas, {final['erros']} erros")
+    return final
+
+
+def iniciar(armazem):
+    """Dispara o aquecimento numa thread de fundo; chamadas seguintes não fazem nada."""
+    global _thread
+    with _lock:
+        if _thread is not None:
+            return _thread
+        _thread = threading.Thread(target=aquecer, args=(armazem,), name='vigileish-aquecimento', daemon=True)
+    _thread.start()
+    return _thread
@@ -0,0 +1,318 @@
+"""Benchmark por estágio: carga, filtro por ano, construção de figuras e render do app.py.
+
+Cada cenário roda num processo separado, apontando o dados.py para uma base
+sintética (ou a real, no cenário 1x1x1) via VIGILEISH_MUNICIPIOS_DIR. Para cada
+estágio mede a mediana do tempo e o pico de memória alocada (tracemalloc).
+
+Cenários são escritos como AxRxM: fatores de escala em anos, regionais e
+municípios (1x1x1 = dados reais de Belo Horizonte). Os anos percorridos no
+filtro e no render são todos os anos da base, limitados por --max-anos.
+
+Com --gravar os resultados viram a linha de base (específica da máquina); sem
+ele, a execução compara com a linha de base e sai com código 1 se algum
+estágio piorar além da tolerância.
+
+Uso:
+    python benchmarks/bench_estagios.py --gravar
+    python benchmarks/bench_estagios.py
+    python benchmarks/bench_estagios.py --cenarios 1x1x1 10x10x10 --max-anos 5 --tolerancia 0.5
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+ARQ_BASELINE = os.path.join(RAIZ, 'benchmarks', 'baseline_estagios.json')
+CENARIOS = ['1x1x1', '10x1x1', '100x1x1', '1000x1x1', '1x10x1', '1x100x1', '1x1000x1', '1x1x10', '1x1x100',
+            '1x1x1000', '10x10x10']
+SEGMENTOS = ["Geral", "Mapa", "Canina", "Historico"]
+
+ANOS_BASE = 32        # 1994-2025 na série anual
+ANOS_REGIONAL = 19    # 2007-2025 na seção por regional
+REGIONAIS_BASE = 9
+ANO_FINAL = 2025
+
+
+# --- 1. BASE SINTÉTICA ---
+def _milhar(valor):
+    return f"{int(valor):,}".replace(',', '.')
+
+
+def _decimal(valor, casas=1):
+    return f"{valor:.{casas}f}".replace('.', ',')
+
+
+def gerar_municipio(diretorio, fator_anos, fator_regionais, semente):
+    """Escreve os quatro CSVs de um município no layout do boletim, com a série alongada e mais regionais."""
+    rng = np.random.default_rng(semente)
+    os.makedirs(diretorio, exist_ok=True)
+    # Anos positivos e em ordem, terminando em ANO_FINAL quando cabe; séries mais
+    # longas começam no ano 1 (o Ano é Int16 e o boletim só aceita anos com dígitos)
+    n_anos = ANOS_BASE * fator_anos
+    inicio = max(1, ANO_FINAL - n_anos + 1)
+    anos = np.arange(inicio, inicio + n_anos)
+    anos_reg = anos[-ANOS_REGIONAL * fator_anos:]
+    regionais = [f"Regional {i:04d}" for i in range(REGIONAIS_BASE * fator_regionais)]
+
+    casos_reg = rng.poisson(6, size=(len(regionais), len(anos_reg)))
+    casos = rng.poisson(80, size=len(anos))
+    casos[-len(anos_reg):] = casos_reg.sum(axis=0)
+    pop = rng.integers(2_000_000, 2_400_000, size=len(anos))
+    obitos = rng.binomial(casos, 0.12)
+
+    linhas = ["Incidência e letalidade de casos confirmados de leishmaniose visceral (sintético)",
+              "Ano;Casos incidentes;População;Inc. por 100.000 hab.;Casos prevalentes;Óbitos incidentes;Letalidade incidentes (%)"]
+    for ano, c, p, o in zip(anos, casos, pop, obitos):
+        letalidade = round(o / c * 100) if c else 0
+        linhas.append(f"{ano};{c};{_milhar(p)};{_decimal(c / p * 100_000)};{c};{o};{letalidade}")
+    linhas += ["Fonte: sintético", "", "Casos confirmados por Regional (sintético)",
+               ';'.join(['Regional'] + [str(a) for a in anos_reg] + ['TOTAL'])]
+    for nome, serie in zip(regionais, casos_reg):
+        linhas.append(';'.join([nome] + [str(v) for v in serie] + [str(serie.sum())]))
+    totais = casos_reg.sum(axis=0)
+    linhas.append(';'.join(['Total'] + [str(v) for v in totais] + [str(totais.sum())]))
+    linhas.append("Fonte: sintético")
+    _escrever(os.path.join(diretorio, 'dados_novos.csv'), linhas)
+
+    sorologias = rng.integers(10_000, 150_000, size=len(anos))
+    positivos = rng.binomial(sorologias, 0.05)
+    eutanasiados = rng.binomial(positivos, 0.7)
+    _escrever(os.path.join(diretorio, 'caninos_novos.csv'),
+              ["ANO;SOROLOGIAS REALIZADAS;CÃES SOROPOSITIVOS;CÃES EUTANASIADOS"] +
+              [f"{a};{_milhar(s)};{_milhar(p)};{_milhar(e)}" for a, s, p, e in zip(anos, sorologias, positivos, eutanasiados)])
+
+    borrifados = rng.integers(4_000, 60_000, size=len(anos))
+    _escrever(os.path.join(diretorio, 'vetor.csv'),
+              ["ANO;IMÓVEIS BORRIFADOS"] + [f"{a};{_milhar(b)}" for a, b in zip(anos, borrifados)])
+
+    lat = rng.uniform(-20.0, -19.8, len(regionais))
+    lon = rng.uniform(-44.1, -43.9, len(regionais))
+    _escrever(os.path.join(diretorio, 'coordenadas_regionais.csv'),
+              ["Regional;Lat;Lon"] + [f"{n};{_decimal(a, 3)};{_decimal(o, 3)}" for n, a, o in zip(regionais, lat, lon)])
+
+
+def _escrever(caminho, linhas):
+    with open(caminho, 'wb') as f:
+        f.write(('\r\n'.join(linhas) + '\r\n').encode('iso-8859-1'))
+
+
+def gerar_base(diretorio, fator_anos, fator_regionais, n_municipios):
+    codigos = [f"9{i:06d}" for i in range(n_municipios)]
+    for i, codigo in enumerate(codigos):
+        gerar_municipio(os.path.join(diretorio, codigo), fator_anos, fator_regionais, semente=i)
+    _escrever(os.path.join(diretorio, 'municipios.csv'),
+              ["Codigo;Municipio;UF;Orgao;Fonte;Link"] +
+              [f"{c};Município {c};MG;SMS;Sintético;https://example.org" for c in codigos])
+    return codigos
+
+
+# --- 2. MEDIÇÃO ---
+def medir(funcao, repeticoes=1, preparar=None):
+    """Devolve (mediana do tempo em ms, pico de memória em KiB) de `funcao`."""
+    tempos, picos = [], []
+    for _ in range(repeticoes):
+        if preparar:
+            preparar()
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - t0)
+        picos.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return statistics.median(tempos) * 1e3, max(picos) / 1024
+
+
+def medir_por_ano(funcao, anos):
+    # Um tempo por ano; o estágio reporta a mediana entre os anos e o pior pico
+    resultados = [medir(lambda: funcao(ano)) for ano in anos]
+    return statistics.median(r[0] for r in resultados), max(r[1] for r in resultados)
+
+
+def amostrar_anos(indice, max_anos):
+    anos = [int(a) for a in indice]
+    if len(anos) <= max_anos:
+        return anos
+    return [anos[int(i)] for i in np.linspace(0, len(anos) - 1, max_anos)]
+
+
+def rodar_cenario(args):
+    # Executado no processo filho: o ambiente já aponta para a base do cenário,
+    # por isso dados.py só é importado aqui
+    import dados
+    import figuras
+    from streamlit.logger import set_log_level
+    from streamlit.testing.v1 import AppTest
+    set_log_level(logging.ERROR)
+
+    resultados = {}
+    diretorio = dados.DIR_PADRAO
+    limpar_cache = lambda: shutil.rmtree(dados.DIR_CACHE, ignore_errors=True)  # noqa: E731
+
+    # Carga: sem cache compilado (CSV) e com cache (Arrow mapeado)
+    resultados['carga/fria'] = medir(lambda: dados.carregar_dados(diretorio), args.repeticoes, limpar_cache)
+    resultados['carga/quente'] = medir(lambda: dados.carregar_dados(diretorio), args.repeticoes)
+
+    catalogo = dados.Armazem().catalogo()
+    if len(catalogo) > 1:
+        def percorrer():
+            armazem = dados.Armazem()
+            for codigo in armazem.catalogo().index:
+                armazem.obter(codigo)
+        resultados['carga/municipios'] = medir(percorrer, args.repeticoes)
+
+    conjunto = dados.carregar_dados(diretorio)
+    df_anual, df_m = conjunto.anual, conjunto.regionais
+    min_ano, max_ano = conjunto.min_ano, conjunto.max_ano
+    anos = amostrar_anos(df_anual.index, args.max_anos)
+    anos_mapa = [a for a in anos if a in df_m.index.get_level_values('Ano')] or anos[-1:]
+
+    # Filtros que cada segmento faz a cada rerun (mesmas expressões do app.py)
+    recorte_mapa = lambda ano: df_m.loc[ano].reset_index().dropna(subset=['Casos'])  # noqa: E731
+    resultados['filtro/Geral'] = medir_por_ano(lambda ano: df_anual.loc[ano], anos)
+    resultados['filtro/Mapa'] = medir_por_ano(recorte_mapa, anos_mapa)
+    resultados['filtro/Historico'] = medir(
+        lambda: df_anual.loc[min_ano:max_ano, ['Casos', 'Positivos']].reset_index(), args.repeticoes)
+
+    # Figuras: construção + serialização, o que o cache de figuras evita nos reruns
+    def construir(construtor, *extra):
+        figuras.CacheFiguras(float('inf')).obter(None, construtor, *extra)
+
+    # O primeiro to_json do processo carrega templates e validadores do Plotly
+    construir(figuras.canina_sorologias, df_anual, min_ano, max_ano, 18)
+    for nome in ('canina_barras', 'canina_sorologias', 'canina_borrifacao'):
+        resultados[f'figura/{nome}'] = medir(
+            lambda nome=nome: construir(getattr(figuras, nome), df_anual, min_ano, max_ano, 18), args.repeticoes)
+    resultados['figura/mapa_regionais'] = medir_por_ano(
+        lambda ano: construir(figuras.mapa_regionais, recorte_mapa(ano), 18), anos_mapa)
+    reg_sel = df_m.index.get_level_values('Regional')[0]
+    df_reg_hist = df_m.xs(reg_sel, level='Regional').reset_index()
+    intervalo = (int(df_reg_hist['Ano'].min()), int(df_reg_hist['Ano'].max()))
+    resultados['figura/historico_regional'] = medir(
+        lambda: construir(figuras.historico_regional, df_reg_hist, reg_sel, intervalo, 18), args.repeticoes)
+    df_merged = df_anual.loc[min_ano:max_ano, ['Casos', 'Positivos']].reset_index()
+    resultados['figura/historico_correlacao'] = medir(
+        lambda: construir(figuras.historico_correlacao, df_merged, min_ano, max_ano, 18), args.repeticoes)
+
+    # Render: execução completa do script, headless, em cada segmento e ano.
+    # O primeiro run de cada segmento paga a construção das figuras; os demais
+    # medem o caminho com o cache de figuras quente, como numa sessão real.
+    app = os.path.join(RAIZ, 'app.py')
+    for segmento in SEGMENTOS:
+        anos_seg = anos if segmento in ("Geral", "Mapa") else anos[-1:]
+
+        def render(ano, segmento=segmento):
+            at = AppTest.from_file(app, default_timeout=600)
+            at.session_state["segment"] = segmento
+            at.session_state["ano_selecionado"] = ano
+            at.run()
+            if at.exception:
+                raise RuntimeError(f"{segmento} {ano}: {at.exception[0].message}")
+
+        resultados[f'render/{segmento}'] = medir_por_ano(render, anos_seg)
+
+    return {estagio: {'tempo_ms': t, 'pico_kib': m} for estagio, (t, m) in resultados.items()}
+
+
+def executar(cenario, args, base_dir):
+    """Gera a base do cenário e roda os estágios num processo novo (memória e imports limpos)."""
+    fa, fr, fm = (int(x) for x in cenario.split('x'))
+    ambiente = dict(os.environ)
+    if (fa, fr, fm) != (1, 1, 1):
+        dir_cenario = os.path.join(base_dir, cenario)
+        codigos = gerar_base(os.path.join(dir_cenario, 'municipios'), fa, fr, fm)
+        ambiente['VIGILEISH_MUNICIPIOS_DIR'] = os.path.join(dir_cenario, 'municipios')
+        ambiente['VIGILEISH_MUNICIPIO'] = codigos[0]
+    ambiente['VIGILEISH_CACHE_DIR'] = os.path.join(base_dir, cenario, 'cache')
+    ambiente['VIGILEISH_RASTREIO'] = os.path.join(base_dir, cenario, 'rastreio.jsonl')
+    # Sem aquecimento nem vigia: threads de fundo no processo medido distorcem tempo e memória
+    ambiente['VIGILEISH_AQUECER'] = ''
+    ambiente['VIGILEISH_INTERVALO_VIGIA'] = '0'
+
+    comando = [sys.executable, os.path.abspath(__file__), '--_filho',
+               '--repeticoes', str(args.repeticoes), '--max-anos', str(args.max_anos)]
+    saida = subprocess.run(comando, env=ambiente, cwd=RAIZ, capture_output=True, text=True)
+    if saida.returncode != 0:
+        raise RuntimeError(f"cenário {cenario} falhou:\n{saida.stderr[-2000:]}")
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+# --- 3. LINHA DE BASE ---
+def comparar(atual, baseline, tolerancia, tolerancia_memoria, folga_ms):
+    """Lista as regressões: mais lento que (1 + tolerância) x base, ignorando diferenças abaixo de `folga_ms`."""
+    regressoes = []
+    for cenario, estagios in atual.items():
+        for estagio, medida in estagios.items():
+            base = baseline.get(cenario, {}).get(estagio)
+            if base is None:
+                continue
+            limite = max(base['tempo_ms'] * (1 + tolerancia), base['tempo_ms'] + folga_ms)
+            if medida['tempo_ms'] > limite:
+                regressoes.append(f"{cenario} {estagio}: {medida['tempo_ms']:.1f} ms (base {base['tempo_ms']:.1f} ms)")
+            if medida['pico_kib'] > base['pico_kib'] * (1 + tolerancia_memoria) + 64:
+                regressoes.append(f"{cenario} {estagio}: {medida['pico_kib']:.0f} KiB (base {base['pico_kib']:.0f} KiB)")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cenarios', nargs='+', default=CENARIOS, metavar='AxRxM')
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--max-anos', type=int, default=40, help="anos percorridos por segmento (todos na base real)")
+    parser.add_argument('--baseline', default=ARQ_BASELINE)
+    parser.add_argument('--gravar', action='store_true', help="grava os resultados como nova linha de base")
+    parser.add_argument('--tolerancia', type=float, default=0.25, help="piora relativa de tempo aceita")
+    parser.add_argument('--tolerancia-memoria', type=float, default=0.10, help="piora relativa de pico aceita")
+    parser.add_argument('--folga-ms', type=float, default=2.0, help="diferença absoluta de tempo sempre aceita")
+    parser.add_argument('--_filho', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args._filho:
+        print(json.dumps(rodar_cenario(args)))
+        return
+
+    atual = {}
+    with tempfile.TemporaryDirectory(prefix='vigileish-bench-') as base_dir:
+        for cenario in args.cenarios:
+            atual[cenario] = executar(cenario, args, base_dir)
+            print(f"\n{cenario} (anos x regionais x municípios)")
+            print(f"  {'estágio':<30} {'tempo (ms)':>11} {'pico (KiB)':>11}")
+            for estagio, medida in atual[cenario].items():
+                print(f"  {estagio:<30} {medida['tempo_ms']:>11.2f} {medida['pico_kib']:>11.0f}")
+
+    if args.gravar:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding='utf-8') as f:
+                baseline = json.load(f)
+        baseline.update(atual)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2, ensure_ascii=False)
+        print(f"\nLinha de base gravada em {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"\nSem linha de base em {args.baseline}; rode com --gravar primeiro.")
+        return
+    with open(args.baseline, encoding='utf-8') as f:
+        regressoes = comparar(atual, json.load(f), args.tolerancia, args.tolerancia_memoria, args.folga_ms)
+    if regressoes:
+        print("\nREGRESSÕES:")
+        for r in regressoes:
+            print(f"  {r}")
+        sys.exit(1)
+    print("\nSem regressões em relação à linha de base.")
+
+
+if __name__ == '__main__':
+    main()
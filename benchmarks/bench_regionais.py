@@ -0,0 +1,92 @@
+"""Benchmark: reshape da seção regional (laço iterrows antigo x versão vetorizada).
+
+Uso:
+    python benchmarks/bench_regionais.py
+    python benchmarks/bench_regionais.py --regionais 9 90 900 --anos 19 40 --repeticoes 5
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import dados  # noqa: E402
+
+
+# --- 1. DADOS SINTÉTICOS ---
+def gerar_secao(n_regionais, n_anos, semente=0):
+    rng = np.random.default_rng(semente)
+    nomes = [f"Regional {i:04d}" for i in range(n_regionais)]
+    anos = [str(2007 + i) for i in range(n_anos)]
+    casos = rng.poisson(8, size=(n_regionais, n_anos)).astype('int32')
+    df_reg_raw = pd.DataFrame(casos, columns=anos).astype('Int32')
+    df_reg_raw.insert(0, 'Regional', nomes)
+    df_coords = pd.DataFrame({
+        'Regional': nomes,
+        'Lat': rng.uniform(-20.0, -19.8, n_regionais),
+        'Lon': rng.uniform(-44.1, -43.9, n_regionais),
+    })
+    return df_reg_raw, df_coords
+
+
+# --- 2. IMPLEMENTAÇÃO ANTERIOR (REFERÊNCIA) ---
+def reshape_laco(df_reg_raw, df_coords):
+    # Cópia do laço que existia em load_data, com o ano lido do cabeçalho para
+    # que as duas versões produzam a mesma tabela
+    coords = {r.Regional: [r.Lat, r.Lon] for r in df_coords.itertuples()}
+    regionais_lista = []
+    for index, row in df_reg_raw.iterrows():
+        reg_nome = str(row.iloc[0]).strip()
+        if reg_nome in coords:
+            for i in range(1, len(row)):
+                try:
+                    ano = int(df_reg_raw.columns[i])
+                    val = row.iloc[i]
+                    val_num = pd.to_numeric(val, errors='coerce')
+                    if pd.isna(val_num): val_num = 0
+                    regionais_lista.append({
+                        'Regional': reg_nome, 'Ano': int(ano),
+                        'Casos': val_num,
+                        'Lat': coords[reg_nome][0], 'Lon': coords[reg_nome][1]
+                    })
+                except: continue
+    return pd.DataFrame(regionais_lista)
+
+
+# --- 3. MEDIÇÃO ---
+def cronometrar(funcao, *args, repeticoes=3):
+    tempos = []
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        funcao(*args)
+        tempos.append(time.perf_counter() - t0)
+    return min(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--regionais', type=int, nargs='+', default=[9, 90, 900])
+    parser.add_argument('--anos', type=int, nargs='+', default=[19, 40])
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'regionais':>10} {'anos':>6} {'linhas':>9} {'laço (ms)':>11} {'vetor (ms)':>11} {'ganho':>8}")
+    for n_anos in args.anos:
+        for n_reg in args.regionais:
+            df_reg_raw, df_coords = gerar_secao(n_reg, n_anos)
+
+            # Confere que as duas versões produzem os mesmos números
+            ref = reshape_laco(df_reg_raw, df_coords).sort_values(['Regional', 'Ano'], ignore_index=True)
+            novo = dados.regionais_longo(df_reg_raw, df_coords)
+            assert np.array_equal(ref['Casos'].to_numpy(), novo['Casos'].to_numpy(dtype='int64'))
+
+            t_laco = cronometrar(reshape_laco, df_reg_raw, df_coords, repeticoes=args.repeticoes)
+            t_vet = cronometrar(dados.regionais_longo, df_reg_raw, df_coords, repeticoes=args.repeticoes)
+            print(f"{n_reg:>10} {n_anos:>6} {len(novo):>9} {t_laco * 1e3:>11.1f} {t_vet * 1e3:>11.1f} {t_laco / t_vet:>7.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""Benchmark: custo por sessão de st.cache_data (cópia por rerun) x st.cache_resource (compartilhado).
+
+Simula N sessões, cada uma segurando o resultado de load_data() do seu último
+rerun, e mede a memória extra por sessão e o custo de cada acesso ao cache.
+Depois tenta escrever nas tabelas de uma sessão (troca de coluna, .iloc, .loc)
+e confere que o conjunto compartilhado continua igual; sai com código 1 se
+alguma escrita vazar para as outras sessões.
+
+Uso:
+    python benchmarks/bench_sessoes.py
+    python benchmarks/bench_sessoes.py --sessoes 10 100 --escala 100
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+import tracemalloc
+import warnings
+
+import pandas as pd
+import streamlit as st
+from streamlit.logger import set_log_level
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import dados  # noqa: E402
+
+# Fora de `streamlit run` o Streamlit avisa que não há ScriptRunContext
+set_log_level(logging.ERROR)
+
+
+def escalar(conjunto, fator):
+    # Repete os anos `fator` vezes para simular uma base maior (ex.: vários municípios)
+    if fator == 1:
+        return conjunto
+    anual = pd.concat([conjunto.anual] * fator, ignore_index=True)
+    regionais = pd.concat([conjunto.regionais.reset_index()] * fator, ignore_index=True)
+    return dados.Conjunto(dados.congelar(anual), dados.congelar(regionais), conjunto.correlacoes,
+                          conjunto.min_ano, conjunto.max_ano, conjunto.versao)
+
+
+def medir(carregar, n_sessoes, acessos=200):
+    carregar()  # aquece o cache
+
+    t0 = time.perf_counter()
+    for _ in range(acessos):
+        carregar()
+    custo_acesso = (time.perf_counter() - t0) / acessos
+
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    sessoes = [carregar() for _ in range(n_sessoes)]
+    por_sessao = (tracemalloc.get_traced_memory()[0] - base) / n_sessoes
+    tracemalloc.stop()
+    del sessoes
+    return custo_acesso, por_sessao
+
+
+# Escritas que uma sessão poderia fazer na sua cópia; cada uma deve levantar
+# exceção ou deixar o conjunto compartilhado como estava
+ESCRITAS = {
+    'coluna existente': lambda df: df.__setitem__(df.columns[0], 0),
+    'coluna nova': lambda df: df.__setitem__('X', 1),
+    '.iloc': lambda df: df.iloc.__setitem__((0, 2), 5.0),
+    '.loc': lambda df: df.loc.__setitem__((df.index[0], df.columns[1]), 5.0),
+    '.loc coluna inteira': lambda df: df.loc.__setitem__((slice(None), df.columns[2]), 0),
+    '.to_numpy()': lambda df: df[df.columns[2]].to_numpy().__setitem__(0, 5.0),
+}
+
+
+def verificar_escrita(conjunto):
+    """Tenta cada escrita numa cópia de sessão e confere o compartilhado; devolve quantas vazaram."""
+    vazamentos = 0
+    for tabela in ('anual', 'regionais', 'correlacoes'):
+        compartilhada = getattr(conjunto, tabela)
+        for nome, escrever in ESCRITAS.items():
+            original = compartilhada.copy(deep=True)
+            try:
+                with warnings.catch_warnings():
+                    warnings.simplefilter('ignore')
+                    escrever(getattr(conjunto.para_sessao(), tabela))
+                resultado = "aceita na cópia"
+            except (ValueError, TypeError) as e:
+                resultado = f"recusada ({type(e).__name__})"
+            intacta = compartilhada.equals(original) and compartilhada.columns.equals(original.columns)
+            vazamentos += not intacta
+            print(f"  {tabela:<12} {nome:<20} {resultado:<22} {'compartilhado intacto' if intacta else 'VAZOU'}")
+    return vazamentos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessoes', type=int, nargs='+', default=[10, 100])
+    parser.add_argument('--escala', type=int, nargs='+', default=[1, 100])
+    args = parser.parse_args()
+
+    base = dados.carregar_dados()
+    vazamentos = 0
+    print(f"{'escala':>7} {'sessões':>8} {'modo':>15} {'acesso (µs)':>12} {'KiB/sessão':>11}")
+    for fator in args.escala:
+        conjunto = escalar(base, fator)
+
+        # `fator` entra na chave do cache para cada escala ter sua própria entrada
+        @st.cache_data
+        def por_copia(fator):
+            return conjunto
+
+        @st.cache_resource
+        def compartilhado(fator):
+            return conjunto
+
+        # O app usa o compartilhado com uma cópia rasa por rerun (Conjunto.para_sessao)
+        modos = (('cache_data', lambda: por_copia(fator)),
+                 ('cache_resource', lambda: compartilhado(fator).para_sessao()))
+        for n in args.sessoes:
+            for nome, carregar in modos:
+                custo, memoria = medir(carregar, n)
+                print(f"{fator:>7} {n:>8} {nome:>15} {custo * 1e6:>12.1f} {memoria / 1024:>11.1f}")
+
+        vazamentos += verificar_escrita(compartilhado(fator))
+
+    if vazamentos:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,274 @@
+"""Teste de carga: N sessões simultâneas navegando no app.py servido localmente.
+
+Sobe `streamlit run app.py` numa porta livre e abre N sessões pelo mesmo
+websocket que o navegador usa (/_stcore/stream, mensagens protobuf). Cada
+sessão faz um roteiro realista de cliques: troca de segmento, troca de ano
+no ano_widget, regional e período no histórico do mapa e tamanho da fonte,
+com uma pausa entre as ações. A latência de cada rerun é medida do envio
+até o script_finished do servidor.
+
+Para cada número de sessões reporta reruns/s, latência p50/p95/p99 e o pico
+de memória (RSS) do servidor. Roda inteiramente offline; usa o pacote
+`websockets`, que já vem com o servidor do Streamlit (uvicorn).
+
+Uso:
+    python benchmarks/carga_sessoes.py
+    python benchmarks/carga_sessoes.py --sessoes 1 10 25 50 --acoes 20 --pausa 0.5 2
+    python benchmarks/carga_sessoes.py --url ws://localhost:8501   # servidor já rodando (sem RSS)
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import numpy as np
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SEGMENTOS = {"Geral": "Painel Geral", "Mapa": "Mapa", "Canina": "Cães", "Historico": "Histórico"}
+ROTULO_ANO = "Selecione o Ano:"
+ROTULO_REGIONAL = "Selecione a Regional:"
+ROTULO_PERIODO = "Filtrar Período (Anos):"
+ROTULO_FONTE = "Tamanho do Texto:"
+
+# Peso de cada ação no roteiro; regional e período só valem com o Mapa aberto
+PESOS = {'segmento': 0.35, 'ano': 0.30, 'regional': 0.15, 'periodo': 0.10, 'fonte': 0.10}
+
+FIM_OK = (ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY)
+
+
+# --- 1. SERVIDOR LOCAL ---
+def porta_livre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def iniciar_servidor(porta, timeout=60, lancador=None):
+    # lancador: script que sobe o app no lugar do `streamlit run` (ex.: servidor.py)
+    ambiente = dict(os.environ, VIGILEISH_RASTREIO='')
+    inicio = [os.path.join(RAIZ, lancador)] if lancador else ['-m', 'streamlit', 'run', os.path.join(RAIZ, 'app.py')]
+    comando = [sys.executable, *inicio,
+               '--server.headless', 'true', '--server.port', str(porta), '--server.address', '127.0.0.1',
+               '--browser.gatherUsageStats', 'false', '--server.fileWatcherType', 'none']
+    processo = subprocess.Popen(comando, cwd=RAIZ, env=ambiente, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    limite = time.time() + timeout
+    while time.time() < limite:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{porta}/_stcore/health", timeout=1) as r:
+                if r.status == 200:
+                    return processo
+        except OSError:
+            time.sleep(0.2)
+    processo.kill()
+    raise RuntimeError("o servidor do Streamlit não respondeu a tempo")
+
+
+def rss_mb(pid):
+    # Linux: memória residente do processo do servidor
+    with open(f"/proc/{pid}/status") as f:
+        for linha in f:
+            if linha.startswith('VmRSS:'):
+                return int(linha.split()[1]) / 1024
+    return float('nan')
+
+
+# --- 2. SESSÃO SIMULADA ---
+class Sessao:
+    """Uma aba do navegador: guarda os widgets que o servidor desenhou e os valores escolhidos."""
+
+    def __init__(self, url, rng):
+        self.url = url
+        self.rng = rng
+        self.ws = None
+        self.widgets = {}   # rótulo -> (id, tipo, proto, fragment_id)
+        self.estados = {}   # id -> WidgetState com o valor atual
+        self.script_hash = ""
+        self.segmento_atual = "Geral"
+        self.latencias = []  # (ação, ms)
+        self.erros = 0
+
+    async def conectar(self):
+        self.ws = await websockets.connect(f"{self.url}/_stcore/stream", subprotocols=["streamlit"], max_size=None)
+
+    async def fechar(self):
+        if self.ws is not None:
+            await self.ws.close()
+
+    async def rerun(self, acao, gatilho=None, fragment_id=""):
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        msg.rerun_script.page_script_hash = self.script_hash
+        msg.rerun_script.fragment_id = fragment_id
+        estados = list(self.estados.values()) + ([gatilho] if gatilho is not None else [])
+        msg.rerun_script.widget_states.widgets.extend(estados)
+
+        t0 = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        while True:
+            fwd = ForwardMsg()
+            fwd.ParseFromString(await self.ws.recv())
+            tipo = fwd.WhichOneof('type')
+            if tipo == 'new_session':
+                self.script_hash = fwd.new_session.main_script_hash
+            elif tipo == 'delta':
+                self._registrar(fwd.delta)
+            elif tipo == 'script_finished':
+                if fwd.script_finished == ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    continue
+                if fwd.script_finished not in FIM_OK:
+                    self.erros += 1
+                break
+        self.latencias.append((acao, (time.perf_counter() - t0) * 1e3))
+
+    def _registrar(self, delta):
+        if delta.WhichOneof('type') != 'new_element':
+            return
+        tipo = delta.new_element.WhichOneof('type')
+        if tipo == 'exception':
+            self.erros += 1
+            return
+        elemento = getattr(delta.new_element, tipo)
+        if tipo in ('button', 'selectbox', 'slider', 'radio') and elemento.id:
+            self.widgets[elemento.label] = (elemento.id, tipo, elemento, delta.fragment_id)
+
+    def _definir(self, rotulo, **valor):
+        wid, _, _, fragment_id = self.widgets[rotulo]
+        estado = WidgetState(id=wid, **valor)
+        self.estados[wid] = estado
+        return fragment_id
+
+    # Ações do roteiro
+    async def segmento(self):
+        destino = self.rng.choice([s for s in SEGMENTOS if s != self.segmento_atual])
+        wid, _, _, fragment_id = self.widgets[SEGMENTOS[destino]]
+        self.segmento_atual = destino
+        await self.rerun('segmento', WidgetState(id=wid, trigger_value=True), fragment_id)
+
+    async def ano(self):
+        opcoes = list(self.widgets[ROTULO_ANO][2].options)
+        fragment_id = self._definir(ROTULO_ANO, string_value=self.rng.choice(opcoes))
+        await self.rerun('ano', fragment_id=fragment_id)
+
+    async def regional(self):
+        opcoes = list(self.widgets[ROTULO_REGIONAL][2].options)
+        fragment_id = self._definir(ROTULO_REGIONAL, string_value=self.rng.choice(opcoes))
+        await self.rerun('regional', fragment_id=fragment_id)
+
+    async def periodo(self):
+        slider = self.widgets[ROTULO_PERIODO][2]
+        inicio, fim = sorted(self.rng.sample(range(int(slider.min), int(slider.max) + 1), 2))
+        fragment_id = self._definir(ROTULO_PERIODO, double_array_value={'data': [inicio, fim]})
+        await self.rerun('periodo', fragment_id=fragment_id)
+
+    async def fonte(self):
+        opcoes = list(self.widgets[ROTULO_FONTE][2].options)
+        self._definir(ROTULO_FONTE, string_value=self.rng.choice(opcoes))
+        await self.rerun('fonte')  # fora de fragmento: execução completa do script
+
+    def sortear_acao(self):
+        disponiveis = {a: p for a, p in PESOS.items()
+                       if a not in ('regional', 'periodo') or
+                       (self.segmento_atual == "Mapa" and ROTULO_REGIONAL in self.widgets)}
+        acoes, pesos = zip(*disponiveis.items())
+        return self.rng.choices(acoes, weights=pesos)[0]
+
+
+async def percorrer(url, n_acoes, pausa, semente):
+    sessao = Sessao(url, random.Random(semente))
+    await sessao.conectar()
+    try:
+        await sessao.rerun('abertura')
+        for _ in range(n_acoes):
+            await asyncio.sleep(sessao.rng.uniform(*pausa))
+            await getattr(sessao, sessao.sortear_acao())()
+    finally:
+        await sessao.fechar()
+    return sessao
+
+
+# --- 3. RODADAS ---
+async def rodada(url, n_sessoes, args, pid):
+    picos = [rss_mb(pid)] if pid else []
+    rodando = True
+
+    async def amostrar_memoria():
+        while rodando:
+            picos.append(rss_mb(pid))
+            await asyncio.sleep(0.2)
+
+    amostrador = asyncio.create_task(amostrar_memoria()) if pid else None
+    t0 = time.perf_counter()
+    sessoes = await asyncio.gather(*(percorrer(url, args.acoes, args.pausa, semente=1000 * n_sessoes + i)
+                                     for i in range(n_sessoes)))
+    duracao = time.perf_counter() - t0
+    rodando = False
+    if amostrador:
+        await amostrador
+    return sessoes, duracao, max(picos) if picos else float('nan')
+
+
+def percentis(valores):
+    return np.percentile(valores, [50, 95, 99]) if valores else [float('nan')] * 3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessoes', type=int, nargs='+', default=[1, 5, 10, 25, 50])
+    parser.add_argument('--acoes', type=int, default=15, help="ações por sessão, depois da abertura")
+    parser.add_argument('--pausa', type=float, nargs=2, default=[0.5, 2.0], metavar=('MIN', 'MAX'),
+                        help="intervalo (s) entre ações de uma sessão")
+    parser.add_argument('--url', help="ws://host:porta de um servidor já rodando (não mede memória)")
+    args = parser.parse_args()
+
+    processo = None
+    if args.url:
+        url, pid = args.url.rstrip('/'), None
+    else:
+        porta = porta_livre()
+        processo = iniciar_servidor(porta)
+        url, pid = f"ws://127.0.0.1:{porta}", processo.pid
+
+    try:
+        # Aquece o processo (imports, carga do município, cache de figuras) antes de medir
+        asyncio.run(percorrer(url, 4, (0, 0), semente=0))
+        base = rss_mb(pid) if pid else float('nan')
+        if pid:
+            print(f"RSS do servidor aquecido: {base:.0f} MB\n")
+
+        print(f"{'sessões':>8} {'reruns':>7} {'erros':>6} {'reruns/s':>9} {'p50 (ms)':>9} {'p95 (ms)':>9} "
+              f"{'p99 (ms)':>9} {'RSS pico':>9} {'MB/sessão':>10}")
+        por_acao = {}
+        for n in args.sessoes:
+            sessoes, duracao, pico = asyncio.run(rodada(url, n, args, pid))
+            latencias = [ms for s in sessoes for _, ms in s.latencias]
+            for s in sessoes:
+                for acao, ms in s.latencias:
+                    por_acao.setdefault(n, {}).setdefault(acao, []).append(ms)
+            p50, p95, p99 = percentis(latencias)
+            print(f"{n:>8} {len(latencias):>7} {sum(s.erros for s in sessoes):>6} {len(latencias) / duracao:>9.1f} "
+                  f"{p50:>9.0f} {p95:>9.0f} {p99:>9.0f} {pico:>8.0f}M {(pico - base) / n:>10.1f}")
+
+        maior = args.sessoes[-1]
+        print(f"\nPor ação com {maior} sessões:")
+        print(f"  {'ação':<10} {'n':>5} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9}")
+        for acao, valores in sorted(por_acao[maior].items()):
+            p50, p95, p99 = percentis(valores)
+            print(f"  {acao:<10} {len(valores):>5} {p50:>9.0f} {p95:>9.0f} {p99:>9.0f}")
+    finally:
+        if processo is not None:
+            processo.terminate()
+            processo.wait(timeout=10)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Custo da primeira execução e dos reruns de cada segmento, com os módulos que cada um carrega.
+
+Cada segmento roda num processo Python novo (AppTest, sem servidor): mede a
+primeira execução do app.py aberto direto nele, um rerun em seguida e lista
+quais módulos pesados (plotly.express, plotly.subplots, páginas de outros
+segmentos) ficaram carregados. O aquecimento (aquecimento.py) fica desligado
+para não importar nada em paralelo.
+
+Uso:
+    python benchmarks/importacao_segmentos.py
+    python benchmarks/importacao_segmentos.py --repeticoes 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SEGMENTOS = ("Geral", "Mapa", "Canina", "Historico")
+PESADOS = ('plotly.express', 'plotly.subplots', 'plotly.validators.scattermapbox',
+           'paginas.geral', 'paginas.mapa', 'paginas.canina', 'paginas.historico')
+
+
+def filho(segmento):
+    # Processo novo: nada do app ou do plotly carregado além do que o próprio Streamlit traz
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(RAIZ, 'app.py'), default_timeout=120)
+    at.session_state['segment'] = segmento
+    t0 = time.perf_counter()
+    at.run()
+    primeira = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    at.run()
+    rerun = time.perf_counter() - t0
+    if at.exception:
+        raise SystemExit(f"{segmento}: {at.exception}")
+    print(json.dumps({'primeira': primeira * 1e3, 'rerun': rerun * 1e3,
+                      'modulos': [m for m in PESADOS if m in sys.modules]}))
+
+
+def medir(segmento):
+    ambiente = dict(os.environ, VIGILEISH_AQUECER='', VIGILEISH_RASTREIO='', VIGILEISH_INTERVALO_VIGIA='0')
+    saida = subprocess.run([sys.executable, os.path.abspath(__file__), '--filho', segmento], cwd=RAIZ,
+                           env=ambiente, capture_output=True, text=True, check=True)
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeticoes', type=int, default=3, help="processos por segmento (mostra a mediana)")
+    parser.add_argument('--filho', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.filho:
+        filho(args.filho)
+        return
+
+    print(f"{'segmento':<10} {'1ª execução (ms)':>17} {'rerun (ms)':>11}  módulos pesados carregados")
+    for segmento in SEGMENTOS:
+        medidas = [medir(segmento) for _ in range(args.repeticoes)]
+        mediana = lambda campo: sorted(m[campo] for m in medidas)[len(medidas) // 2]  # noqa: E731
+        modulos = ", ".join(medidas[0]['modulos']) or "-"
+        print(f"{segmento:<10} {mediana('primeira'):>17.0f} {mediana('rerun'):>11.0f}  {modulos}")
+
+
+if __name__ == '__main__':
+    main()
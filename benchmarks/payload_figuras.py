@@ -0,0 +1,95 @@
+"""Tamanho do JSON de cada gráfico enviado pelo websocket: formato padrão x compacto.
+
+Monta as figuras de cada segmento como as páginas do app (paginas/) e compara o
+JSON padrão do Plotly (o que st.plotly_chart enviaria) com o de figuras.compactar
+(template enxuto e arrays binários), por gráfico e por página. Cada página tem
+sua meta de redução (METAS, ou --meta para todas); sai com código 1 se alguma
+ficar abaixo, com --exigir.
+
+Uso:
+    python benchmarks/payload_figuras.py
+    python benchmarks/payload_figuras.py --municipio 3106200 --fonte 20 --exigir
+"""
+import argparse
+import logging
+import os
+import sys
+
+import plotly.io as pio
+from streamlit.logger import set_log_level
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import correlacao  # noqa: E402
+import dados  # noqa: E402
+import figuras  # noqa: E402
+
+set_log_level(logging.ERROR)
+
+# Cães chega a 5x: quase tudo ali são números e template. Histórico e Mapa ficam
+# abaixo porque boa parte do JSON são textos próprios de cada figura (rótulos do
+# heatmap, títulos, nomes das regionais, escala de cores), que custam o mesmo nos
+# dois formatos; tirar isso encolheria também o padrão medido.
+METAS = {"Cães": 5.0, "Histórico": 3.5, "Mapa": 4.0}
+
+
+def paginas(conjunto, fonte):
+    # Mesmos pedidos (figuras.pedido) que os segmentos em paginas/ fazem ao abrir
+    df_anual, df_m, df_corr = conjunto.anual, conjunto.regionais, conjunto.correlacoes
+    ano = int(df_anual.index.max())
+
+    def figura(nome, **opcoes):
+        _, construtor, args = figuras.pedido(conjunto, nome, fonte, **opcoes)
+        return construtor.__name__, construtor(*args)
+
+    saida = {
+        "Cães": [figura("Canina/barras"), figura("Canina/sorologias"), figura("Canina/borrifacao")],
+        "Histórico": [figura("Historico/correlacao")],
+    }
+    if not df_corr.empty:
+        saida["Histórico"].append(figura("Historico/defasagens", extra=correlacao.ESCOPO_MUNICIPIO))
+    if not df_m.empty:
+        reg = sorted(df_m.index.unique('Regional'))[0]
+        intervalo = (int(df_m.index.levels[0].min()), conjunto.max_ano)
+        mapa = [figura("Mapa/historico", extra=reg, intervalo=intervalo)]
+        if not figuras.recorte_mapa(conjunto, ano).empty:
+            mapa.insert(0, figura("Mapa/regionais", ano=ano))
+        saida["Mapa"] = mapa
+        saida["Mapa (ano no navegador)"] = [figura("Mapa/regionais_anos", ano=ano)]
+    return saida
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--municipio', default=dados.MUNICIPIO_PADRAO, help="código IBGE (pasta em municipios/)")
+    parser.add_argument('--fonte', type=int, default=14, help="tamanho da fonte dos gráficos (14, 16 ou 20)")
+    parser.add_argument('--meta', type=float, help="redução mínima esperada em todas as páginas de METAS")
+    parser.add_argument('--exigir', action='store_true', help="sai com código 1 se a meta não for atingida")
+    args = parser.parse_args()
+
+    conjunto = dados.carregar_dados(os.path.join(dados.DIR_MUNICIPIOS, args.municipio))
+    abaixo = []
+    print(f"  {'gráfico':<24} {'padrão (B)':>11} {'compacto (B)':>13} {'redução':>8}")
+    for pagina, graficos in paginas(conjunto, args.fonte).items():
+        print(f"\n{pagina}")
+        total_padrao = total_compacto = 0
+        for nome, fig in graficos:
+            padrao = len(pio.to_json(fig, validate=False).encode())
+            compacto = len(figuras.compactar(fig).encode())
+            total_padrao += padrao
+            total_compacto += compacto
+            print(f"  {nome:<24} {padrao:>11} {compacto:>13} {padrao / compacto:>7.1f}x")
+        reducao = total_padrao / total_compacto
+        marca = ""
+        if pagina in METAS:
+            meta = args.meta or METAS[pagina]
+            marca = "  (meta atingida)" if reducao >= meta else f"  (abaixo da meta de {meta:.1f}x)"
+            if reducao < meta:
+                abaixo.append(pagina)
+        print(f"  {'página':<24} {total_padrao:>11} {total_compacto:>13} {reducao:>7.1f}x{marca}")
+
+    if args.exigir and abaixo:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Tempo até o primeiro gráfico do primeiro visitante: `streamlit run app.py` x servidor.py (com aquecimento).
+
+Para cada modo sobe um servidor novo, espera --espera segundos depois de ele
+responder e abre uma sessão que percorre Painel Geral -> Mapa -> Cães ->
+Histórico, medindo cada rerun até o script_finished. Em seguida uma segunda
+sessão repete o roteiro com o processo já aquecido, como referência.
+
+Uso:
+    python benchmarks/primeiro_grafico.py
+    python benchmarks/primeiro_grafico.py --espera 0 --repeticoes 3
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from carga_sessoes import SEGMENTOS, Sessao, iniciar_servidor, porta_livre  # noqa: E402
+
+MODOS = {'streamlit run': None, 'servidor.py': 'servidor.py'}
+ROTEIRO = ("Mapa", "Canina", "Historico")
+
+
+async def percorrer(url):
+    sessao = Sessao(url, random.Random(0))
+    await sessao.conectar()
+    try:
+        await sessao.rerun('Geral')
+        for segmento in ROTEIRO:
+            wid, _, _, fragment_id = sessao.widgets[SEGMENTOS[segmento]]
+            await sessao.rerun(segmento, WidgetState(id=wid, trigger_value=True), fragment_id)
+    finally:
+        await sessao.fechar()
+    return dict(sessao.latencias)
+
+
+def medir(lancador, espera):
+    porta = porta_livre()
+    processo = iniciar_servidor(porta, lancador=lancador)
+    try:
+        time.sleep(espera)
+        url = f"ws://127.0.0.1:{porta}"
+        primeira = asyncio.run(percorrer(url))
+        aquecida = asyncio.run(percorrer(url))
+    finally:
+        processo.kill()
+        processo.wait()
+    return primeira, aquecida
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--espera', type=float, default=5.0, help="segundos entre o servidor responder e a 1ª sessão")
+    parser.add_argument('--repeticoes', type=int, default=1, help="servidores novos por modo (mostra a mediana)")
+    args = parser.parse_args()
+
+    etapas = ('Geral',) + ROTEIRO
+    print(f"{'modo':<14} {'sessão':<9} " + " ".join(f"{e + ' (ms)':>15}" for e in etapas) + f" {'total':>8}")
+    for modo, lancador in MODOS.items():
+        rodadas = [medir(lancador, args.espera) for _ in range(args.repeticoes)]
+        for i, nome in enumerate(("1ª", "aquecida")):
+            medianas = [sorted(r[i][e] for r in rodadas)[len(rodadas) // 2] for e in etapas]
+            print(f"{modo:<14} {nome:<9} " + " ".join(f"{ms:>15.0f}" for ms in medianas) + f" {sum(medianas):>8.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""Gráficos de linha com séries mais finas que a anual: tempo de montagem e JSON enviado, com e sem LTTB.
+
+Os dados do VigiLeish são anuais. Para medir o que acontece com séries por
+mês, semana epidemiológica e dia, as séries anuais do município viram séries
+sintéticas na resolução pedida (o total do ano repartido entre os períodos,
+com ruído e alguns surtos), com o eixo x em anos fracionários, e passam pelos
+mesmos construtores de figuras.py que as páginas usam. Compara a montagem +
+serialização (figuras.compactar) e o tamanho do JSON com a redução de
+reducao.py ligada e desligada (MAX_PONTOS = 0).
+
+Uso:
+    python benchmarks/reducao_series.py
+    python benchmarks/reducao_series.py --max-pontos 500 --repeticoes 5
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from streamlit.logger import set_log_level
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import dados  # noqa: E402
+import figuras  # noqa: E402
+import reducao  # noqa: E402
+
+set_log_level(logging.ERROR)
+
+RESOLUCOES = {'ano': 1, 'mês': 12, 'semana epi': 52, 'dia': 365}
+
+
+def sintetica(df, colunas, periodos, semente=0):
+    """Uma linha por período; x em anos fracionários (1994.0, 1994.25...), como no eixo dos gráficos."""
+    aleatorio = np.random.default_rng(semente)
+    anos = df.index.to_numpy()
+    x = (anos[:, None] + np.arange(periodos)[None, :] / periodos).ravel()
+    saida = {'Ano': x}
+    for coluna in colunas:
+        total = df[coluna].astype('float64').fillna(0).to_numpy()
+        valores = np.repeat(total / periodos, periodos) * aleatorio.gamma(4.0, 0.25, len(x))
+        surtos = aleatorio.random(len(x)) < 0.002
+        valores[surtos] *= 8
+        saida[coluna] = np.round(valores) if periodos == 1 else valores
+    return pd.DataFrame(saida)
+
+
+def graficos(conjunto, periodos, fonte):
+    df_anual, min_ano, max_ano = conjunto.anual, conjunto.min_ano, conjunto.max_ano
+    fatos = sintetica(df_anual, ['Sorologias', 'Borrifados', 'Casos', 'Positivos'], periodos).set_index('Ano')
+    regional = sintetica(conjunto.regionais.xs('Leste', level='Regional'), ['Casos'], periodos, semente=1)
+    merged = fatos[['Casos', 'Positivos']].reset_index()
+    return [
+        ("canina_sorologias", figuras.canina_sorologias, (fatos, min_ano, max_ano, fonte)),
+        ("canina_borrifacao", figuras.canina_borrifacao, (fatos, min_ano, max_ano, fonte)),
+        ("historico_regional", figuras.historico_regional, (regional, 'Leste', (min_ano, max_ano), fonte)),
+        ("historico_correlacao", figuras.historico_correlacao, (merged, min_ano, max_ano, fonte)),
+    ]
+
+
+def medir(construtor, args, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        spec = figuras.compactar(construtor(*args))
+        tempos.append(time.perf_counter() - t0)
+    return sorted(tempos)[len(tempos) // 2] * 1e3, len(spec.encode())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--municipio', default=dados.MUNICIPIO_PADRAO)
+    parser.add_argument('--max-pontos', type=int, default=reducao.MAX_PONTOS, help="pontos por traço com a redução ligada")
+    parser.add_argument('--fonte', type=int, default=16)
+    parser.add_argument('--repeticoes', type=int, default=3, help="montagens por gráfico (mostra a mediana)")
+    args = parser.parse_args()
+
+    conjunto = dados.carregar_dados(os.path.join(dados.DIR_MUNICIPIOS, args.municipio))
+    print(f"{'resolução':<11} {'gráfico':<21} {'pontos':>7} {'sem redução':>20} {'com LTTB':>20}")
+    for resolucao, periodos in RESOLUCOES.items():
+        for nome, construtor, argumentos in graficos(conjunto, periodos, args.fonte):
+            pontos = len(argumentos[0])
+            reducao.MAX_PONTOS = 0
+            ms_sem, bytes_sem = medir(construtor, argumentos, args.repeticoes)
+            reducao.MAX_PONTOS = args.max_pontos
+            ms_com, bytes_com = medir(construtor, argumentos, args.repeticoes)
+            print(f"{resolucao:<11} {nome:<21} {pontos:>7} {ms_sem:>8.1f} ms {bytes_sem / 1024:>6.0f} KiB"
+                  f" {ms_com:>8.1f} ms {bytes_com / 1024:>6.0f} KiB")
+
+
+if __name__ == '__main__':
+    main()
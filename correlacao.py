@@ -0,0 +1,135 @@
+"""Correlação defasada entre as séries caninas e humanas, com IC por bootstrap.
+
+Todos os pares (série canina x série humana x escopo) e todas as defasagens
+são calculados de uma vez: as séries viram matrizes séries x anos e as somas
+da correlação de Pearson saem de produtos matriciais (matmul), inclusive para
+as reamostragens do bootstrap. O resultado fica no Conjunto carregado, então
+o heatmap do Histórico só lê a tabela pronta.
+"""
+import warnings
+
+import numpy as np
+import pandas as pd
+
+# --- 1. PARÂMETROS ---
+SERIES_CANINAS = ('Positivos', 'Taxa_Positividade', 'Eutanasiados', 'Borrifados')
+SERIES_HUMANAS = ('Casos', 'Obitos')
+DEFASAGENS = range(-3, 4)   # anos; positivo = a série canina vem antes da humana
+REAMOSTRAS = 500
+BLOCO = 3                   # bootstrap em blocos de anos seguidos (preserva a autocorrelação)
+MIN_PARES = 8               # com menos anos em comum a correlação fica ausente
+NIVEL = 0.95
+# Elementos (reamostras x defasagens x séries x anos) por lote do bootstrap: séries
+# longas são reamostradas em partes, sem montar todas as reamostras de uma vez
+MAX_ELEMENTOS_LOTE = 4_000_000
+SEMENTE = 0
+ESCOPO_MUNICIPIO = "Município"
+
+
+# --- 2. CÁLCULO EM LOTE ---
+def _defasar(y, defasagens):
+    """(séries, anos) -> (defasagens, séries, anos): na posição t fica y[t + defasagem]."""
+    n_anos = y.shape[1]
+    saida = np.full((len(defasagens),) + y.shape, np.nan)
+    for i, d in enumerate(defasagens):
+        if d >= 0:
+            saida[i, :, :n_anos - d] = y[:, d:]
+        else:
+            saida[i, :, -d:] = y[:, :n_anos + d]
+    return saida
+
+
+def _somas(a, b):
+    # Σ_t a[..., a, t] * b[..., l, b, t] -> (..., L, A, B), como produto de matrizes (BLAS)
+    return np.matmul(a[..., None, :, :], np.swapaxes(b, -1, -2))
+
+
+def _pearson(x, y):
+    """x: (..., A, T), y: (..., L, B, T) com NaN -> r e n com formato (..., L, A, B)."""
+    mx, my = ~np.isnan(x), ~np.isnan(y)
+    x0, y0 = np.where(mx, x, 0), np.where(my, y, 0)
+    mx, my = mx.astype('float64'), my.astype('float64')
+    # Cada soma considera só os anos em que as duas séries do par têm dado
+    n = _somas(mx, my)
+    sx = _somas(x0, my)
+    sy = _somas(mx, y0)
+    sxx = _somas(x0 ** 2, my)
+    syy = _somas(mx, y0 ** 2)
+    sxy = _somas(x0, y0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        r = (n * sxy - sx * sy) / np.sqrt((n * sxx - sx ** 2) * (n * syy - sy ** 2))
+    r[n < MIN_PARES] = np.nan
+    return r, n
+
+
+def _blocos(n_anos, rng):
+    # Índices de anos para cada reamostra: blocos de BLOCO anos seguidos até completar a série
+    n_blocos = -(-n_anos // BLOCO)
+    inicios = rng.integers(0, max(n_anos - BLOCO + 1, 1), size=(REAMOSTRAS, n_blocos))
+    indices = (inicios[:, :, None] + np.arange(BLOCO)).reshape(REAMOSTRAS, -1)[:, :n_anos]
+    return np.minimum(indices, n_anos - 1)
+
+
+def correlacionar(x, y, defasagens=DEFASAGENS, semente=SEMENTE):
+    """Correlação de cada série de x (A, T) com cada série de y (B, T) em cada defasagem.
+
+    Usa as variações anuais (primeira diferença), para que duas séries com a
+    mesma tendência de longo prazo não pareçam correlacionadas só por isso.
+    Devolve r, limite inferior, limite superior e n, todos com formato (L, A, B).
+    """
+    dx, dy = np.diff(x, axis=1), np.diff(y, axis=1)
+    y_def = _defasar(dy, defasagens)
+    r, n = _pearson(dx, y_def)
+
+    # Bootstrap: as mesmas reamostras de anos para todos os pares e defasagens
+    indices = _blocos(dx.shape[1], np.random.default_rng(semente))
+    por_lote = max(1, MAX_ELEMENTOS_LOTE // y_def.size)
+    r_boot = np.concatenate([
+        _pearson(dx[:, lote].transpose(1, 0, 2), y_def[:, :, lote].transpose(2, 0, 1, 3))[0]
+        for lote in (indices[i:i + por_lote] for i in range(0, len(indices), por_lote))])
+    alfa = (1 - NIVEL) / 2
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # pares sem dados suficientes: fatia toda NaN
+        inf, sup = np.nanquantile(r_boot, [alfa, 1 - alfa], axis=0)
+    inf, sup = np.where(np.isnan(r), np.nan, inf), np.where(np.isnan(r), np.nan, sup)
+    return r, inf, sup, n
+
+
+# --- 3. APLICAÇÃO ÀS TABELAS ---
+def calcular(df_anual, df_m):
+    """Tabela longa (Canina, Humana, Escopo, Defasagem, r, IC_inf, IC_sup, n) para o município e cada regional.
+
+    Os dados caninos só existem para o município inteiro; no escopo regional
+    eles são comparados com os casos humanos da regional.
+    """
+    caninas = [c for c in SERIES_CANINAS if c in df_anual.columns]
+    humanas = [c for c in SERIES_HUMANAS if c in df_anual.columns]
+    if df_anual.empty or not caninas or not humanas:
+        return pd.DataFrame(columns=['Canina', 'Humana', 'Escopo', 'Defasagem', 'r', 'IC_inf', 'IC_sup', 'n'])
+
+    anos = df_anual.index
+    x = df_anual[caninas].to_numpy(dtype='float64', na_value=np.nan).T
+    y = [df_anual[humanas].to_numpy(dtype='float64', na_value=np.nan).T]
+    rotulos = [(h, ESCOPO_MUNICIPIO) for h in humanas]
+    if not df_m.empty:
+        casos = df_m['Casos'].unstack('Ano').reindex(columns=anos)
+        y.append(casos.to_numpy(dtype='float64', na_value=np.nan))
+        rotulos += [('Casos', str(regional)) for regional in casos.index]
+
+    r, inf, sup, n = correlacionar(x, np.vstack(y))
+
+    # (L, A, B) -> linhas na ordem defasagem, série canina, série humana/escopo
+    defasagens = list(DEFASAGENS)
+    i_l, i_a, i_b = np.meshgrid(np.arange(len(defasagens)), np.arange(len(caninas)), np.arange(len(rotulos)),
+                                indexing='ij')
+    i_l, i_a, i_b = i_l.ravel(), i_a.ravel(), i_b.ravel()
+    return pd.DataFrame({
+        'Canina': pd.Categorical(np.array(caninas)[i_a], categories=caninas),
+        'Humana': [rotulos[b][0] for b in i_b],
+        'Escopo': [rotulos[b][1] for b in i_b],
+        'Defasagem': np.array(defasagens, dtype='int8')[i_l],
+        'r': r.ravel().astype('float32'),
+        'IC_inf': inf.ravel().astype('float32'),
+        'IC_sup': sup.ravel().astype('float32'),
+        'n': n.ravel().astype('int16'),
+    })
@@ -0,0 +1,585 @@
+"""Camada de dados do VigiLeish: leitura dos CSVs oficiais e cache compilado em disco."""
+import glob
+import hashlib
+import io
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+import alertas
+import correlacao
+import rastreio
+
+# --- 0. CAMINHOS ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Uma partição por município: municipios/<código IBGE>/ com os CSVs abaixo.
+# municipios/municipios.csv é o catálogo (código, nome, UF, órgão e fonte oficial).
+DIR_MUNICIPIOS = os.environ.get('VIGILEISH_MUNICIPIOS_DIR', os.path.join(BASE_DIR, 'municipios'))
+ARQ_CATALOGO = 'municipios.csv'
+
+ARQ_HUMANOS = 'dados_novos.csv'
+ARQ_CANINOS = 'caninos_novos.csv'
+ARQ_VETOR = 'vetor.csv'
+ARQ_COORDENADAS = 'coordenadas_regionais.csv'
+
+MUNICIPIO_PADRAO = os.environ.get('VIGILEISH_MUNICIPIO', '3106200')  # Belo Horizonte
+DIR_PADRAO = os.path.join(DIR_MUNICIPIOS, MUNICIPIO_PADRAO)
+
+# Quantos municípios ficam carregados em memória ao mesmo tempo
+MAX_MUNICIPIOS = int(os.environ.get('VIGILEISH_MAX_MUNICIPIOS', '8'))
+
+# Segundos entre as verificações dos CSVs pelo vigia (ver Vigia); 0 desliga
+INTERVALO_VIGIA = float(os.environ.get('VIGILEISH_INTERVALO_VIGIA', '5'))
+
+# O cache pode ser movido (ex.: volume persistente no deploy) via variável de ambiente
+DIR_CACHE = os.environ.get('VIGILEISH_CACHE_DIR', os.path.join(BASE_DIR, '.cache'))
+
+# Incrementar sempre que a limpeza de alguma tabela mudar, invalidando o cache antigo
+VERSAO_CACHE = 3
+
+
+# --- 1. ESQUEMAS ---
+# Tipos declarados por tabela. Contagens usam inteiros anuláveis: uma célula vazia
+# no boletim continua ausente (NA) em vez de virar zero.
+ESQUEMA_HUMANOS = {
+    'Ano': 'Int16', 'Casos': 'Int32', 'Pop': 'Int32', 'Inc': 'float32',
+    'Prev': 'Int32', 'Obitos': 'Int32', 'Letalidade': 'float32',
+}
+ESQUEMA_CANINOS = {'Ano': 'Int16', 'Sorologias': 'Int32', 'Positivos': 'Int32', 'Eutanasiados': 'Int32'}
+ESQUEMA_VETOR = {'Ano': 'Int16', 'Borrifados': 'Int32'}
+ESQUEMA_COORDENADAS = {'Regional': 'str', 'Lat': 'float64', 'Lon': 'float64'}
+ESQUEMA_CATALOGO = {'Codigo': 'str', 'Municipio': 'str', 'UF': 'str', 'Orgao': 'str', 'Fonte': 'str', 'Link': 'str'}
+
+# Linhas que encerram uma seção do boletim da PBH. Boletins de outros municípios
+# podem não ter esses rodapés: a seção também termina numa linha toda vazia, e
+# notas ou linhas sem rótulo no meio dela são descartadas em ler_secao.
+RODAPES = ('fonte', 'dados atualizados')
+
+
+# --- 2. PARSER DE SEÇÕES ---
+def ler_linhas(caminho):
+    with open(caminho, 'rb') as f:
+        return f.read().decode('iso-8859-1').splitlines()
+
+
+def _primeiro_campo(linha):
+    return linha.split(';', 1)[0].strip()
+
+
+def limites_secao(linhas, rotulo):
+    """Devolve (i, fim): linha do cabeçalho da seção `rotulo` e o fim (exclusivo) do corpo."""
+    rotulo = rotulo.lower()
+    for i, linha in enumerate(linhas):
+        if _primeiro_campo(linha).lower() == rotulo:
+            fim = i + 1
+            while fim < len(linhas):
+                campo = _primeiro_campo(linhas[fim]).lower()
+                if not linhas[fim].strip(' ;\t') or campo.startswith(RODAPES):
+                    break
+                fim += 1
+            return i, fim
+    raise ValueError(f"Seção '{rotulo}' não encontrada")
+
+
+def localizar_secao(linhas, rotulo):
+    """Devolve (cabeçalho, corpo) da seção cujo cabeçalho começa por `rotulo`."""
+    i, fim = limites_secao(linhas, rotulo)
+    return linhas[i], linhas[i + 1:fim]
+
+
+def _linhas_com_chave(corpo):
+    # Só ficam as linhas cuja primeira coluna é um número (o ano): notas como
+    # "* Dados sujeitos a revisão", totais e linhas sem rótulo não chegam ao parser
+    chaves = pd.to_numeric(pd.Series([_primeiro_campo(linha) for linha in corpo], dtype=object), errors='coerce')
+    return [linha for linha, numerica in zip(corpo, chaves.notna()) if numerica]
+
+
+def ler_secao(corpo, esquema):
+    # Separador de milhar e decimal brasileiros tratados dentro do parser C. Os
+    # tipos anuláveis não passam pela conversão nativa, por isso as colunas numéricas
+    # são lidas como float64 e só então reduzidas ao tipo declarado.
+    chave = next(iter(esquema))
+    if esquema[chave] != 'str':
+        corpo = _linhas_com_chave(corpo)
+    leitura = {col: ('float64' if tipo != 'str' else tipo) for col, tipo in esquema.items()}
+    if corpo:
+        df = pd.read_csv(
+            io.StringIO('\n'.join(corpo)), sep=';', header=None, engine='c',
+            names=list(esquema), usecols=range(len(esquema)), dtype=leitura,
+            thousands='.', decimal=',', skipinitialspace=True,
+        )
+    else:
+        df = pd.DataFrame({col: pd.Series(dtype=tipo) for col, tipo in leitura.items()})
+    df = df.dropna(subset=[chave]).astype(esquema)
+    if esquema[chave] == 'Int16':
+        df[chave] = df[chave].astype('int16')
+    return df.reset_index(drop=True)
+
+
+# --- 3. LEITORES (CSV -> TABELAS LIMPAS) ---
+def ler_coordenadas(caminho):
+    _, corpo = localizar_secao(ler_linhas(caminho), 'Regional')
+    df = ler_secao(corpo, ESQUEMA_COORDENADAS)
+    df['Regional'] = df['Regional'].str.strip()
+    return df
+
+
+def regionais_longo(df_reg_raw, df_coords):
+    """Converte a seção regional (uma coluna por ano) na tabela longa do mapa."""
+    nomes = df_reg_raw['Regional'].str.strip().to_numpy()
+    anos = df_reg_raw.columns[1:].astype('int16').to_numpy()
+
+    # Join com a tabela de coordenadas; linhas sem localização (Ignorado, Total) saem
+    pos = pd.Index(df_coords['Regional']).get_indexer(nomes)
+    com_coords = pos >= 0
+    pos = pos[com_coords]
+
+    casos = df_reg_raw.iloc[:, 1:].to_numpy(dtype='float64', na_value=np.nan)[com_coords].ravel()
+    n_anos = len(anos)
+    return pd.DataFrame({
+        'Regional': pd.Categorical(np.repeat(nomes[com_coords], n_anos)),
+        'Ano': np.tile(anos, len(pos)),
+        'Casos': pd.arrays.IntegerArray(np.nan_to_num(casos).astype('int32'), np.isnan(casos)),
+        'Lat': np.repeat(df_coords['Lat'].to_numpy()[pos], n_anos),
+        'Lon': np.repeat(df_coords['Lon'].to_numpy()[pos], n_anos),
+    })
+
+
+def ler_regionais_largo(linhas):
+    # Os anos vêm do cabeçalho da seção; colunas não numéricas (TOTAL) ficam de fora
+    cabecalho, corpo = localizar_secao(linhas, 'Regional')
+    anos = [c.strip() for c in cabecalho.split(';')[1:]]
+    anos = [c for c in anos if c.isdigit()]
+    return ler_secao(corpo, {'Regional': 'str', **{a: 'Int32' for a in anos}})
+
+
+def ler_boletim(caminho, caminho_coords):
+    # Um único read do arquivo; as duas seções são localizadas pelos cabeçalhos
+    linhas = ler_linhas(caminho)
+
+    _, corpo = localizar_secao(linhas, 'Ano')
+    df_h = ler_secao(corpo, ESQUEMA_HUMANOS)
+
+    df_mapa = regionais_longo(ler_regionais_largo(linhas), ler_coordenadas(caminho_coords))
+
+    return {'humanos': df_h, 'regionais': df_mapa}
+
+
+def ler_caninos(caminho):
+    _, corpo = localizar_secao(ler_linhas(caminho), 'Ano')
+    df_c = ler_secao(corpo, ESQUEMA_CANINOS)
+    # Sem sorologias no ano a taxa é indefinida (NA), não zero
+    sorologias = df_c['Sorologias'].astype('float32')
+    taxa = df_c['Positivos'].astype('float32') / sorologias.where(sorologias > 0) * 100
+    df_c['Taxa_Positividade'] = taxa.astype('float32')
+    return {'caninos': df_c}
+
+
+def ler_vetor(caminho):
+    _, corpo = localizar_secao(ler_linhas(caminho), 'Ano')
+    return {'vetor': ler_secao(corpo, ESQUEMA_VETOR)}
+
+
+def ler_catalogo(caminho):
+    _, corpo = localizar_secao(ler_linhas(caminho), 'Codigo')
+    return ler_secao(corpo, ESQUEMA_CATALOGO).set_index('Codigo')
+
+
+# Cada fonte é lida uma vez e produz uma ou mais tabelas compiladas; o cache é
+# invalidado quando qualquer um dos CSVs da fonte muda. Os arquivos são relativos
+# ao diretório do município.
+FONTES = {
+    'boletim': ((ARQ_HUMANOS, ARQ_COORDENADAS), ler_boletim, ('humanos', 'regionais')),
+    'caninos': ((ARQ_CANINOS,), ler_caninos, ('caninos',)),
+    'vetor': ((ARQ_VETOR,), ler_vetor, ('vetor',)),
+}
+
+
+# --- 4. CACHE COMPILADO EM DISCO (ARROW IPC) ---
+def hash_arquivo(caminho):
+    h = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(1 << 20), b''):
+            h.update(bloco)
+    return h.hexdigest()[:16]
+
+
+def _caminho_cache(dir_cache, nome, hash_fonte):
+    return os.path.join(dir_cache, f"{nome}-v{VERSAO_CACHE}-{hash_fonte}.arrow")
+
+
+def _gravar_cache(caminho, df):
+    # Grava em arquivo temporário e troca atomicamente: um processo concorrente
+    # nunca enxerga um arquivo pela metade. Sem compressão para permitir memory-map.
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    tmp = f"{caminho}.{os.getpid()}.tmp"
+    feather.write_feather(df, tmp, compression='uncompressed')
+    os.replace(tmp, caminho)
+
+
+def _limpar_obsoletos(nome, atual):
+    for antigo in glob.glob(os.path.join(os.path.dirname(atual), f"{nome}-*.arrow")):
+        if antigo != atual:
+            try:
+                os.remove(antigo)
+            except OSError:
+                pass
+
+
+def _ler_cache(dir_cache, nomes, hash_fonte):
+    tabelas = {}
+    for nome in nomes:
+        caminho = _caminho_cache(dir_cache, nome, hash_fonte)
+        if not os.path.exists(caminho):
+            return None
+        # split_blocks: uma coluna por bloco, sem consolidar; colunas numpy sem nulos
+        # ficam sobre o memory-map (somente leitura), sem cópia. self_destruct solta
+        # cada coluna Arrow assim que ela vira pandas. Int32 com máscara ainda é copiado.
+        tabela = feather.read_table(caminho, memory_map=True)
+        tabelas[nome] = tabela.to_pandas(split_blocks=True, self_destruct=True)
+        del tabela
+    return tabelas
+
+
+def hash_fonte(fonte, diretorio=DIR_PADRAO):
+    """Hash dos CSVs de uma fonte: muda sempre que algum deles muda."""
+    arquivos, _, _ = FONTES[fonte]
+    return '-'.join(hash_arquivo(os.path.join(diretorio, a)) for a in arquivos)
+
+
+def carregar_fonte(fonte, diretorio=DIR_PADRAO):
+    with rastreio.span('dados.fonte', fonte=fonte):
+        return _carregar_fonte(fonte, diretorio)
+
+
+def _carregar_fonte(fonte, diretorio):
+    arquivos, leitor, nomes = FONTES[fonte]
+    caminhos = [os.path.join(diretorio, a) for a in arquivos]
+    hash_atual = hash_fonte(fonte, diretorio)
+    # Cada município tem sua própria pasta de cache
+    dir_cache = os.path.join(DIR_CACHE, os.path.basename(os.path.normpath(diretorio)))
+
+    try:
+        tabelas = _ler_cache(dir_cache, nomes, hash_atual)
+        if tabelas is not None:
+            rastreio.anotar(origem='cache')
+            return tabelas, hash_atual
+    except (pa.ArrowException, OSError, ValueError) as e:
+        logging.warning(f"Cache corrompido para '{fonte}', reconstruindo: {e}")
+
+    rastreio.anotar(origem='csv')
+    tabelas = leitor(*caminhos)
+    for nome, df in tabelas.items():
+        caminho = _caminho_cache(dir_cache, nome, hash_atual)
+        try:
+            _gravar_cache(caminho, df)
+            _limpar_obsoletos(nome, caminho)
+        except (pa.ArrowException, OSError) as e:
+            # Sem permissão de escrita o painel continua funcionando, só sem o cache
+            logging.warning(f"Não foi possível gravar o cache de '{nome}': {e}")
+    return tabelas, hash_atual
+
+
+# --- 5. TABELA ANUAL DE FATOS ---
+def montar_fatos(df_h, df_c, df_v):
+    """Une humanos, cães e vetor numa tabela indexada por ano (uma linha por ano)."""
+    df_anual = (
+        df_h.set_index('Ano')
+        .join(df_c.set_index('Ano'), how='outer')
+        .join(df_v.set_index('Ano'), how='outer')
+        .sort_index()
+    )
+    df_anual.index = df_anual.index.astype('int16')
+    return df_anual
+
+
+def indexar_regionais(df_mapa):
+    # Índice (Ano, Regional): o mapa lê um ano inteiro com um único .loc
+    return df_mapa.set_index(['Ano', 'Regional']).sort_index()
+
+
+# --- 6. CONJUNTO COMPARTILHADO (SOMENTE LEITURA) ---
+# Um único Conjunto por processo é guardado no armazém e cada sessão recebe uma
+# cópia rasa das tabelas (Conjunto.para_sessao): trocar ou criar colunas mexe só
+# na cópia. Os dados em si não são copiados; os arrays por trás de cada coluna e
+# do índice são somente leitura, então escrever neles (.iloc, .loc, .at, .values)
+# levanta ValueError em vez de alterar o que as outras sessões estão vendo.
+# Tudo pela API pública do pandas, sem ligar o copy-on-write para o processo todo.
+MASCARADOS = (pd.arrays.IntegerArray, pd.arrays.FloatingArray, pd.arrays.BooleanArray)
+
+
+def _somente_leitura(valores):
+    arr = np.array(valores, copy=True)
+    arr.flags.writeable = False
+    return arr
+
+
+def _coluna(serie):
+    """Array da coluna montado sobre buffers somente leitura, com o mesmo dtype."""
+    dtype = serie.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return pd.Categorical.from_codes(_somente_leitura(serie.cat.codes), dtype=dtype)
+    if isinstance(serie.array, MASCARADOS):
+        valores = serie.to_numpy(dtype=dtype.numpy_dtype, na_value=dtype.numpy_dtype.type(0))
+        return type(serie.array)(_somente_leitura(valores), _somente_leitura(serie.isna()))
+    if isinstance(dtype, np.dtype):
+        return _somente_leitura(serie.to_numpy())
+    return serie.array.copy()  # outros tipos de extensão não aparecem nas tabelas do painel
+
+
+def _indice(indice):
+    if isinstance(indice, pd.MultiIndex):
+        # Os códigos do MultiIndex o pandas já guarda como somente leitura
+        return pd.MultiIndex(levels=[_indice(nivel) for nivel in indice.levels], codes=indice.codes,
+                             names=indice.names)
+    if isinstance(indice, pd.RangeIndex):
+        return indice
+    if isinstance(indice, pd.CategoricalIndex):
+        return pd.CategoricalIndex(_coluna(indice.to_series()), name=indice.name)
+    return pd.Index(_somente_leitura(indice), dtype=indice.dtype, name=indice.name, copy=False)
+
+
+def congelar(df):
+    """Cópia de df cujas colunas e índice ficam em arrays somente leitura (um bloco por coluna)."""
+    # copy=False: o DataFrame usa os arrays recebidos, sem consolidar em blocos novos graváveis
+    return pd.DataFrame({coluna: _coluna(df[coluna]) for coluna in df.columns}, index=_indice(df.index),
+                        copy=False)
+
+
+@dataclass(frozen=True)
+class Conjunto:
+    anual: pd.DataFrame       # uma linha por ano (humanos + cães + vetor)
+    regionais: pd.DataFrame   # indexado por (Ano, Regional)
+    correlacoes: pd.DataFrame # formato longo, ver correlacao.calcular
+    min_ano: int
+    max_ano: int
+    versao: str
+
+    @classmethod
+    def vazio(cls):
+        return cls(pd.DataFrame(), pd.DataFrame(), pd.DataFrame(), 1994, 2025, None)
+
+    def para_sessao(self):
+        """Conjunto com cópias rasas das tabelas: a sessão pode trocar colunas sem afetar as outras."""
+        return replace(self, anual=self.anual.copy(deep=False), regionais=self.regionais.copy(deep=False),
+                       correlacoes=self.correlacoes.copy(deep=False))
+
+
+# --- 7. CONJUNTO COMPLETO ---
+def carregar_fontes(diretorio=DIR_PADRAO, fontes=FONTES):
+    """{fonte: (tabelas, hash)} das fontes pedidas, cada uma do seu próprio cache compilado."""
+    return {fonte: carregar_fonte(fonte, diretorio) for fonte in fontes}
+
+
+def carregar_dados(diretorio=DIR_PADRAO):
+    return montar_conjunto(carregar_fontes(diretorio))
+
+
+def montar_conjunto(fontes):
+    """Tabelas derivadas (fatos, alertas, correlações) a partir das fontes já carregadas.
+
+    É a parte barata da carga: quando só um CSV muda, as outras fontes são
+    reaproveitadas e apenas esta etapa é refeita por inteiro.
+    """
+    (boletim, hash_boletim), (caninos, hash_caninos), (vetor, hash_vetor) = (
+        fontes['boletim'], fontes['caninos'], fontes['vetor'])
+    df_h, df_mapa = boletim['humanos'], boletim['regionais']
+    df_c, df_v = caninos['caninos'], vetor['vetor']
+
+    # Identifica o conteúdo carregado; usado como parte da chave dos caches derivados
+    versao = hashlib.sha256(f"{VERSAO_CACHE}-{hash_boletim}-{hash_caninos}-{hash_vetor}".encode()).hexdigest()[:16]
+
+    min_ano_encontrado = int(df_h['Ano'].min())
+    min_ano_global = min(1994, min_ano_encontrado)
+    max_ano_global = int(df_h['Ano'].max())
+
+    # Alertas por ano e por regional calculados uma vez aqui; os reruns só leem as colunas
+    with rastreio.span('alertas'):
+        df_anual, df_m = alertas.calcular(montar_fatos(df_h, df_c, df_v), indexar_regionais(df_mapa))
+    # Idem para as correlações defasadas do Histórico (todas as séries e defasagens num lote)
+    with rastreio.span('correlacao'):
+        df_corr = correlacao.calcular(df_anual, df_m)
+
+    return Conjunto(congelar(df_anual), congelar(df_m), congelar(df_corr), min_ano_global, max_ano_global, versao)
+
+
+# --- 8. ARMAZÉM DE MUNICÍPIOS ---
+class Armazem:
+    """Carrega cada município sob demanda e mantém só os mais usados em memória.
+
+    Na inicialização apenas o catálogo é lido; o custo de abrir o painel não
+    depende de quantos municípios existem em disco.
+    """
+
+    def __init__(self, diretorio=DIR_MUNICIPIOS, max_municipios=MAX_MUNICIPIOS):
+        self.diretorio = diretorio
+        self.max_municipios = max_municipios
+        self._quentes = OrderedDict()
+        self._fontes = {}      # fontes de cada município carregado: {fonte: (tabelas, hash)}
+        self._lock = threading.Lock()
+        self._carregando = {}  # um lock por município: duas sessões não leem o mesmo CSV
+        self._catalogo = None
+
+    def catalogo(self):
+        if self._catalogo is None:
+            self._catalogo = ler_catalogo(os.path.join(self.diretorio, ARQ_CATALOGO))
+        return self._catalogo
+
+    def obter(self, codigo):
+        with self._lock:
+            if codigo in self._quentes:
+                self._quentes.move_to_end(codigo)
+                rastreio.anotar(origem='memoria')
+                return self._quentes[codigo]
+            lock_municipio = self._carregando.setdefault(codigo, threading.Lock())
+
+        # O lock do município sai de _carregando em qualquer saída: carga, acerto ou erro
+        try:
+            with lock_municipio:
+                with self._lock:
+                    if codigo in self._quentes:
+                        return self._quentes[codigo]
+                fontes = carregar_fontes(os.path.join(self.diretorio, codigo))
+                conjunto = montar_conjunto(fontes)
+
+                with self._lock:
+                    self._quentes[codigo] = conjunto
+                    self._fontes[codigo] = fontes
+                    # Sessões que ainda usam um município despejado mantêm sua referência
+                    while len(self._quentes) > self.max_municipios:
+                        despejado, _ = self._quentes.popitem(last=False)
+                        self._fontes.pop(despejado, None)
+        finally:
+            with self._lock:
+                if self._carregando.get(codigo) is lock_municipio:
+                    del self._carregando[codigo]
+        return conjunto
+
+    def atualizar(self, codigo):
+        """Relê só as fontes do município cujos CSVs mudaram e troca o Conjunto de uma vez.
+
+        A leitura e os cálculos acontecem fora do lock; as sessões continuam com o
+        Conjunto anterior até o próximo rerun. Devolve as fontes recarregadas.
+        """
+        with self._lock:
+            fontes = self._fontes.get(codigo)
+        if fontes is None:
+            return []  # não está (mais) carregado
+        diretorio = os.path.join(self.diretorio, codigo)
+        mudaram = [fonte for fonte, (_, hash_atual) in fontes.items() if hash_fonte(fonte, diretorio) != hash_atual]
+        if not mudaram:
+            return []
+
+        novas = {**fontes, **carregar_fontes(diretorio, mudaram)}
+        conjunto = montar_conjunto(novas)
+        with self._lock:
+            # Despejado enquanto recarregava: volta a ser lido do zero no próximo acesso
+            if self._fontes.get(codigo) is fontes:
+                self._quentes[codigo] = conjunto
+                self._fontes[codigo] = novas
+        return mudaram
+
+    def carregados(self):
+        with self._lock:
+            return list(self._quentes)
+
+
+# --- 9. VIGIA DE ARQUIVOS ---
+class Vigia:
+    """Thread de fundo que confere os CSVs dos municípios carregados e recarrega os que mudaram.
+
+    A cada volta compara só data de modificação e tamanho (os.stat); o hash do
+    conteúdo é calculado em Armazem.atualizar apenas quando algo mudou. Um
+    arquivo só é relido depois de ficar igual por uma volta inteira, para não
+    pegar uma gravação pela metade.
+    """
+
+    def __init__(self, armazem, intervalo=INTERVALO_VIGIA):
+        self.armazem = armazem
+        self.intervalo = intervalo
+        self._vistas = {}       # assinatura de cada município na última volta
+        self._conferidas = {}   # assinatura já comparada com os hashes carregados
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._rodar, name='vigileish-vigia', daemon=True)
+
+    def iniciar(self):
+        if self.intervalo > 0:
+            self._thread.start()
+        return self
+
+    def parar(self):
+        self._parar.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _assinatura(self, codigo):
+        diretorio = os.path.join(self.armazem.diretorio, codigo)
+        assinatura = []
+        for arquivos, _, _ in FONTES.values():
+            for arquivo in arquivos:
+                try:
+                    info = os.stat(os.path.join(diretorio, arquivo))
+                    assinatura.append((info.st_mtime_ns, info.st_size))
+                except OSError:
+                    assinatura.append(None)
+        return tuple(assinatura)
+
+    def verificar(self):
+        """Uma volta do vigia; devolve {código: fontes recarregadas}."""
+        recarregados = {}
+        carregados = self.armazem.carregados()
+        for codigo in list(self._vistas):
+            if codigo not in carregados:
+                self._vistas.pop(codigo)
+                self._conferidas.pop(codigo, None)
+
+        for codigo in carregados:
+            assinatura = self._assinatura(codigo)
+            if self._vistas.get(codigo) != assinatura:
+                self._vistas[codigo] = assinatura  # mudou nesta volta: espera estabilizar
+                continue
+            if self._conferidas.get(codigo) == assinatura:
+                continue
+            self._conferidas[codigo] = assinatura
+
+            rastreio.iniciar_rerun('vigia', municipio=codigo)
+            try:
+                with rastreio.span('vigia.atualizar'):
+                    mudaram = self.armazem.atualizar(codigo)
+            except Exception:
+                # Um CSV com problema não derruba o vigia; o Conjunto anterior continua valendo
+                logging.exception(f"Falha ao recarregar o município {codigo}")
+                mudaram = []
+            rastreio.marcar(fontes=mudaram)
+            rastreio.finalizar_rerun()
+            if mudaram:
+                logging.info(f"Município {codigo}: fontes recarregadas {mudaram}")
+                recarregados[codigo] = mudaram
+        return recarregados
+
+    def _rodar(self):
+        while not self._parar.wait(self.intervalo):
+            self.verificar()
+
+
+# --- 10. ARMAZÉM DO PROCESSO ---
+_armazem = None
+_lock_armazem = threading.Lock()
+
+
+def armazem_do_processo():
+    """Armazém único do processo, com o vigia já rodando; o app e o aquecimento usam o mesmo."""
+    global _armazem
+    with _lock_armazem:
+        if _armazem is None:
+            _armazem = Armazem()
+            Vigia(_armazem).iniciar()
+        return _armazem
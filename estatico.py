@@ -0,0 +1,399 @@
+"""Snapshot estático do painel: cada segmento x ano x tamanho de fonte em HTML/JSON.
+
+Para picos de acesso (ex.: link na página da prefeitura), um servidor estático
+entrega as páginas sem rodar Python por visitante. As tabelas vêm de
+dados.carregar_dados, os gráficos dos mesmos construtores de figuras.py (no
+formato compacto) e os textos de apresentacao.py, então o snapshot mostra os
+mesmos números do painel ao vivo.
+
+Os gráficos ficam em arquivos JSON separados (graficos/), compartilhados pelas
+páginas de todos os anos: o navegador baixa cada um uma vez. Cada saída depende
+só das fontes (dados.FONTES) que ela usa; o manifesto guarda o hash dessas
+fontes e uma nova execução só reescreve as saídas cujas fontes mudaram. Se
+nenhum CSV mudou, os dados nem são carregados.
+
+Uso:
+    python estatico.py
+    python estatico.py --municipio todos --saida site --url-app https://vigileish.exemplo.org
+    python estatico.py --municipio 3106200 --fontes 14 20 --forcar
+    python -m http.server -d site     # para conferir localmente
+"""
+import argparse
+import hashlib
+import html
+import json
+import os
+import shutil
+
+import plotly
+
+import apresentacao
+import dados
+import figuras
+
+# --- 1. PARÂMETROS ---
+# Muda quando o formato das páginas muda: força a reconstrução de tudo
+VERSAO_ESTATICO = 1
+ARQ_MANIFESTO = 'manifesto.json'
+
+# Tamanho da fonte dos gráficos -> (rótulo, escala do texto), como na sidebar do app.py
+TAMANHOS = {14: ("Padrão", "100%"), 16: ("Grande", "125%"), 20: ("Extra Grande", "150%")}
+SEGMENTOS = [('geral', "Painel Geral"), ('mapa', "Mapa"), ('canina', "Cães"), ('historico', "Histórico")]
+
+# Fontes de que cada saída depende. A tabela anual junta as três; as regionais
+# vêm só do boletim. 'anos' é a lista de anos da tabela anual (seletor de ano e
+# redirecionamento do index.html), que também junta as três: uma página que só
+# mostra dados do boletim é refeita quando um ano entra ou sai de qualquer fonte,
+# mas não quando só os valores de caninos ou vetor mudam.
+TODAS = ('boletim', 'caninos', 'vetor')
+SO_BOLETIM = ('boletim',)
+BOLETIM_E_ANOS = ('boletim', 'anos')
+
+PLOTLY_JS = os.path.join(os.path.dirname(plotly.__file__), 'package_data', 'plotly.min.js')
+
+ESTILO = """
+@import url('https://fonts.googleapis.com/css2?family=Lora:ital,wght@0,400;0,700;1,400&display=swap');
+body { margin: 0 auto; max-width: 1200px; padding: 0 20px 40px; font-family: 'Lora', serif; color: #1e293b; }
+h2, h3 { color: #064E3B; }
+a { color: #064E3B; }
+.header-container { background-color: #064E3B; padding: 40px 20px; border-radius: 8px; margin: 20px 0 30px;
+                    text-align: center; border-bottom: 4px solid #C2410C; box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1); }
+.header-title { color: #ffffff; font-size: 2.2rem; margin: 0; }
+.header-subtitle { color: #dcfce7; margin-top: 10px; font-size: 1.0rem; font-style: italic; }
+nav { display: flex; flex-wrap: wrap; gap: 8px; align-items: center; margin-bottom: 24px; }
+nav a.botao { flex: 1; text-align: center; padding: 8px; border: 1px solid #064E3B; border-radius: 6px;
+              text-decoration: none; font-weight: 600; }
+nav a.botao.ativo { background: #064E3B; color: #ffffff; }
+select { font: inherit; padding: 6px; border: 1px solid #5D3A9B; border-radius: 6px; background: #ffffff; }
+.fontes a { margin-left: 8px; }
+.fontes a.ativo { font-weight: 700; text-decoration: none; }
+.info-box { background-color: #f0fdf4; border-left: 5px solid #117733; padding: 15px; border-radius: 5px;
+            margin-bottom: 20px; font-size: 0.95rem; line-height: 1.6; }
+.info-box ul { list-style-type: none; padding-left: 5px; margin-top: 10px; }
+.info-box li { margin-bottom: 10px; }
+.aviso { background: #fff7ed; border-left: 5px solid #C2410C; padding: 12px 15px; border-radius: 5px; margin: 12px 0; }
+.grafico { min-height: 450px; margin-bottom: 24px; }
+footer { color: #64748b; font-size: 0.85rem; margin-top: 40px; }
+""" + apresentacao.CSS_CARTOES
+
+# Busca o JSON de cada gráfico; os seletores (regional, escopo) só trocam o arquivo
+SCRIPT = """
+function desenhar(div) {
+    fetch(div.dataset.src).then(r => r.json()).then(fig => {
+        fig.config = {responsive: true, displaylogo: false};
+        Plotly.react(div, fig);
+    });
+}
+document.querySelectorAll(".grafico").forEach(desenhar);
+document.querySelectorAll("select[data-alvo]").forEach(sel => sel.addEventListener("change", () => {
+    const div = document.getElementById(sel.dataset.alvo);
+    div.dataset.src = sel.value;
+    desenhar(div);
+}));
+"""
+
+
+# --- 2. GRÁFICOS (JSON) ---
+def _grafico(conjunto, nome, f, **opcoes):
+    # Mesma chave e argumentos que as páginas do app usam (figuras.pedido); a
+    # tabela só é filtrada quando o arquivo precisa ser gerado
+    def gerar():
+        _, construtor, args = figuras.pedido(conjunto, nome, f, **opcoes)
+        return figuras.compactar(construtor(*args))
+    return gerar
+
+
+def graficos(conjunto, tamanhos):
+    """(caminho, fontes, gerar) de cada gráfico, com os mesmos recortes das páginas do app (paginas/)."""
+    df_m = conjunto.regionais
+    saidas = []
+    for f in tamanhos:
+        saidas += [
+            (f"graficos/canina_barras-{f}.json", TODAS, _grafico(conjunto, "Canina/barras", f)),
+            (f"graficos/canina_sorologias-{f}.json", TODAS, _grafico(conjunto, "Canina/sorologias", f)),
+            (f"graficos/canina_borrifacao-{f}.json", TODAS, _grafico(conjunto, "Canina/borrifacao", f)),
+            (f"graficos/correlacao-{f}.json", TODAS, _grafico(conjunto, "Historico/correlacao", f)),
+        ]
+        for i, escopo in enumerate(_escopos(conjunto)):
+            saidas.append((f"graficos/defasagens-{i}-{f}.json", TODAS,
+                           _grafico(conjunto, "Historico/defasagens", f, extra=escopo)))
+        if df_m.empty:
+            continue
+        for ano in _anos_mapa(conjunto):
+            saidas.append((f"graficos/mapa-{ano}-{f}.json", SO_BOLETIM, _grafico(conjunto, "Mapa/regionais", f, ano=ano)))
+        # Período completo: o filtro de período fica só no painel ao vivo
+        intervalo = (int(df_m.index.levels[0].min()), conjunto.max_ano)
+        for i, regional in enumerate(_regionais(conjunto)):
+            saidas.append((f"graficos/regional-{i}-{f}.json", SO_BOLETIM,
+                           _grafico(conjunto, "Mapa/historico", f, extra=regional, intervalo=intervalo)))
+    return saidas
+
+
+def _anos_mapa(conjunto):
+    df_m = conjunto.regionais
+    return [int(a) for a in df_m.index.unique('Ano') if df_m.loc[a]['Casos'].notna().any()]
+
+
+def _regionais(conjunto):
+    return sorted(conjunto.regionais.index.unique('Regional').tolist())
+
+
+def _escopos(conjunto):
+    df_corr = conjunto.correlacoes
+    return [] if df_corr.empty else df_corr['Escopo'].unique().tolist()
+
+
+# --- 3. PÁGINAS (HTML) ---
+def _nome(segmento, ano, f):
+    return f"{segmento}-{ano}-{f}.html"
+
+
+def _div_grafico(src, id_=None):
+    atributo_id = f' id="{id_}"' if id_ else ""
+    return f'<div class="grafico"{atributo_id} data-src="{src}"></div>'
+
+
+def _seletor(rotulo, alvo, opcoes):
+    itens = "".join(f'<option value="{valor}">{html.escape(str(texto))}</option>' for valor, texto in opcoes)
+    return f'<p><label>{rotulo} <select data-alvo="{alvo}">{itens}</select></label></p>'
+
+
+def corpo_geral(conjunto, ano, f, kpis):
+    partes = [f"<h2>Visão Consolidada | {ano}</h2>"]
+    valores = kpis.get(ano)
+    for titulo, info, itens in apresentacao.GRUPOS_KPI:
+        partes += [f"<h5>{titulo}</h5>", info, '<div class="linha">']
+        for coluna, rotulo, _, _ in itens:
+            valor, nota, alerta = valores[coluna] if valores else ("0", "", False)
+            classe = "card alta" if alerta else "card"
+            partes.append(f'<div class="{classe}"><p class="rotulo">{rotulo}</p>'
+                          f'<p class="valor">{valor}</p><p class="nota">{html.escape(nota)}</p></div>')
+        partes.append("</div>")
+    return "\n".join(partes)
+
+
+def corpo_mapa(conjunto, ano, f):
+    df_m, fmt_int = conjunto.regionais, apresentacao.fmt_int
+    partes = [f"<h2>Distribuição Geográfica | {ano}</h2>",
+              '<div class="info-box">Círculos maiores e mais escuros indicam <b>mais casos</b>; '
+              'o halo laranja marca regionais com casos <b>acima do esperado</b> para o ano.</div>']
+    if not df_m.empty and ano in _anos_mapa(conjunto):
+        partes.append(_div_grafico(f"graficos/mapa-{ano}-{f}.json"))
+        df_f = df_m.loc[ano].reset_index().dropna(subset=['Casos'])
+        em_alerta = df_f[df_f['Alerta']]
+        if not em_alerta.empty:
+            partes.append(f'<div class="aviso">Acima do esperado em {ano}: ' + "; ".join(
+                f"<b>{html.escape(r.Regional)}</b> ({fmt_int(r.Casos)} casos, esperado até {fmt_int(r.Limiar)})"
+                for r in em_alerta.itertuples()) + "</div>")
+    else:
+        partes.append('<div class="info-box">Sem dados regionais para o ano selecionado.</div>')
+
+    if not df_m.empty:
+        regionais = _regionais(conjunto)
+        partes += ["<h3>Histórico por Regional</h3>",
+                   _seletor("Selecione a Regional:", "regional",
+                            [(f"graficos/regional-{i}-{f}.json", r) for i, r in enumerate(regionais)]),
+                   _div_grafico(f"graficos/regional-0-{f}.json", "regional")]
+    return "\n".join(partes)
+
+
+def corpo_canina(conjunto, ano, f):
+    return "\n".join([
+        "<h2>Vigilância Canina e Controle Vetorial</h2>",
+        _div_grafico(f"graficos/canina_barras-{f}.json"),
+        _div_grafico(f"graficos/canina_sorologias-{f}.json"),
+        "<h3>Controle Químico (Imóveis Borrifados)</h3>",
+        _div_grafico(f"graficos/canina_borrifacao-{f}.json"),
+    ])
+
+
+def corpo_historico(conjunto, ano, f):
+    partes = ["<h2>Análise de Tendência: Humanos vs Caninos</h2>",
+              _div_grafico(f"graficos/correlacao-{f}.json")]
+    escopos = _escopos(conjunto)
+    if escopos:
+        partes += ["<h3>Os cães antecipam os casos humanos?</h3>",
+                   '<div class="info-box">Defasagem <b>positiva</b> significa que a série dos cães vem antes. '
+                   'O asterisco (*) marca valores cujo intervalo de confiança de 95% não inclui o zero.</div>',
+                   _seletor("Escopo:", "defasagens",
+                            [(f"graficos/defasagens-{i}-{f}.json", e) for i, e in enumerate(escopos)]),
+                   _div_grafico(f"graficos/defasagens-0-{f}.json", "defasagens")]
+    return "\n".join(partes)
+
+
+def pagina(info, segmento, ano, f, anos, tamanhos, corpo, url_app):
+    rotulo_seg = dict(SEGMENTOS)[segmento]
+    botoes = "".join(f'<a class="botao{" ativo" if s == segmento else ""}" href="{_nome(s, ano, f)}">{r}</a>'
+                     for s, r in SEGMENTOS)
+    opcoes_ano = "".join(f'<option value="{_nome(segmento, a, f)}"{" selected" if a == ano else ""}>{a}</option>'
+                         for a in anos)
+    fontes = "".join(f'<a{" class=ativo" if t == f else ""} href="{_nome(segmento, ano, t)}">{r}</a>'
+                     for t, (r, _) in TAMANHOS.items() if t in tamanhos)
+    ao_vivo = f' · <a href="{html.escape(url_app)}">Painel interativo</a>' if url_app else ""
+    municipio = html.escape(info['Municipio'])
+    return f"""<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>VigiLeish | {municipio} | {rotulo_seg} {ano}</title>
+<link rel="stylesheet" href="../estilo.css">
+<style>html {{ font-size: {TAMANHOS[f][1]}; }}</style>
+<script src="../plotly.min.js"></script>
+</head>
+<body>
+<div class="header-container">
+    <h1 class="header-title">VigiLeish: Painel de Monitoramento</h1>
+    <p class="header-subtitle">Vigilância Epidemiológica de Leishmaniose Visceral em {municipio}</p>
+</div>
+<nav>
+    {botoes}
+    <select aria-label="Ano" onchange="location.href = this.value">{opcoes_ano}</select>
+</nav>
+<p class="fontes">Tamanho do texto:{fontes}</p>
+{corpo}
+<footer>
+    Fonte: {html.escape(info['Fonte'])} · <a href="{html.escape(info['Link'])}">Informações Oficiais ({html.escape(info['Orgao'])})</a>{ao_vivo}<br>
+    Versão estática gerada a partir dos dados oficiais; filtros de período e detalhes ficam no painel interativo.
+</footer>
+<script>{SCRIPT}</script>
+</body>
+</html>
+"""
+
+
+def paginas(conjunto, info, tamanhos, url_app):
+    """(caminho, fontes, gerar) de cada página segmento x ano x fonte."""
+    anos = sorted((int(a) for a in conjunto.anual.index), reverse=True)
+    kpis = apresentacao.kpis_por_ano(conjunto.anual)
+    corpos = {
+        'geral': (TODAS, lambda ano, f: corpo_geral(conjunto, ano, f, kpis)),
+        'mapa': (BOLETIM_E_ANOS, lambda ano, f: corpo_mapa(conjunto, ano, f)),
+        'canina': (BOLETIM_E_ANOS, lambda ano, f: corpo_canina(conjunto, ano, f)),
+        'historico': (BOLETIM_E_ANOS, lambda ano, f: corpo_historico(conjunto, ano, f)),
+    }
+    saidas = []
+    for segmento, (fontes, corpo) in corpos.items():
+        for ano in anos:
+            for f in tamanhos:
+                gerar = (lambda segmento=segmento, ano=ano, f=f, corpo=corpo:
+                         pagina(info, segmento, ano, f, anos, tamanhos, corpo(ano, f), url_app))
+                saidas.append((_nome(segmento, ano, f), fontes, gerar))
+    # Entrada do município: painel geral do último ano, fonte padrão
+    inicio = _nome('geral', anos[0], tamanhos[0]) if anos else None
+    if inicio:
+        saidas.append(("index.html", BOLETIM_E_ANOS,
+                       lambda: f'<!DOCTYPE html><meta charset="utf-8"><meta http-equiv="refresh" content="0; url={inicio}">'))
+    return saidas
+
+
+# --- 4. CONSTRUÇÃO INCREMENTAL ---
+def _chave(caminho, fontes, hashes):
+    texto = "-".join([str(VERSAO_ESTATICO), caminho] + [hashes[fonte] for fonte in fontes])
+    return hashlib.sha256(texto.encode()).hexdigest()[:16]
+
+
+def _gravar(caminho, texto):
+    # Escrita atômica: o servidor nunca entrega um arquivo pela metade
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    tmp = f"{caminho}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(texto)
+    os.replace(tmp, caminho)
+
+
+def _ler_manifesto(destino):
+    try:
+        with open(os.path.join(destino, ARQ_MANIFESTO), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def construir_municipio(codigo, info, saida, tamanhos, url_app='', forcar=False):
+    """Gera (ou atualiza) site/<código>/; devolve (geradas, mantidas, removidas)."""
+    diretorio = os.path.join(dados.DIR_MUNICIPIOS, codigo)
+    destino = os.path.join(saida, codigo)
+    hashes = {fonte: dados.hash_fonte(fonte, diretorio) for fonte in dados.FONTES}
+    # Opções que mudam o conteúdo de todas as páginas
+    config = json.dumps([VERSAO_ESTATICO, list(tamanhos), url_app, dict(info)], ensure_ascii=False)
+
+    anterior = _ler_manifesto(destino)
+    anteriores = anterior.get('saidas', {}) if anterior.get('config') == config and not forcar else {}
+
+    def existe(caminho):
+        return os.path.exists(os.path.join(destino, caminho))
+
+    if anteriores and anterior.get('fontes') == hashes and all(existe(c) for c in anteriores):
+        return 0, len(anteriores), 0
+
+    conjunto = dados.carregar_dados(diretorio)
+    anos = ",".join(str(int(a)) for a in conjunto.anual.index)
+    chaves = {**hashes, 'anos': hashlib.sha256(anos.encode()).hexdigest()[:16]}
+    novas, geradas = {}, 0
+    for caminho, fontes, gerar in graficos(conjunto, tamanhos) + paginas(conjunto, info, tamanhos, url_app):
+        chave = _chave(caminho, fontes, chaves)
+        novas[caminho] = chave
+        if anteriores.get(caminho) == chave and existe(caminho):
+            continue
+        _gravar(os.path.join(destino, caminho), gerar())
+        geradas += 1
+
+    # Saídas que deixaram de existir (ano ou regional removidos do boletim)
+    removidas = 0
+    for caminho in anterior.get('saidas', {}):
+        if caminho not in novas and existe(caminho):
+            os.remove(os.path.join(destino, caminho))
+            removidas += 1
+
+    _gravar(os.path.join(destino, ARQ_MANIFESTO),
+            json.dumps({'config': config, 'fontes': hashes, 'saidas': novas}, ensure_ascii=False, indent=1))
+    return geradas, len(novas) - geradas, removidas
+
+
+def construir_raiz(saida, catalogo):
+    # Recursos comuns a todos os municípios e a lista dos que já foram gerados
+    codigos = [c for c in catalogo.index if os.path.exists(os.path.join(saida, c, ARQ_MANIFESTO))]
+    destino_js = os.path.join(saida, 'plotly.min.js')
+    if not os.path.exists(destino_js) or os.path.getsize(destino_js) != os.path.getsize(PLOTLY_JS):
+        os.makedirs(saida, exist_ok=True)
+        shutil.copyfile(PLOTLY_JS, destino_js)
+    _gravar(os.path.join(saida, 'estilo.css'), ESTILO)
+
+    itens = "".join(f'<li><a href="{c}/index.html">{html.escape(catalogo.at[c, "Municipio"])} '
+                    f'({html.escape(catalogo.at[c, "UF"])})</a></li>'
+                    for c in codigos)
+    _gravar(os.path.join(saida, 'index.html'), f"""<!DOCTYPE html>
+<html lang="pt-BR">
+<head><meta charset="utf-8"><title>VigiLeish</title><link rel="stylesheet" href="estilo.css"></head>
+<body>
+<div class="header-container"><h1 class="header-title">VigiLeish: Painel de Monitoramento</h1></div>
+<ul>{itens}</ul>
+</body>
+</html>
+""")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--municipio', default=dados.MUNICIPIO_PADRAO,
+                        help="código IBGE (pasta em municipios/) ou 'todos'")
+    parser.add_argument('--saida', default=os.path.join(dados.BASE_DIR, 'site'), help="pasta do site gerado")
+    parser.add_argument('--fontes', type=int, nargs='+', default=list(TAMANHOS), choices=list(TAMANHOS),
+                        help="tamanhos de fonte dos gráficos a gerar")
+    parser.add_argument('--url-app', default='', help="endereço do painel ao vivo, para o link no rodapé")
+    parser.add_argument('--forcar', action='store_true', help="reconstrói tudo, mesmo sem mudança nos CSVs")
+    args = parser.parse_args()
+
+    catalogo = dados.ler_catalogo(os.path.join(dados.DIR_MUNICIPIOS, dados.ARQ_CATALOGO))
+    codigos = catalogo.index.tolist() if args.municipio == 'todos' else [args.municipio]
+
+    for codigo in codigos:
+        geradas, mantidas, removidas = construir_municipio(codigo, catalogo.loc[codigo], args.saida,
+                                                           args.fontes, args.url_app, args.forcar)
+        print(f"{codigo}: {geradas} arquivos gerados, {mantidas} sem mudança, {removidas} removidos")
+    construir_raiz(args.saida, catalogo)
+
+
+if __name__ == '__main__':
+    main()
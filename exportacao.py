@@ -0,0 +1,244 @@
+"""Exportação dos dados por trás de cada vista do painel para XLSX e CSV.
+
+Cada vista (ver VISTAS) devolve a tabela que o gráfico ou os indicadores da
+tela usam, já com os filtros aplicados (ano, regional, período, escopo). Os
+arquivos são gravados em disco em lotes de linhas, um município por vez: o
+XLSX usa o modo constant_memory do xlsxwriter, que descarrega cada linha
+assim que ela é escrita, e o CSV é anexado lote a lote. O arquivo pronto fica
+em DIR_EXPORTACOES com o nome derivado da combinação de filtros e dos hashes
+dos CSVs, então a segunda sessão que pede a mesma exportação só lê o arquivo,
+sem carregar nenhum município.
+"""
+import csv
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+import dados
+import rastreio
+
+# --- 1. PARÂMETROS ---
+DIR_EXPORTACOES = os.path.join(dados.DIR_CACHE, 'exportacoes')
+# Espaço em disco das exportações prontas; as mais antigas saem primeiro
+MAX_BYTES = int(os.environ.get('VIGILEISH_CACHE_EXPORTACOES_MB', '256')) * 1024 * 1024
+LOTE = 5000  # linhas convertidas e gravadas por vez
+
+FORMATOS = {
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'csv': 'text/csv',
+}
+
+_lock = threading.Lock()
+_gerando = {}  # um lock por arquivo: duas sessões não geram a mesma exportação
+
+
+# --- 2. TABELAS DE CADA VISTA ---
+# Recebem o Conjunto de um município e os filtros da tela; devolvem um DataFrame
+# com o índice já virado coluna. ano=None é a vista com todos os anos (navegador).
+def _geral(conjunto, ano=None):
+    df = conjunto.anual
+    if ano is not None:
+        df = df.loc[[ano]] if ano in df.index else df.iloc[:0]
+    return df.reset_index()
+
+
+def _mapa(conjunto, ano=None):
+    df = conjunto.regionais
+    if ano is not None:
+        df = df.loc[[ano]] if ano in df.index.levels[0] else df.iloc[:0]
+    return df.reset_index().dropna(subset=['Casos'])
+
+
+def _regional(conjunto, regional, intervalo):
+    df = conjunto.regionais
+    if regional not in df.index.unique('Regional'):
+        return df.iloc[:0].reset_index()
+    return df.xs(regional, level='Regional', drop_level=False).loc[intervalo[0]:intervalo[1]].reset_index()
+
+
+def _canina(conjunto):
+    colunas = ['Positivos', 'Eutanasiados', 'Sorologias', 'Taxa_Positividade', 'Borrifados']
+    return conjunto.anual.loc[conjunto.min_ano:conjunto.max_ano, colunas].reset_index()
+
+
+def _historico(conjunto):
+    return conjunto.anual.loc[conjunto.min_ano:conjunto.max_ano, ['Casos', 'Positivos']].reset_index()
+
+
+def _defasagens(conjunto, escopo):
+    df = conjunto.correlacoes
+    return df[df['Escopo'] == escopo]
+
+
+# Vista -> (nome da aba no XLSX, função)
+VISTAS = {
+    'geral': ('Indicadores', _geral),
+    'mapa': ('Regionais', _mapa),
+    'regional': ('Historico regional', _regional),
+    'canina': ('Caes e controle', _canina),
+    'historico': ('Humanos x caes', _historico),
+    'defasagens': ('Correlacoes', _defasagens),
+}
+
+
+def tabela(conjunto, vista, **filtros):
+    if conjunto.anual.empty:
+        return conjunto.anual
+    return VISTAS[vista][1](conjunto, **filtros)
+
+
+# --- 3. ESCRITA EM LOTES ---
+def _lotes(df):
+    """Listas de linhas com tipos nativos do Python (NA -> None), LOTE linhas por vez."""
+    for inicio in range(0, len(df), LOTE):
+        bloco = df.iloc[inicio:inicio + LOTE]
+        colunas = []
+        for _, serie in bloco.items():
+            if serie.dtype == np.float32:
+                # float32 -> float64 traria ruído de representação (0.1 -> 0.100000001)
+                serie = serie.astype('float64').round(6)
+            colunas.append(serie.astype(object).where(serie.notna(), None).tolist())
+        yield list(zip(*colunas))
+
+
+def _conjunto(armazem, codigo):
+    # Município já em memória: usa o do armazém, antes sincronizado com os CSVs
+    # (o nome do arquivo vem dos hashes atuais, ver exportar). Os demais são lidos
+    # só para esta exportação, sem entrar no armazém nem despejar os das outras sessões.
+    if codigo in armazem.carregados():
+        armazem.atualizar(codigo)
+        return armazem.obter(codigo)
+    return dados.carregar_dados(os.path.join(armazem.diretorio, codigo))
+
+
+def _tabelas(armazem, codigos, vista, filtros):
+    """(código, DataFrame) de cada município, carregando um de cada vez."""
+    for codigo in codigos:
+        yield codigo, tabela(_conjunto(armazem, codigo), vista, **filtros)
+
+
+def _gravar_xlsx(caminho, armazem, codigos, vista, filtros):
+    import xlsxwriter
+
+    varios = len(codigos) > 1
+    with xlsxwriter.Workbook(caminho, {'constant_memory': True, 'tmpdir': DIR_EXPORTACOES}) as livro:
+        aba = livro.add_worksheet(VISTAS[vista][0])
+        negrito = livro.add_format({'bold': True})
+        linha = 0
+        for codigo, df in _tabelas(armazem, codigos, vista, filtros):
+            if linha == 0:
+                aba.write_row(0, 0, (['Municipio'] if varios else []) + list(df.columns), negrito)
+                aba.freeze_panes(1, 0)
+                linha = 1
+            for lote in _lotes(df):
+                for valores in lote:
+                    aba.write_row(linha, 0, (codigo,) + valores if varios else valores)
+                    linha += 1
+
+
+def _gravar_csv(caminho, armazem, codigos, vista, filtros):
+    # Separador ';' e vírgula decimal, como os boletins e o Excel em português;
+    # o BOM faz o Excel reconhecer o UTF-8
+    varios = len(codigos) > 1
+    with open(caminho, 'w', encoding='utf-8-sig', newline='') as f:
+        escritor = csv.writer(f, delimiter=';')
+        cabecalho = False
+        for codigo, df in _tabelas(armazem, codigos, vista, filtros):
+            if not cabecalho:
+                escritor.writerow((['Municipio'] if varios else []) + list(df.columns))
+                cabecalho = True
+            for lote in _lotes(df):
+                escritor.writerows(((codigo,) + _csv(valores) if varios else _csv(valores)) for valores in lote)
+
+
+def _csv(valores):
+    return tuple(str(v).replace('.', ',') if isinstance(v, float) else v for v in valores)
+
+
+GRAVADORES = {'xlsx': _gravar_xlsx, 'csv': _gravar_csv}
+
+
+# --- 4. CACHE EM DISCO ---
+def _nome_arquivo(vista, formato, filtros, versoes):
+    chave = repr((vista, sorted(filtros.items()), versoes))
+    return f"{vista}-{hashlib.sha256(chave.encode()).hexdigest()[:16]}.{formato}"
+
+
+def _limitar_disco():
+    arquivos = []
+    for nome in os.listdir(DIR_EXPORTACOES):
+        caminho = os.path.join(DIR_EXPORTACOES, nome)
+        if nome.endswith(tuple(FORMATOS)):
+            info = os.stat(caminho)
+            arquivos.append((info.st_mtime, info.st_size, caminho))
+    total = sum(tamanho for _, tamanho, _ in arquivos)
+    for _, tamanho, caminho in sorted(arquivos):
+        if total <= MAX_BYTES:
+            break
+        try:
+            os.remove(caminho)
+            total -= tamanho
+        except OSError:
+            pass
+
+
+def _gerar(caminho, armazem, codigos, vista, formato, filtros):
+    rastreio.iniciar_rerun('exportacao', vista=vista, formato=formato, municipios=len(codigos))
+    try:
+        with rastreio.span('exportacao.gravar'):
+            fd, temporario = tempfile.mkstemp(suffix='.tmp', dir=DIR_EXPORTACOES)
+            os.close(fd)
+            try:
+                GRAVADORES[formato](temporario, armazem, codigos, vista, filtros)
+                os.replace(temporario, caminho)
+            except BaseException:
+                os.remove(temporario)
+                raise
+        rastreio.marcar(bytes=os.path.getsize(caminho))
+    finally:
+        rastreio.finalizar_rerun()
+
+
+def exportar(armazem, codigos, vista, formato, **filtros):
+    """Caminho do arquivo com a vista dos municípios pedidos, gerado só se ainda não existir em disco."""
+    # Os hashes dos CSVs de cada município entram no nome: dados novos geram outro
+    # arquivo, e um arquivo já gravado é entregue sem carregar município nenhum
+    versoes = (dados.VERSAO_CACHE,) + tuple(
+        (codigo, tuple(dados.hash_fonte(fonte, os.path.join(armazem.diretorio, codigo)) for fonte in dados.FONTES))
+        for codigo in codigos)
+    os.makedirs(DIR_EXPORTACOES, exist_ok=True)
+    caminho = os.path.join(DIR_EXPORTACOES, _nome_arquivo(vista, formato, filtros, versoes))
+
+    with _lock:
+        lock_arquivo = _gerando.setdefault(caminho, threading.Lock())
+    # O lock do arquivo sai de _gerando em qualquer saída: acerto, gravação ou erro
+    try:
+        with lock_arquivo:
+            if os.path.exists(caminho):
+                os.utime(caminho)  # usado agora: é o último a sair do disco
+                return caminho
+            _gerar(caminho, armazem, codigos, vista, formato, filtros)
+    finally:
+        with _lock:
+            # Só se ainda for o mesmo: quem esperava pode chegar depois de outro já ter criado um novo
+            if _gerando.get(caminho) is lock_arquivo:
+                del _gerando[caminho]
+
+    try:
+        _limitar_disco()
+    except OSError:
+        logging.exception("Falha ao limpar exportações antigas")
+    return caminho
+
+
+def conteudo(armazem, codigos, vista, formato, **filtros):
+    """Arquivo exportado, aberto para leitura (o que o st.download_button envia ao navegador).
+
+    Vai o arquivo, não os bytes: o Streamlit lê uma vez para o armazenamento de
+    mídia dele, e o arquivo é fechado quando ele descarta o objeto.
+    """
+    return open(exportar(armazem, codigos, vista, formato, **filtros), 'rb')
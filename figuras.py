@@ -0,0 +1,524 @@
+"""Construção dos gráficos do VigiLeish e cache LRU das figuras já serializadas."""
+import base64
+import json
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+import streamlit as st
+
+import rastreio
+import reducao
+
+# plotly.express, plotly.subplots e plotly.utils são importados dentro das funções
+# que os usam: só quem monta ou serializa um gráfico paga por eles (ver paginas/).
+# APIs internas do Streamlit usadas para enviar o JSON pronto (ver exibir)
+try:
+    from streamlit.elements.lib.layout_utils import LayoutConfig
+    from streamlit.elements.lib.utils import compute_and_register_element_id
+    from streamlit.proto.PlotlyChart_pb2 import PlotlyChart as PlotlyChartProto
+    ENVIO_DIRETO = True
+except ImportError:
+    ENVIO_DIRETO = False
+    logging.warning("APIs internas do Streamlit não encontradas; os gráficos vão por st.plotly_chart, "
+                    "no JSON padrão (ver requirements.txt e tests/test_figuras.py)")
+
+
+# --- 1. TEMA COMPARTILHADO ---
+# Estilo comum a todos os gráficos, definido uma vez aqui. Não vai como
+# template= da figura: no navegador o Streamlit mescla o tema dele por cima de
+# layout.template.layout e trocaria fonte, fundo e grade. _estilo copia o TEMA
+# para o layout de cada figura, e cada construtor só acrescenta o que é dele.
+TEMA = go.layout.Template(layout=dict(
+    font_family="Lora", plot_bgcolor='white', yaxis_gridcolor='#f1f5f9',
+    legend=dict(orientation="h", y=1.1, x=0.5, xanchor="center"),
+))
+pio.templates['vigileish'] = TEMA
+
+
+def _estilo(fig, plotly_font, **layout):
+    fig.update_layout(TEMA.layout.to_plotly_json())
+    fig.update_layout(font_size=plotly_font, **layout)
+    return fig
+
+
+# --- 2. CONSTRUTORES DE FIGURAS ---
+# Os gráficos de linha passam cada traço por reducao.py: séries anuais ficam
+# inteiras, séries mais finas chegam ao navegador com até reducao.MAX_PONTOS pontos.
+def canina_barras(df_anual, min_ano, max_ano, plotly_font):
+    fig_bar = go.Figure()
+    fig_bar.add_trace(go.Bar(x=df_anual.index, y=df_anual['Positivos'], name="Cães Positivos", marker_color='#C2410C'))
+    fig_bar.add_trace(go.Bar(x=df_anual.index, y=df_anual['Eutanasiados'], name="Eutanásias", marker_color='#5D3A9B'))
+
+    _estilo(fig_bar, plotly_font, height=400, barmode='group',
+            title="Casos Positivos e Eutanásias em Cães", legend_y=1.15)
+
+    fig_bar.update_yaxes(tickformat=".,d", title_text="Qtd. Animais")
+    fig_bar.update_xaxes(dtick=1, range=[min_ano-0.5, max_ano+0.5], title_text="Ano")
+    return fig_bar
+
+
+def canina_sorologias(df_anual, min_ano, max_ano, plotly_font):
+    x, y = reducao.serie(df_anual.index, df_anual['Sorologias'])
+    fig_line = go.Figure()
+    fig_line.add_trace(go.Scatter(x=x, y=y, name="Total de Testes", mode='lines+markers', line=dict(color='#117733', width=3)))
+
+    _estilo(fig_line, plotly_font, height=400, title="Total de Sorologias (Testes) Realizados")
+
+    fig_line.update_yaxes(tickformat=".,d", title_text="Total Testes")
+    fig_line.update_xaxes(dtick=1, range=[min_ano-0.5, max_ano+0.5], title_text="Ano")
+    return fig_line
+
+
+def canina_borrifacao(df_anual, min_ano, max_ano, plotly_font):
+    import plotly.express as px
+    df = reducao.tabela(df_anual.reset_index(), 'Ano', 'Borrifados')
+    fig_v = px.line(df, x='Ano', y='Borrifados', markers=True, color_discrete_sequence=['#374151'])
+    _estilo(fig_v, plotly_font, yaxis_title="Qtd. Imóveis")
+    fig_v.update_yaxes(tickformat=".,d")
+    fig_v.update_xaxes(dtick=1, range=[min_ano, max_ano])
+    return fig_v
+
+
+def mapa_regionais(df_f, plotly_font):
+    import plotly.express as px
+    fig = px.scatter_mapbox(df_f, lat="Lat", lon="Lon", size="Casos", color="Casos", zoom=10,
+                            mapbox_style="carto-positron",
+                            color_continuous_scale="Viridis_r",
+                            hover_name="Regional",
+                            hover_data={"Lat": False, "Lon": False, "Casos": True})
+    # O hovertemplate só lê marker.color; o customdata que o px monta com Lat/Lon/Casos não vai
+    fig.update_traces(customdata=None, selector=0)
+    # Halo nas regionais em alerta (calculado em alertas.py), por cima dos círculos
+    if 'Alerta' in df_f and df_f['Alerta'].any():
+        em_alerta = df_f[df_f['Alerta']]
+        fig.add_trace(go.Scattermapbox(lat=em_alerta['Lat'], lon=em_alerta['Lon'], mode='markers',
+                                       marker=dict(size=34, color='#C2410C', opacity=0.35),
+                                       name="Acima do esperado", hoverinfo='skip', showlegend=False))
+    _estilo(fig, plotly_font, margin={"r":0,"t":0,"l":0,"b":0}, height=500)
+    return fig
+
+
+def mapa_regionais_anos(df_m, ano_inicial, plotly_font):
+    # Todos os anos vão juntos como frames do Plotly: o slider troca o ano no
+    # navegador, sem rerun. Tamanho e cor usam a mesma escala em todos os anos.
+    # Cada frame só traz o que muda (casos e halo); posições e nomes vão uma vez.
+    df = df_m.reset_index().dropna(subset=['Lat', 'Lon'])
+    casos = df.pivot(index='Regional', columns='Ano', values='Casos').astype('float64')
+    anos = [ano for ano in casos.columns if casos[ano].notna().any()]
+    if ano_inicial not in anos:
+        ano_inicial = anos[-1]
+    if 'Alerta' in df:
+        alerta = df.pivot(index='Regional', columns='Ano', values='Alerta').reindex_like(casos).fillna(False).astype(bool)
+    else:
+        alerta = casos.notna() & False
+    coordenadas = df.groupby('Regional', observed=True)[['Lat', 'Lon']].first().loc[casos.index]
+    casos_max = max(float(np.nanmax(casos.to_numpy())), 1.0)
+
+    def valores(ano):
+        # Regional sem dado no ano fica com tamanho NaN e some do mapa
+        valores_ano = casos[ano].to_numpy()
+        halo = np.where(alerta[ano].to_numpy(), 34, 0)
+        return [go.Scattermapbox(marker=dict(size=valores_ano, color=valores_ano)),
+                go.Scattermapbox(marker=dict(size=halo))]
+
+    def titulo(ano):
+        em_alerta = alerta.index[alerta[ano].to_numpy()]
+        if em_alerta.empty:
+            return f"<b>{ano}</b>"
+        return f"<b>{ano}</b> · acima do esperado: " + ", ".join(em_alerta)
+
+    inicial = casos[ano_inicial].to_numpy()
+    circulos = go.Scattermapbox(
+        lat=coordenadas['Lat'], lon=coordenadas['Lon'], mode='markers', hovertext=casos.index,
+        marker=dict(size=inicial, sizemode='area', sizeref=2 * casos_max / 20 ** 2, sizemin=4,
+                    color=inicial, cmin=0, cmax=casos_max, colorscale='Viridis', reversescale=True,
+                    colorbar=dict(title="Casos"), opacity=0.8),
+        hovertemplate="<b>%{hovertext}</b><br>Casos=%{marker.color}<extra></extra>", showlegend=False)
+    halo = go.Scattermapbox(lat=coordenadas['Lat'], lon=coordenadas['Lon'], mode='markers',
+                            marker=dict(size=np.where(alerta[ano_inicial].to_numpy(), 34, 0),
+                                        color='#C2410C', opacity=0.35),
+                            name="Acima do esperado", hoverinfo='skip', showlegend=False)
+
+    frames = [go.Frame(name=str(ano), data=valores(ano), layout=go.Layout(title_text=titulo(ano))) for ano in anos]
+    fig = go.Figure(data=[circulos, halo], frames=frames)
+    # Mapas não têm transição animada; o frame é redesenhado na hora (redraw é o padrão)
+    passos = [dict(method='animate', label=str(ano), args=[[str(ano)], dict(mode='immediate', frame=dict(duration=0))])
+              for ano in anos]
+    _estilo(
+        fig, plotly_font,
+        mapbox=dict(style="carto-positron", zoom=10,
+                    center=dict(lat=float(coordenadas['Lat'].mean()), lon=float(coordenadas['Lon'].mean()))),
+        title=dict(text=titulo(ano_inicial), x=0.01, y=0.98, font=dict(size=plotly_font)),
+        sliders=[dict(active=anos.index(ano_inicial), steps=passos, currentvalue=dict(prefix="Ano: "),
+                      pad=dict(t=10, b=10), x=0.02, len=0.96)],
+        margin={"r": 0, "t": 40, "l": 0, "b": 0}, height=600,
+    )
+    return fig
+
+
+def historico_regional(df_reg_hist, reg_sel, intervalo_anos, plotly_font):
+    import plotly.express as px
+    fig_hist_reg = px.line(reducao.tabela(df_reg_hist, 'Ano', 'Casos'), x='Ano', y='Casos', markers=True,
+                           title=f"Evolução dos Casos Humanos: {reg_sel} ({intervalo_anos[0]}-{intervalo_anos[1]})",
+                           color_discrete_sequence=['#117733'])
+    _estilo(fig_hist_reg, plotly_font)
+    fig_hist_reg.update_xaxes(dtick=1, range=[intervalo_anos[0]-0.5, intervalo_anos[1]+0.5])
+    return fig_hist_reg
+
+
+def historico_correlacao(df_merged, min_ano, max_ano, plotly_font):
+    from plotly.subplots import make_subplots
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    # Cada eixo reduzido por conta própria: os picos de uma série não dependem da outra
+    x_caes, y_caes = reducao.serie(df_merged['Ano'], df_merged['Positivos'])
+    x_humanos, y_humanos = reducao.serie(df_merged['Ano'], df_merged['Casos'])
+
+    fig.add_trace(
+        go.Scatter(
+            x=x_caes, y=y_caes, name="Cães Positivos",
+            mode='lines+markers', line=dict(color='#C2410C', width=3), marker=dict(size=6)
+        ), secondary_y=False
+    )
+
+    fig.add_trace(
+        go.Scatter(
+            x=x_humanos, y=y_humanos, name="Casos Humanos",
+            mode='lines+markers', line=dict(color='#5D3A9B', width=3, dash='dot'), marker=dict(size=6)
+        ), secondary_y=True
+    )
+
+    _estilo(fig, plotly_font, title="<b>Correlação: Humano vs Canino</b>", hovermode="x unified")
+
+    fig.update_xaxes(title_text="Ano", dtick=1, range=[min_ano, max_ano], showgrid=False)
+    fig.update_yaxes(title_text="Cães Positivos", tickformat=".,d", secondary_y=False, showgrid=True)
+    fig.update_yaxes(title_text="Casos Humanos", tickformat=".,d", secondary_y=True, showgrid=False)
+    return fig
+
+# Nomes das séries nos eixos do heatmap de defasagens
+NOMES_SERIES = {'Positivos': "Cães positivos", 'Taxa_Positividade': "Positividade canina",
+                'Eutanasiados': "Eutanásias", 'Borrifados': "Imóveis borrifados",
+                'Casos': "Casos humanos", 'Obitos': "Óbitos humanos"}
+
+
+def historico_defasagens(df_corr, escopo, plotly_font):
+    # Uma linha por par (canina -> humana), uma coluna por defasagem; * = IC 95% não inclui zero
+    df = df_corr[df_corr['Escopo'] == escopo]
+    r = df.pivot_table(index=['Canina', 'Humana'], columns='Defasagem', values='r', observed=True, dropna=False)
+    inf = df.pivot_table(index=['Canina', 'Humana'], columns='Defasagem', values='IC_inf', observed=True, dropna=False)
+    sup = df.pivot_table(index=['Canina', 'Humana'], columns='Defasagem', values='IC_sup', observed=True, dropna=False)
+    # O rótulo de cada célula sai de z no navegador (texttemplate); o texto só
+    # leva o asterisco, já que o texttemplate do heatmap não enxerga customdata
+    significativo = ((inf > 0) | (sup < 0)).to_numpy()
+    texto = np.where(significativo, "*", "").tolist()
+    linhas = [f"{NOMES_SERIES.get(c, c)} → {NOMES_SERIES.get(h, h)}" for c, h in r.index]
+    colunas = [f"{d:+d} ano{'s' if abs(d) > 1 else ''}" if d else "mesmo ano" for d in r.columns]
+
+    fig = go.Figure(go.Heatmap(
+        z=r.to_numpy(), x=colunas, y=linhas, text=texto, texttemplate="%{z:.2f}%{text}",
+        zmin=-1, zmax=1, colorscale="RdBu_r", colorbar=dict(title="r"),
+        hovertemplate="%{y}<br>Defasagem: %{x}<br>r = %{z:.2f}<extra></extra>"
+    ))
+    _estilo(fig, plotly_font, height=140 + 45 * len(linhas), title=f"<b>Correlação defasada: {escopo}</b>")
+    fig.update_xaxes(title_text="Defasagem (positivo = série canina antes da humana)", side="bottom")
+    fig.update_yaxes(autorange="reversed")
+    return fig
+
+
+# --- 3. GRÁFICOS DAS PÁGINAS ---
+# Chave do cache e argumentos do construtor de cada gráfico, num lugar só: as
+# páginas (paginas/), o aquecimento e o site estático (estatico.py) pedem por
+# aqui, então o mesmo gráfico tem sempre a mesma chave.
+# Chave: (versão dos dados, segmento/gráfico, ano, fonte, extra, período)
+CANINOS = {"Canina/barras": canina_barras, "Canina/sorologias": canina_sorologias,
+           "Canina/borrifacao": canina_borrifacao}
+
+
+def recorte_correlacao(conjunto):
+    return conjunto.anual.loc[conjunto.min_ano:conjunto.max_ano, ['Casos', 'Positivos']].reset_index()
+
+
+def recorte_mapa(conjunto, ano):
+    df_m = conjunto.regionais
+    return df_m.loc[ano].reset_index().dropna(subset=['Casos']) if ano in df_m.index else pd.DataFrame()
+
+
+def recorte_regional(conjunto, regional, intervalo):
+    return conjunto.regionais.xs(regional, level='Regional').loc[intervalo[0]:intervalo[1]].reset_index()
+
+
+def pedido(conjunto, nome, plotly_font, ano=None, extra=None, intervalo=None, recorte=None):
+    """(chave, construtor, args) do gráfico nome ("Segmento/gráfico").
+
+    extra é o escopo (Historico/defasagens) ou a regional (Mapa/historico).
+    recorte evita refiltrar quando a página já tem a tabela do gráfico.
+    """
+    chave = (conjunto.versao, nome, ano, plotly_font, extra, intervalo)
+    if nome in CANINOS:
+        return chave, CANINOS[nome], (conjunto.anual, conjunto.min_ano, conjunto.max_ano, plotly_font)
+    if nome == "Historico/correlacao":
+        recorte = recorte_correlacao(conjunto) if recorte is None else recorte
+        return chave, historico_correlacao, (recorte, conjunto.min_ano, conjunto.max_ano, plotly_font)
+    if nome == "Historico/defasagens":
+        return chave, historico_defasagens, (conjunto.correlacoes, extra, plotly_font)
+    if nome == "Mapa/regionais":
+        recorte = recorte_mapa(conjunto, ano) if recorte is None else recorte
+        return chave, mapa_regionais, (recorte, plotly_font)
+    if nome == "Mapa/regionais_anos":
+        return chave, mapa_regionais_anos, (conjunto.regionais, ano, plotly_font)
+    if nome == "Mapa/historico":
+        recorte = recorte_regional(conjunto, extra, intervalo) if recorte is None else recorte
+        return chave, historico_regional, (recorte, extra, intervalo, plotly_font)
+    raise KeyError(nome)
+
+
+# --- 4. SERIALIZAÇÃO COMPACTA ---
+# O JSON padrão do Plotly leva o template inteiro e os números como texto.
+# Aqui o template fica só com o que a figura usa e os arrays numéricos vão
+# como binário em base64 ({"dtype", "bdata"}, lido pelo plotly.js do Streamlit)
+# quando isso sai menor que o texto. As cores das escalas vão em hex.
+TIPOS_INTEIROS = ('u1', 'i1', 'u2', 'i2', 'u4', 'i4')
+TIPOS_COM_X0 = ('scatter', 'bar')  # aceitam x0/dx no lugar de um eixo x regular
+RGB = re.compile(r"rgb\((\d+), ?(\d+), ?(\d+)\)")
+
+
+def _sem_redundancia(padrao, tracos):
+    # Remove do padrão do template o que todos os traços já definem explicitamente
+    saida = {}
+    for chave, valor in padrao.items():
+        definidos = [t[chave] for t in tracos if chave in t]
+        if chave == 'type' or len(definidos) < len(tracos):
+            saida[chave] = valor
+        elif isinstance(valor, dict) and all(isinstance(d, dict) for d in definidos):
+            resto = _sem_redundancia(valor, definidos)
+            if resto:
+                saida[chave] = resto
+    return saida
+
+
+def _usa_paleta(traco):
+    # Traço sem cor própria pega a cor da paleta (colorway) do tema
+    return traco.get('type', 'scatter') in ('scatter', 'bar', 'scattermapbox') and \
+        'color' not in traco.get('marker', {}) and 'color' not in traco.get('line', {})
+
+
+def _template_enxuto(spec):
+    # O tema do Streamlit é aplicado por cima de template.layout no navegador;
+    # do template original só precisam ir a paleta (se algum traço a usa) e os
+    # padrões dos tipos de traço usados que os traços não sobrescrevem
+    template = spec['layout'].get('template') or {}
+    tracos = spec['data'] + [t for frame in spec.get('frames', []) for t in frame.get('data', [])]
+    layout = {}
+    if any(_usa_paleta(t) for t in tracos) and 'colorway' in template.get('layout', {}):
+        layout['colorway'] = template['layout']['colorway']
+    coloraxis = spec['layout'].get('coloraxis')
+    if coloraxis is not None and 'colorscale' not in coloraxis and 'coloraxis' in template.get('layout', {}):
+        layout['coloraxis'] = template['layout']['coloraxis']
+    dados = {}
+    for tipo, padroes in template.get('data', {}).items():
+        do_tipo = [t for t in tracos if t.get('type', 'scatter') == tipo]
+        if do_tipo:
+            enxutos = [p for p in (_sem_redundancia(p, do_tipo) for p in padroes) if set(p) - {'type'}]
+            if enxutos:
+                dados[tipo] = enxutos
+    enxuto = {}
+    if layout:
+        enxuto['layout'] = layout
+    if dados:
+        enxuto['data'] = dados
+    return enxuto
+
+
+def _binario(arr):
+    """Array numérico -> {"dtype", "bdata"} com o menor tipo que guarda os valores sem perda."""
+    if arr.dtype.kind not in 'iuf' or arr.size == 0:
+        return None
+    validos = arr[~np.isnan(arr)] if arr.dtype.kind == 'f' else arr
+    if validos.size == arr.size and np.array_equal(validos, np.round(validos)):
+        minimo, maximo = (validos.min(), validos.max()) if validos.size else (0, 0)
+        dtype = next(t for t in TIPOS_INTEIROS
+                     if np.iinfo(t).min <= minimo and maximo <= np.iinfo(t).max) \
+            if abs(minimo) < 2 ** 31 and abs(maximo) < 2 ** 31 else 'f8'
+    else:
+        dtype = 'f4' if np.array_equal(arr.astype('f4'), arr, equal_nan=True) else 'f8'
+    dados = np.ascontiguousarray(arr, dtype=np.dtype(dtype).newbyteorder('<'))
+    saida = {'dtype': dtype, 'bdata': base64.b64encode(dados.tobytes()).decode('ascii')}
+    if arr.ndim > 1:
+        saida['shape'] = ",".join(map(str, arr.shape))
+    return saida
+
+
+def _numerica(lista):
+    return len(lista) > 2 and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in lista)
+
+
+def _hex(cor):
+    # "rgb(5,48,97)" -> "#053061"; outras formas (nome, rgba, hex) passam como estão
+    partes = RGB.fullmatch(cor) if isinstance(cor, str) else None
+    return "#%02x%02x%02x" % tuple(map(int, partes.groups())) if partes else cor
+
+
+def _compactar_arrays(valor):
+    if isinstance(valor, dict):
+        # Escalas nomeadas chegam expandidas em "rgb(...)" pelo plotly.py
+        return {k: [[p, _hex(c)] for p, c in v] if k == 'colorscale' and isinstance(v, (list, tuple))
+                else _compactar_arrays(v) for k, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        # Os frames chegam com listas em vez de arrays
+        if _numerica(valor):
+            return _compactar_arrays(np.array(valor, dtype='float64'))
+        return [_compactar_arrays(v) for v in valor]
+    if isinstance(valor, np.ndarray) and valor.dtype.kind in 'iuf':
+        from plotly.utils import PlotlyJSONEncoder
+        binario = _binario(valor)
+        texto = len(json.dumps(valor, cls=PlotlyJSONEncoder, separators=(',', ':')))
+        if binario is not None and len(json.dumps(binario)) < texto:
+            return binario
+    return valor
+
+
+def _compactar_traco(traco):
+    # Anos consecutivos no eixo x viram x0/dx, sem array nenhum
+    x = traco.get('x')
+    if traco.get('type', 'scatter') in TIPOS_COM_X0 and isinstance(x, np.ndarray) and x.dtype.kind in 'iu' \
+            and x.size > 2 and np.all(np.diff(x) == x[1] - x[0]) and x[1] != x[0]:
+        traco = {k: v for k, v in traco.items() if k != 'x'}
+        traco['x0'], traco['dx'] = int(x[0]), int(x[1] - x[0])
+    return _compactar_arrays(traco)
+
+
+def compactar(fig):
+    """JSON da figura para o frontend: template enxuto, arrays binários e sem espaços."""
+    from plotly.utils import PlotlyJSONEncoder
+    spec = fig.to_plotly_json()
+    spec['layout']['template'] = _template_enxuto(spec)
+    spec['data'] = [_compactar_traco(t) for t in spec['data']]
+    if spec.get('frames'):
+        spec['frames'] = [{**frame, 'data': [_compactar_traco(t) for t in frame.get('data', [])]}
+                          for frame in spec['frames']]
+    return json.dumps(spec, cls=PlotlyJSONEncoder, separators=(',', ':'), ensure_ascii=False)
+
+
+# --- 5. CACHE LRU DE FIGURAS SERIALIZADAS ---
+class CacheFiguras:
+    """LRU limitado por bytes; guarda o JSON final de cada figura, sua altura e o formato.
+
+    O formato (compacto para o envio direto ou o JSON padrão do Plotly) entra na
+    chave: se o envio direto for desligado, as figuras são refeitas no formato padrão.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._itens = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()  # compartilhado entre as sessões do processo
+        self.acertos = 0
+        self.falhas = 0
+        self.despejos = 0
+
+    def obter(self, chave, construtor, *args):
+        direto = ENVIO_DIRETO
+        chave = (chave, direto)
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is not None:
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+                rastreio.anotar(acerto=True)
+                return item
+            self.falhas += 1
+        rastreio.anotar(acerto=False)
+
+        # A construção acontece fora do lock para não serializar sessões diferentes
+        with rastreio.span('figura.construcao'):
+            fig = construtor(*args)
+        with rastreio.span('figura.serializacao'):
+            # O formato compacto só vale no envio direto; st.plotly_chart revalida a figura
+            spec = compactar(fig) if direto else pio.to_json(fig, validate=False)
+            item = (spec, fig.layout.height or 450, direto)
+
+        with self._lock:
+            if chave not in self._itens:
+                self._itens[chave] = item
+                self._bytes += len(item[0])
+            while self._bytes > self.max_bytes and len(self._itens) > 1:
+                _, (spec, _, _) = self._itens.popitem(last=False)
+                self._bytes -= len(spec)
+                self.despejos += 1
+        return item
+
+    def estatisticas(self):
+        with self._lock:
+            return {
+                'itens': len(self._itens), 'bytes': self._bytes, 'max_bytes': self.max_bytes,
+                'acertos': self.acertos, 'falhas': self.falhas, 'despejos': self.despejos,
+            }
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+            self._bytes = 0
+
+
+CACHE = CacheFiguras(int(os.environ.get('VIGILEISH_CACHE_FIGURAS_MB', '64')) * 1024 * 1024)
+
+
+# --- 6. EXIBIÇÃO ---
+def exibir(item):
+    # Envia o JSON já pronto direto ao frontend, sem reconstruir a figura nem
+    # serializar de novo (que é o que st.plotly_chart faria a cada rerun). O
+    # st.plotly_chart também não serve para o JSON compacto: ele valida a figura
+    # no plotly.py, que recusa os arrays binários ({"dtype", "bdata"}).
+    spec, altura, direto = item
+    if not direto:
+        # Versões do Streamlit sem essas APIs internas: caminho público
+        st.plotly_chart(pio.from_json(spec), use_container_width=True)
+        return
+
+    proto = PlotlyChartProto()
+    proto.theme = "streamlit"
+    proto.spec = spec
+    proto.config = "{}"
+    proto.id = compute_and_register_element_id(
+        "plotly_chart", user_key=None, key_as_main_identity=False, dg=st._main,
+        plotly_spec=spec, plotly_config=proto.config, selection_mode=None,
+        is_selection_activated=False, theme="streamlit", width="stretch",
+        height="content", alt=None,
+    )
+    st._main._enqueue("plotly_chart", proto, layout_config=LayoutConfig(width="stretch", height=altura))
+
+
+def desligar_envio_direto():
+    global ENVIO_DIRETO
+    ENVIO_DIRETO = False
+
+
+def mostrar(chave, construtor, *args):
+    with rastreio.span('figura.cache', figura=chave[1]):
+        item = CACHE.obter(chave, construtor, *args)
+    with rastreio.span('figura.envio', figura=chave[1], bytes=len(item[0])):
+        try:
+            exibir(item)
+            return
+        except Exception:
+            if not item[2]:
+                raise
+            # As APIs internas mudaram nesta versão do Streamlit (assinatura, atributo):
+            # o processo passa a usar st.plotly_chart, com a figura refeita no formato padrão
+            logging.exception("Envio direto do gráfico falhou; usando st.plotly_chart")
+            desligar_envio_direto()
+    with rastreio.span('figura.cache', figura=chave[1]):
+        item = CACHE.obter(chave, construtor, *args)
+    exibir(item)
+
+
+def mostrar_grafico(conjunto, nome, plotly_font, **opcoes):
+    """Mostra o gráfico nome com a chave e os argumentos de pedido."""
+    chave, construtor, args = pedido(conjunto, nome, plotly_font, **opcoes)
+    mostrar(chave, construtor, *args)
@@ -0,0 +1,251 @@
+"""Ingestão de extratos de notificação (uma linha por caso/exame) nas tabelas do painel.
+
+Lê o extrato em blocos de tamanho fixo, agrega por ano (e por regional) e grava
+o resultado nos CSVs do município, no mesmo formato do boletim oficial. Só os anos
+cujos totais mudaram são reescritos; se nada mudou, os arquivos ficam intactos
+(e o cache compilado continua válido).
+
+Uso:
+    python ingestao.py humanos extrato_sinan.csv --municipio 3106200
+    python ingestao.py caninos inquerito_canino.csv --municipio 3106200 --bloco 200000
+"""
+import argparse
+import os
+
+import pandas as pd
+
+import dados
+
+# --- 1. LAYOUT DOS EXTRATOS ---
+# Nomes das colunas do SINAN (humanos) e do inquérito sorológico canino.
+# Podem ser trocados pela linha de comando quando o extrato vier diferente.
+COLUNAS_HUMANOS = {'ano': 'NU_ANO', 'classificacao': 'CLASSI_FIN', 'evolucao': 'EVOLUCAO', 'regional': 'REGIONAL'}
+COLUNAS_CANINOS = {'ano': 'ANO', 'resultado': 'RESULTADO', 'eutanasia': 'EUTANASIA'}
+
+CONFIRMADO = {'1'}                                  # CLASSI_FIN: caso confirmado
+OBITO_LV = {'2'}                                    # EVOLUCAO: óbito por leishmaniose visceral
+POSITIVO = {'1', 'P', 'POSITIVO', 'REAGENTE'}
+EUTANASIADO = {'1', 'S', 'SIM'}
+REGIONAL_IGNORADA = 'Ignorado'
+
+TAMANHO_BLOCO = 100_000
+
+
+# --- 2. AGREGAÇÃO EM BLOCOS ---
+def _blocos(caminho, colunas, tamanho_bloco, sep, encoding):
+    # dtype=str: códigos como '01' não viram número; a memória fica limitada ao bloco
+    return pd.read_csv(caminho, sep=sep, encoding=encoding, dtype=str, usecols=list(colunas.values()),
+                       chunksize=tamanho_bloco)
+
+
+def _somar(acumulado, parcial):
+    return parcial if acumulado is None else acumulado.add(parcial, fill_value=0)
+
+
+def _anos(serie):
+    return pd.to_numeric(serie, errors='coerce').astype('Int16')
+
+
+def agregar_humanos(caminho, colunas=COLUNAS_HUMANOS, tamanho_bloco=TAMANHO_BLOCO, sep=';', encoding='iso-8859-1'):
+    """Devolve (anual, regional): casos e óbitos por ano e casos por (regional, ano)."""
+    anual = regional = None
+    for bloco in _blocos(caminho, colunas, tamanho_bloco, sep, encoding):
+        bloco = bloco[bloco[colunas['classificacao']].str.strip().isin(CONFIRMADO)]
+        ano = _anos(bloco[colunas['ano']])
+        obito = bloco[colunas['evolucao']].str.strip().isin(OBITO_LV)
+        nome = bloco[colunas['regional']].str.strip().fillna('').replace('', REGIONAL_IGNORADA)
+
+        parcial = pd.DataFrame({'Ano': ano, 'Casos': 1, 'Obitos': obito.astype(int)}).dropna(subset=['Ano'])
+        anual = _somar(anual, parcial.groupby('Ano')[['Casos', 'Obitos']].sum())
+        regional = _somar(regional, pd.DataFrame({'Regional': nome, 'Ano': ano}).dropna().value_counts())
+
+    if anual is None:
+        return pd.DataFrame(columns=['Casos', 'Obitos']), pd.DataFrame()
+    return anual.astype('int64'), regional.astype('int64').unstack('Ano', fill_value=0)
+
+
+def agregar_caninos(caminho, colunas=COLUNAS_CANINOS, tamanho_bloco=TAMANHO_BLOCO, sep=';', encoding='iso-8859-1'):
+    """Devolve sorologias, positivos e eutanasiados por ano."""
+    anual = None
+    for bloco in _blocos(caminho, colunas, tamanho_bloco, sep, encoding):
+        parcial = pd.DataFrame({
+            'Ano': _anos(bloco[colunas['ano']]),
+            'Sorologias': 1,
+            'Positivos': bloco[colunas['resultado']].str.strip().str.upper().isin(POSITIVO).astype(int),
+            'Eutanasiados': bloco[colunas['eutanasia']].str.strip().str.upper().isin(EUTANASIADO).astype(int),
+        }).dropna(subset=['Ano'])
+        anual = _somar(anual, parcial.groupby('Ano').sum())
+    if anual is None:
+        return pd.DataFrame(columns=['Sorologias', 'Positivos', 'Eutanasiados'])
+    return anual.astype('int64')
+
+
+# --- 3. FORMATAÇÃO NO PADRÃO DO BOLETIM ---
+def _fmt_int(valor):
+    return '' if pd.isna(valor) else f"{int(valor):,}".replace(',', '.')
+
+
+def _fmt_dec(valor):
+    return '' if pd.isna(valor) else f"{valor:.1f}".replace('.', ',')
+
+
+def _fmt_contagem(valor):
+    # A tabela por regional do boletim não usa separador de milhar
+    return '' if pd.isna(valor) else str(int(valor))
+
+
+def _mudou(atual, novo):
+    return pd.isna(atual) or int(atual) != int(novo)
+
+
+def _gravar_linhas(caminho, linhas):
+    tmp = f"{caminho}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(('\r\n'.join(linhas) + '\r\n').encode('iso-8859-1'))
+    os.replace(tmp, caminho)
+
+
+def _atualizar_secao_anual(linhas, rotulo, atual, novos, formatar_linha):
+    """Reescreve só as linhas dos anos alterados; anos novos entram em ordem no fim."""
+    i, fim = dados.limites_secao(linhas, rotulo)
+    corpo = linhas[i + 1:fim]
+    atual = atual.set_index(atual.columns[0])
+
+    alterados = [
+        ano for ano, linha in novos.iterrows()
+        if ano not in atual.index or any(_mudou(atual.at[ano, c], linha[c]) for c in novos.columns)
+    ]
+    if not alterados:
+        return linhas, []
+
+    por_ano = {}
+    for linha in corpo:
+        campo = dados._primeiro_campo(linha)
+        por_ano[int(campo) if campo.isdigit() else campo] = linha
+    for ano in alterados:
+        anterior = atual.loc[ano] if ano in atual.index else None
+        por_ano[int(ano)] = formatar_linha(int(ano), anterior, novos.loc[ano])
+
+    anos = sorted(k for k in por_ano if isinstance(k, int))
+    outros = [k for k in por_ano if not isinstance(k, int)]
+    novo_corpo = [por_ano[k] for k in anos + outros]
+    return linhas[:i + 1] + novo_corpo + linhas[fim:], sorted(int(a) for a in alterados)
+
+
+def _linha_humanos(ano, anterior, novo):
+    casos, obitos = int(novo['Casos']), int(novo['Obitos'])
+    pop = anterior['Pop'] if anterior is not None else pd.NA
+    prev = anterior['Prev'] if anterior is not None else pd.NA
+    inc = casos / pop * 100_000 if not pd.isna(pop) and pop else pd.NA
+    # O boletim publica a letalidade em % inteiro
+    letalidade = round(obitos / casos * 100) if casos else pd.NA
+    return ';'.join([str(ano), _fmt_int(casos), _fmt_int(pop), _fmt_dec(inc), _fmt_int(prev),
+                     _fmt_int(obitos), _fmt_int(letalidade)])
+
+
+def _linha_caninos(ano, anterior, novo):
+    return ';'.join([str(ano), _fmt_int(novo['Sorologias']), _fmt_int(novo['Positivos']),
+                     _fmt_int(novo['Eutanasiados'])])
+
+
+def _atualizar_regionais(linhas, novos):
+    """Substitui os anos alterados na seção regional (anos em colunas) e refaz os totais."""
+    if novos.empty:
+        return linhas, []
+    atual = dados.ler_regionais_largo(linhas).set_index('Regional')
+    atual.columns = atual.columns.astype(int)
+    atual = atual.drop(index=[r for r in atual.index if r.strip().lower() == 'total'])
+
+    # Os nomes do extrato costumam vir em caixa alta; casa com os nomes já usados
+    nomes = {r.strip().lower(): r for r in atual.index}
+    novos = novos.rename(index=lambda r: nomes.get(r.lower(), r.title()))
+    novos = novos.groupby(level=0).sum()
+
+    nomes_todos = atual.index.union(novos.index, sort=False)
+    alterados = []
+    for ano in novos.columns:
+        novo = novos[ano].reindex(nomes_todos, fill_value=0)
+        # Regional ausente da tabela equivale a zero casos no ano
+        existente = atual[ano].reindex(nomes_todos).fillna(0) if ano in atual.columns else None
+        if existente is None or (existente.astype('int64') != novo).any():
+            alterados.append(int(ano))
+    if not alterados:
+        return linhas, []
+
+    tabela = atual.reindex(nomes_todos)
+    for ano in alterados:
+        tabela[ano] = novos[ano].reindex(tabela.index, fill_value=0)
+    tabela = tabela[sorted(tabela.columns)]
+    # 'Ignorado' fica sempre por último, como no boletim
+    ordem = sorted((r for r in tabela.index if r != REGIONAL_IGNORADA), key=str.lower)
+    tabela = tabela.reindex(ordem + ([REGIONAL_IGNORADA] if REGIONAL_IGNORADA in tabela.index else []))
+
+    i, fim = dados.limites_secao(linhas, 'Regional')
+    cabecalho = ';'.join(['Regional'] + [str(a) for a in tabela.columns] + ['TOTAL'])
+    corpo = [';'.join([nome] + [_fmt_contagem(v) for v in linha] + [_fmt_contagem(linha.sum())])
+             for nome, linha in tabela.iterrows()]
+    totais = tabela.sum()
+    corpo.append(';'.join(['Total'] + [_fmt_contagem(v) for v in totais] + [_fmt_contagem(totais.sum())]))
+    return linhas[:i] + [cabecalho] + corpo + linhas[fim:], sorted(alterados)
+
+
+# --- 4. ATUALIZAÇÃO DOS ARQUIVOS DO MUNICÍPIO ---
+def ingerir_humanos(caminho_extrato, diretorio, **opcoes):
+    anual, regional = agregar_humanos(caminho_extrato, **opcoes)
+    caminho = os.path.join(diretorio, dados.ARQ_HUMANOS)
+    linhas = dados.ler_linhas(caminho)
+
+    _, corpo = dados.localizar_secao(linhas, 'Ano')
+    atual = dados.ler_secao(corpo, dados.ESQUEMA_HUMANOS)
+    linhas, anos_h = _atualizar_secao_anual(linhas, 'Ano', atual, anual, _linha_humanos)
+    linhas, anos_r = _atualizar_regionais(linhas, regional)
+
+    if anos_h or anos_r:
+        _gravar_linhas(caminho, linhas)
+    return {'humanos': anos_h, 'regionais': anos_r}
+
+
+def ingerir_caninos(caminho_extrato, diretorio, **opcoes):
+    anual = agregar_caninos(caminho_extrato, **opcoes)
+    caminho = os.path.join(diretorio, dados.ARQ_CANINOS)
+    linhas = dados.ler_linhas(caminho)
+
+    _, corpo = dados.localizar_secao(linhas, 'Ano')
+    atual = dados.ler_secao(corpo, dados.ESQUEMA_CANINOS)
+    linhas, anos = _atualizar_secao_anual(linhas, 'Ano', atual, anual, _linha_caninos)
+
+    if anos:
+        _gravar_linhas(caminho, linhas)
+    return {'caninos': anos}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('tipo', choices=['humanos', 'caninos'])
+    parser.add_argument('extrato', help="CSV com uma linha por notificação (humanos) ou exame (caninos)")
+    parser.add_argument('--municipio', default=dados.MUNICIPIO_PADRAO, help="código IBGE (pasta em municipios/)")
+    parser.add_argument('--bloco', type=int, default=TAMANHO_BLOCO, help="linhas lidas por vez")
+    parser.add_argument('--sep', default=';')
+    parser.add_argument('--encoding', default='iso-8859-1')
+    parser.add_argument('--coluna', action='append', default=[], metavar='CAMPO=COLUNA',
+                        help="troca o nome de uma coluna do extrato, ex.: ano=DT_ANO")
+    args = parser.parse_args()
+
+    colunas = dict(COLUNAS_HUMANOS if args.tipo == 'humanos' else COLUNAS_CANINOS)
+    for troca in args.coluna:
+        campo, coluna = troca.split('=', 1)
+        if campo not in colunas:
+            parser.error(f"campo desconhecido: {campo} (esperado: {', '.join(colunas)})")
+        colunas[campo] = coluna
+
+    diretorio = os.path.join(dados.DIR_MUNICIPIOS, args.municipio)
+    ingerir = ingerir_humanos if args.tipo == 'humanos' else ingerir_caninos
+    resultado = ingerir(args.extrato, diretorio, colunas=colunas, tamanho_bloco=args.bloco,
+                        sep=args.sep, encoding=args.encoding)
+
+    for tabela, anos in resultado.items():
+        print(f"{tabela}: {', '.join(map(str, anos)) if anos else 'sem alterações'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""Segmentos do painel, um módulo por página, importados só quando abertos pela primeira vez.
+
+Cada módulo expõe renderizar(ctx, ano_sel). Os construtores de gráficos
+(figuras.py) importam plotly.express e plotly.subplots só ao montar a
+primeira figura, então o Painel Geral, que não tem gráficos, abre sem eles.
+"""
+import functools
+import importlib
+from contextlib import nullcontext
+from dataclasses import dataclass
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+import dados
+import exportacao
+import rastreio
+
+# Segmento (st.session_state.segment) -> módulo em paginas/
+MODULOS = {"Geral": "geral", "Mapa": "mapa", "Canina": "canina", "Historico": "historico"}
+
+
+@dataclass(frozen=True)
+class Contexto:
+    conjunto: dados.Conjunto  # dados do município selecionado
+    plotly_font: int          # tamanho da fonte dos gráficos
+    css_root: str             # escala do texto (ex.: "125%")
+    municipio: str            # código IBGE do município selecionado
+
+
+def carregar(segmento):
+    # O import só custa na primeira vez; depois o módulo vem de sys.modules
+    return importlib.import_module(f"{__name__}.{MODULOS[segmento]}")
+
+
+# --- EXPORTAÇÃO ---
+def botoes_exportacao(ctx, vista, **filtros):
+    """Botões de XLSX e CSV com os dados da vista, filtrados como na tela.
+
+    O arquivo só é gerado quando o botão é clicado, numa thread à parte do
+    rerun, e fica em disco para as próximas sessões (ver exportacao.py).
+    """
+    armazem = dados.armazem_do_processo()
+    catalogo = armazem.catalogo()
+    col_xlsx, col_csv, col_todos = st.columns([1, 1, 3], vertical_alignment="center")
+    todos = len(catalogo) > 1 and col_todos.checkbox(
+        "Todos os municípios", key=f"exportar-{vista}-todos",
+        help="Exporta a mesma vista de cada município do catálogo, um abaixo do outro.")
+    codigos = catalogo.index.tolist() if todos else [ctx.municipio]
+
+    sufixo = "".join(f"-{valor}" for valor in _rotulos_filtros(filtros))
+    for coluna, formato in ((col_xlsx, 'xlsx'), (col_csv, 'csv')):
+        coluna.download_button(
+            f"Baixar {formato.upper()}", key=f"exportar-{vista}-{formato}",
+            data=functools.partial(exportacao.conteudo, armazem, codigos, vista, formato, **filtros),
+            file_name=f"vigileish-{vista}-{'todos' if todos else ctx.municipio}{sufixo}.{formato}",
+            mime=exportacao.FORMATOS[formato], on_click="ignore", icon=":material/download:")
+
+
+def _rotulos_filtros(filtros):
+    for valor in filtros.values():
+        if valor is None:
+            continue
+        if isinstance(valor, tuple):
+            yield "-".join(str(v) for v in valor)
+        else:
+            yield str(valor).lower().replace(" ", "_")
+
+
+# --- RASTREIO DOS FRAGMENTOS ---
+MAX_HISTORICO_DIAGNOSTICO = 20
+
+
+def guardar_diagnostico(spans):
+    if not spans:
+        return
+    st.session_state.diagnostico_ultimo = spans
+    total = spans[0]
+    historico = st.session_state.get('diagnostico_historico', [])
+    historico = [{k: total.get(k) for k in ('tipo', 'segmento', 'ano', 'ms')}] + historico
+    st.session_state.diagnostico_historico = historico[:MAX_HISTORICO_DIAGNOSTICO]
+
+
+def rerun_de_fragmento():
+    # Quando o Streamlit re-executa só um fragmento, o script de cima não roda:
+    # o fragmento abre e fecha o próprio rerun no rastreio
+    ctx = get_script_run_ctx()
+    if ctx is None or not getattr(ctx, 'fragment_ids_this_run', None):
+        return nullcontext()
+    return rastreio.fragmento(ao_finalizar=guardar_diagnostico, sessao=st.session_state.sessao_id,
+                              municipio=st.session_state.municipio, segmento=st.session_state.segment,
+                              ano=st.session_state.ano_selecionado)
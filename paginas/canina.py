@@ -0,0 +1,58 @@
+"""Cães: positivos e eutanásias, sorologias e borrifação (controle vetorial)."""
+import streamlit as st
+
+import figuras
+from paginas import botoes_exportacao
+
+
+def renderizar(ctx, ano_sel):
+    conjunto, plotly_font = ctx.conjunto, ctx.plotly_font
+
+    st.subheader("Vigilância Canina e Controle Vetorial")
+
+    # --- PARTE 1: BARRAS ---
+    st.markdown("""
+    <div class="info-box">
+        <span class="info-title">Por que monitoramos os cães?</span>
+        Em áreas urbanas, o cão é a principal fonte de infecção. O mosquito pica o cão doente e depois transmite, através da picada, para o ser humano.
+        <br><br>
+        <b>Guia visual do gráfico:</b>
+        <ul>
+            <li><span style='color:#C2410C; font-weight:bold;'>■ Barras Laranjas:</span> <strong>Cães Positivos: </strong> Número de animais que foram confirmados com a doença.</li>
+            <li><span style='color:#5D3A9B; font-weight:bold;'>■ Barras Roxas:</span> <strong>Eutanásias:</strong> Medida de saúde pública para controle de reservatório. <br><i>(<b>Nota:</b> Embora controversa, é a medida técnica oficial vigente para interrupção do ciclo de transmissão em massa).</i>
+        </ul>
+    </div>
+    """, unsafe_allow_html=True)
+
+    figuras.mostrar_grafico(conjunto, "Canina/barras", plotly_font)
+
+    st.markdown("---")
+
+    # --- PARTE 2: LINHA ---
+    st.markdown("""
+    <div class="info-box">
+        <span class="info-title">Monitoramento de Testes</span>
+        <ul>
+            <li><span style='color:#117733; font-weight:bold;'>● Linha Verde:</span> <strong>Total de Testes</strong> Mostra o volume de trabalho da vigilância epidemiológica na busca por animais infectados. Quanto maior o número de testes, maior a capacidade de identificar e controlar a doença.</li>
+        </ul>
+    </div>
+    """, unsafe_allow_html=True)
+
+    figuras.mostrar_grafico(conjunto, "Canina/sorologias", plotly_font)
+    
+    st.markdown("---")
+    
+    # --- PARTE 3: BORRIFAÇÃO ---
+    st.subheader("Controle Químico (Imóveis Borrifados)")
+    
+    st.markdown("""
+    <div class="info-box">
+        O gráfico abaixo mostra a evolução do <b>Controle Vetorial</b> (visitas para aplicação de inseticida).
+    </div>
+    """, unsafe_allow_html=True)
+
+    figuras.mostrar_grafico(conjunto, "Canina/borrifacao", plotly_font)
+
+    # Uma tabela com as séries dos três gráficos
+    if not conjunto.anual.empty:
+        botoes_exportacao(ctx, 'canina')
@@ -0,0 +1,184 @@
+"""Painel Geral: indicadores do ano (humanos, cães e controle) com os alertas EARS/CUSUM.
+
+Não monta gráficos: abrir esta página não carrega o plotly.
+"""
+import json
+
+import pandas as pd
+import streamlit as st
+import streamlit.components.v1 as components
+
+import rastreio
+from paginas import botoes_exportacao
+from apresentacao import (fmt_int, fmt_pct, alerta_kpi, kpis_por_ano, GRUPOS_KPI, CSS_CARTOES,
+                          INFO_HUMANOS, INFO_CANINOS, INFO_CONTROLE)
+
+
+# --- 1. INDICADORES DO ANO SELECIONADO ---
+def renderizar(ctx, ano_sel):
+    if st.session_state.get('ano_no_navegador'):
+        navegador(ctx, ano_sel)
+        return
+    df_anual = ctx.conjunto.anual
+
+    st.subheader(f"Visão Consolidada | {ano_sel}")
+
+    st.markdown("""
+    <div style="margin-bottom: 20px;">
+        Abaixo apresentamos um resumo rápido da situação da doença no ano selecionado, dividido por categorias:
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Leitura indexada da linha do ano na tabela de fatos
+    with rastreio.span("filtro"):
+        fato = df_anual.loc[ano_sel] if ano_sel in df_anual.index else None
+    
+    # --- BLOCO 1: SAÚDE HUMANA ---
+    st.markdown("##### 1. Indicadores Humanos")
+    st.markdown(INFO_HUMANOS, unsafe_allow_html=True)
+
+    col1, col2, col3 = st.columns(3)
+    if fato is not None:
+        col1.metric("Casos Humanos", fmt_int(fato['Casos']),
+                    delta=alerta_kpi(fato, 'Casos', fmt_int), delta_color="inverse")
+        col2.metric("Óbitos", fmt_int(fato['Obitos']))
+        
+        letalidade = fato['Letalidade']
+        limiar_let = fato['Limiar_Letalidade']
+        esperado = "" if pd.isna(limiar_let) else f"Esperado até {fmt_pct(limiar_let)}"
+        if fato['Alerta_Letalidade']:
+            cor_borda = "#C2410C" 
+            icone = "ALTA"
+            cor_texto = "#C2410C"
+        else:
+            cor_borda = "#1e293b"
+            icone = "Estável"
+            cor_texto = "#1e293b"
+
+        col3.markdown(f"""
+            <div style="background-color: #ffffff; padding: 15px; border-radius: 8px; border: 1px solid #e2e8f0; border-left: 6px solid {cor_borda};">
+                <p style="color: #64748b; font-size: 0.9rem; margin-bottom: 5px; font-family: 'Lora', serif;">Letalidade</p>
+                <div style="display: flex; align-items: center; gap: 10px;">
+                    <p style="color: {cor_texto}; font-size: 1.8rem; font-weight: 700; margin: 0; font-family: 'Lora', serif;">{fmt_pct(letalidade)}</p>
+                    <span style="font-size: 0.9rem; font-weight: bold; color: {cor_texto}; background: #fff3e0; padding: 2px 6px; border-radius: 4px;">{icone}</span>
+                </div>
+                <p style="color: #64748b; font-size: 0.8rem; margin: 5px 0 0 0;">{esperado}</p>
+            </div>
+        """, unsafe_allow_html=True)
+    else:
+        col1.metric("Casos Humanos", "0"); col2.metric("Óbitos", "0"); col3.metric("Letalidade", "0%")
+
+    st.markdown("---")
+
+    # --- BLOCO 2: RESERVATÓRIO CANINO ---
+    st.markdown("##### 2. Vigilância Canina")
+    st.markdown(INFO_CANINOS, unsafe_allow_html=True)
+
+    col4, col5, col6 = st.columns(3)
+    if fato is not None:
+        col4.metric("Cães Positivos", fmt_int(fato['Positivos']))
+        col5.metric("Eutanásias", fmt_int(fato['Eutanasiados']))
+        col6.metric("Taxa Positividade", fmt_pct(fato['Taxa_Positividade']),
+                    delta=alerta_kpi(fato, 'Taxa_Positividade', fmt_pct), delta_color="inverse")
+    else:
+        col4.metric("Cães Positivos", "0"); col5.metric("Eutanásias", "0"); col6.metric("Taxa Positividade", "0.0%")
+
+    st.markdown("---")
+
+    # --- BLOCO 3: AÇÕES DE CONTROLE ---
+    st.markdown("##### 3. Ações de Controle e Testes")
+    st.markdown(INFO_CONTROLE, unsafe_allow_html=True)
+
+    col7, col8 = st.columns(2)
+    if fato is not None:
+        col7.metric("Total Sorologias (Testes)", fmt_int(fato['Sorologias']))
+    else: col7.metric("Total Sorologias", "0")
+
+    if fato is not None:
+        col8.metric("Imóveis Borrifados", fmt_int(fato['Borrifados']))
+    else: col8.metric("Imóveis Borrifados", "0")
+
+    if fato is not None:
+        botoes_exportacao(ctx, 'geral', ano=ano_sel)
+
+
+# --- 2. TROCA DE ANO NO NAVEGADOR ---
+def navegador(ctx, ano_sel):
+    st.subheader("Visão Consolidada")
+    st.markdown("""
+    <div style="margin-bottom: 20px;">
+        Arraste o controle de ano abaixo: os indicadores de todos os anos já estão no navegador.
+    </div>
+    """, unsafe_allow_html=True)
+
+    with rastreio.span("filtro"):
+        valores = kpis_por_ano(ctx.conjunto.anual)
+    if not valores:
+        st.info("Sem dados para este município.")
+        return
+    anos = sorted(valores)
+    inicial = ano_sel if ano_sel in valores else anos[-1]
+    grupos = [[titulo, [[coluna, rotulo] for coluna, rotulo, _, _ in itens]] for titulo, _, itens in GRUPOS_KPI]
+    escala = int(ctx.css_root.rstrip('%')) / 100
+
+    components.html(f"""
+        <style>
+            @import url('https://fonts.googleapis.com/css2?family=Lora:wght@400;700&display=swap');
+            html {{ font-size: {ctx.css_root}; }}
+            body {{ margin: 0; font-family: 'Lora', serif; color: #1e293b; }}
+            .controle {{ display: flex; align-items: center; gap: 16px; margin: 4px 2px 8px; }}
+            .controle input {{ flex: 1; accent-color: #064E3B; }}
+            .ano {{ font-size: 1.6rem; font-weight: 700; color: #064E3B; min-width: 4ch; }}
+            {CSS_CARTOES}
+        </style>
+        <div class="controle">
+            <span class="ano" id="ano"></span>
+            <input type="range" id="seletor" min="0" max="{len(anos) - 1}" step="1"
+                   value="{anos.index(inicial)}" aria-label="Ano">
+        </div>
+        <div id="grupos"></div>
+        <script>
+            const ANOS = {json.dumps(anos)};
+            const VALORES = {json.dumps(valores, ensure_ascii=False)};
+            const GRUPOS = {json.dumps(grupos, ensure_ascii=False)};
+
+            // Monta os cartões uma vez; a troca de ano só atualiza os textos
+            const grupos = document.getElementById("grupos");
+            for (const [titulo, cartoes] of GRUPOS) {{
+                const h = document.createElement("h5");
+                h.textContent = titulo;
+                const linha = document.createElement("div");
+                linha.className = "linha";
+                for (const [coluna, rotulo] of cartoes) {{
+                    linha.insertAdjacentHTML("beforeend",
+                        `<div class="card" id="c-${{coluna}}"><p class="rotulo"></p><p class="valor"></p><p class="nota"></p></div>`);
+                    linha.lastChild.querySelector(".rotulo").textContent = rotulo;
+                }}
+                grupos.append(h, linha);
+            }}
+
+            function mostrar(i) {{
+                const ano = ANOS[i];
+                document.getElementById("ano").textContent = ano;
+                for (const [coluna, [valor, nota, alerta]] of Object.entries(VALORES[ano])) {{
+                    const card = document.getElementById("c-" + coluna);
+                    card.querySelector(".valor").textContent = valor;
+                    card.querySelector(".nota").textContent = nota;
+                    card.classList.toggle("alta", alerta);
+                }}
+            }}
+            const seletor = document.getElementById("seletor");
+            seletor.addEventListener("input", () => mostrar(+seletor.value));
+            mostrar(+seletor.value);
+        </script>
+        """,
+        height=int(470 * escala)
+    )
+
+    with st.expander("Como ler estes indicadores"):
+        for titulo, info, _ in GRUPOS_KPI:
+            st.markdown(f"##### {titulo}")
+            st.markdown(info, unsafe_allow_html=True)
+
+    # O navegador mostra todos os anos: a exportação também
+    botoes_exportacao(ctx, 'geral', ano=None)
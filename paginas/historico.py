@@ -0,0 +1,84 @@
+"""Histórico: casos humanos x cães positivos e correlação defasada entre as séries."""
+import streamlit as st
+
+import figuras
+import rastreio
+from paginas import botoes_exportacao, rerun_de_fragmento
+
+
+def renderizar(ctx, ano_sel):
+    df_corr = ctx.conjunto.correlacoes
+
+    st.subheader("Análise de Tendência: Humanos vs Caninos")
+
+    st.markdown("""
+    <div class="info-box">
+        <span class="info-title">Correlação Histórica</span>
+        Acompanhe a relação entre as populações ao longo das décadas.
+        <ul>
+            <li><span style='color:#C2410C; font-weight:bold;'>● Linha Laranja (Eixo Esquerdo):</span> <strong>Cães Positivos</strong>.</li>
+            <li><span style='color:#5D3A9B; font-weight:bold;'>● Linha Roxa (Eixo Direito):</span> <strong>Casos Humanos</strong>.</li>
+        </ul>
+        Este gráfico permite visualizar a conexão ao longo do tempo. Geralmente, um aumento no número de cães infectados
+        pode preceder ou acompanhar o aumento de casos em humanos. O controle da doença nos animais é essencial para proteger as pessoas.
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # A junção humanos x cães já vem pronta da tabela de fatos
+    with rastreio.span("filtro"):
+        df_merged = figuras.recorte_correlacao(ctx.conjunto)
+    
+    figuras.mostrar_grafico(ctx.conjunto, "Historico/correlacao", ctx.plotly_font, recorte=df_merged)
+    if not df_merged.empty:
+        botoes_exportacao(ctx, 'historico')
+
+    st.markdown("---")
+
+    st.subheader("Os cães antecipam os casos humanos?")
+
+    st.markdown("""
+    <div class="info-box">
+        <span class="info-title">Correlação com defasagem</span>
+        Cada quadro compara a <b>variação de um ano para o outro</b> de uma série dos cães com a de uma série humana,
+        deslocando uma delas de -3 a +3 anos.
+        <ul>
+            <li><span style='color:#B2182B; font-weight:bold;'>● Vermelho:</span> as duas sobem e descem juntas.</li>
+            <li><span style='color:#2166AC; font-weight:bold;'>● Azul:</span> quando uma sobe, a outra tende a cair.</li>
+        </ul>
+        Defasagem <b>positiva</b> significa que a série dos cães vem antes. O asterisco (*) marca valores cujo intervalo
+        de confiança de 95% não inclui o zero. Correlação não prova causa: ela só indica que as séries caminham juntas.
+    </div>
+    """, unsafe_allow_html=True)
+
+    if not df_corr.empty:
+        historico_defasagens(ctx)
+
+
+# Fragmento aninhado: trocar o escopo só redesenha o heatmap
+@st.fragment
+def historico_defasagens(ctx):
+    with rerun_de_fragmento():
+        historico_defasagens_conteudo(ctx)
+
+
+def historico_defasagens_conteudo(ctx):
+    df_corr = ctx.conjunto.correlacoes
+    # As correlações já vêm calculadas na carga (correlacao.py); aqui só se escolhe o recorte
+    escopos = df_corr['Escopo'].unique().tolist()
+    escopo = st.selectbox("Escopo:", options=escopos,
+                          help="Nas regionais, os dados dos cães são do município inteiro e os casos humanos são os da regional.")
+
+    figuras.mostrar_grafico(ctx.conjunto, "Historico/defasagens", ctx.plotly_font, extra=escopo)
+    botoes_exportacao(ctx, 'defasagens', escopo=escopo)
+
+    with rastreio.span("filtro"):
+        df_e = df_corr[(df_corr['Escopo'] == escopo) & (df_corr['Defasagem'] > 0) &
+                       ((df_corr['IC_inf'] > 0) | (df_corr['IC_sup'] < 0))]
+    if df_e.empty:
+        st.info("Nenhuma série dos cães antecipa as séries humanas com significância neste escopo.")
+    else:
+        forte = df_e.loc[df_e['r'].abs().idxmax()]
+        anos = f"{forte.Defasagem} ano{'s' if forte.Defasagem > 1 else ''}"
+        st.success(f"Sinal mais forte: **{figuras.NOMES_SERIES[forte.Canina]}** antecipa "
+                   f"**{figuras.NOMES_SERIES[forte.Humana].lower()}** em {anos} "
+                   f"(r = {forte.r:.2f}, IC 95% {forte.IC_inf:.2f} a {forte.IC_sup:.2f}, {forte.n} anos).")
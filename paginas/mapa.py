@@ -0,0 +1,105 @@
+"""Mapa: casos por regional no ano (ou em todos os anos, com troca no navegador) e histórico de cada regional."""
+import streamlit as st
+
+import figuras
+import rastreio
+from apresentacao import fmt_int
+from paginas import botoes_exportacao, rerun_de_fragmento
+
+
+# Fragmento aninhado: mexer na regional ou no período só redesenha este gráfico,
+# sem refazer o mapa acima
+@st.fragment
+def historico_regional(ctx):
+    with rerun_de_fragmento():
+        historico_regional_conteudo(ctx)
+
+
+def historico_regional_conteudo(ctx):
+    df_m, max_ano = ctx.conjunto.regionais, ctx.conjunto.max_ano
+    c_reg, c_slider = st.columns([1, 2])
+    lista_regionais = sorted(df_m.index.unique('Regional').tolist())
+    min_ano_regional = int(df_m.index.levels[0].min())
+    
+    with c_reg:
+        reg_sel = st.selectbox("Selecione a Regional:", options=lista_regionais)
+    
+    with c_slider:
+        intervalo_anos = st.slider(
+            "Filtrar Período (Anos):",
+            min_value=min_ano_regional,
+            max_value=max_ano,
+            value=(min_ano_regional, max_ano)
+        )
+    
+    with rastreio.span("filtro.regional"):
+        df_reg_hist = figuras.recorte_regional(ctx.conjunto, reg_sel, intervalo_anos)
+    
+    figuras.mostrar_grafico(ctx.conjunto, "Mapa/historico", ctx.plotly_font, extra=reg_sel,
+                            intervalo=intervalo_anos, recorte=df_reg_hist)
+    botoes_exportacao(ctx, 'regional', regional=reg_sel, intervalo=intervalo_anos)
+
+
+def renderizar(ctx, ano_sel):
+    df_m, plotly_font = ctx.conjunto.regionais, ctx.plotly_font
+    no_navegador = st.session_state.get('ano_no_navegador')
+    st.subheader("Distribuição Geográfica" if no_navegador else f"Distribuição Geográfica | {ano_sel}")
+
+    st.markdown("""
+    <div class="info-box">
+        <span class="info-title">Como ler este mapa?</span>
+        <ul>
+            <li style="margin-bottom: 8px;">
+                <span style='background-color: #FDE725; padding: 2px 6px; color: black; border-radius: 4px; font-weight: bold;'>Amarelo / Claro / Círculos menores:</span>
+                Regiões com <b>menos casos</b>.
+            </li>
+            <li>
+                <span style='background-color: #440154; padding: 2px 6px; color: white; border-radius: 4px; font-weight: bold;'>Roxo / Escuro / Círculos maiores:</span>
+                Regiões com <b>maior concentração de casos</b> (Alerta).
+            </li>
+            <li style="margin-top: 8px;">
+                <span style='background-color: #C2410C; padding: 2px 6px; color: white; border-radius: 4px; font-weight: bold;'>Halo laranja:</span>
+                Regional com casos <b>acima do esperado</b> para o ano, comparada com o próprio histórico.
+            </li>
+        </ul>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    if no_navegador:
+        # Todos os anos num só gráfico; o slider embaixo do mapa troca o ano sem rerun
+        if not df_m.empty:
+            figuras.mostrar_grafico(ctx.conjunto, "Mapa/regionais_anos", plotly_font, ano=ano_sel)
+            botoes_exportacao(ctx, 'mapa', ano=None)
+        else:
+            st.info("Sem dados regionais para este município.")
+    else:
+        with rastreio.span("filtro"):
+            df_f = figuras.recorte_mapa(ctx.conjunto, ano_sel)
+        if not df_f.empty:
+            figuras.mostrar_grafico(ctx.conjunto, "Mapa/regionais", plotly_font, ano=ano_sel, recorte=df_f)
+
+            em_alerta = df_f[df_f['Alerta']]
+            if not em_alerta.empty:
+                st.warning("Acima do esperado em " + str(ano_sel) + ": " + "; ".join(
+                    f"**{r.Regional}** ({fmt_int(r.Casos)} casos, esperado até {fmt_int(r.Limiar)})"
+                    for r in em_alerta.itertuples()))
+            botoes_exportacao(ctx, 'mapa', ano=ano_sel)
+        else:
+            st.info("Sem dados regionais para o ano selecionado.")
+
+    st.markdown("---")
+    
+    st.subheader("Histórico por Regional")
+
+    st.markdown("""
+    <div class="info-box">
+        <span class="info-title">História da Regional</span>
+        Este gráfico permite analisar o passado. Selecione uma regional na lista abaixo para ver se o número de casos aumentou ou diminuiu naquela área específica ao longo dos anos.
+        <ul>
+            <li><span style='color:#117733; font-weight:bold;'>● Linha Verde:</span> Mostra a variação dos casos confirmados.</li>
+        </ul>
+    </div>
+    """, unsafe_allow_html=True)
+
+    if not df_m.empty:
+        historico_regional(ctx)
@@ -0,0 +1,124 @@
+"""Instrumentação do VigiLeish: spans de tempo por rerun e log de rastreio em JSON lines.
+
+Cada execução do script (ou de um fragmento sozinho) abre um rerun na thread da sessão;
+os spans medidos dentro dele são marcados com sessão, segmento e ano, gravados
+no arquivo de rastreio ao final e devolvidos para o painel de diagnóstico.
+Fora de um rerun (scripts em benchmarks/, ingestao.py) os spans não custam nada.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Caminho vazio desliga o arquivo; o painel da sidebar continua funcionando
+ARQ_RASTREIO = os.environ.get('VIGILEISH_RASTREIO', os.path.join(BASE_DIR, 'logs', 'rastreio.jsonl'))
+MAX_MB = float(os.environ.get('VIGILEISH_RASTREIO_MB', '10'))
+BACKUPS = 5
+
+# Identifica a versão em produção, para comparar reruns entre deploys
+DEPLOY = os.environ.get('VIGILEISH_DEPLOY', 'local')
+
+_local = threading.local()
+_logger = logging.getLogger('vigileish.rastreio')
+_logger.propagate = False
+
+
+# --- 1. ARQUIVO DE RASTREIO ---
+def _configurar_arquivo():
+    if not ARQ_RASTREIO or _logger.handlers:
+        return
+    try:
+        os.makedirs(os.path.dirname(ARQ_RASTREIO) or '.', exist_ok=True)
+        handler = RotatingFileHandler(ARQ_RASTREIO, maxBytes=int(MAX_MB * 1024 * 1024),
+                                      backupCount=BACKUPS, encoding='utf-8')
+    except OSError as e:
+        logging.warning(f"Rastreio desativado, não foi possível abrir {ARQ_RASTREIO}: {e}")
+        _logger.addHandler(logging.NullHandler())
+        return
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    _logger.addHandler(handler)
+    _logger.setLevel(logging.INFO)
+
+
+_configurar_arquivo()
+
+
+# --- 2. RERUNS E SPANS ---
+def iniciar_rerun(tipo, **tags):
+    """Abre um rerun na thread atual, descartando um anterior que tenha sido interrompido."""
+    _local.rerun = {'tipo': tipo, 'tags': dict(tags), 'spans': [], 'pilha': [], 'inicio': time.perf_counter()}
+
+
+def marcar(**tags):
+    """Atualiza as marcas (sessão, segmento, ano...) do rerun atual."""
+    rerun = getattr(_local, 'rerun', None)
+    if rerun is not None:
+        rerun['tags'].update(tags)
+
+
+def anotar(**extras):
+    """Acrescenta campos ao span aberto mais interno (ex.: acerto de cache)."""
+    rerun = getattr(_local, 'rerun', None)
+    if rerun is not None and rerun['pilha']:
+        rerun['pilha'][-1].update(extras)
+
+
+@contextmanager
+def span(nome, **extras):
+    rerun = getattr(_local, 'rerun', None)
+    if rerun is None:
+        yield
+        return
+    registro = {'span': nome, 'nivel': len(rerun['pilha']), **extras}
+    rerun['spans'].append(registro)
+    rerun['pilha'].append(registro)
+    inicio = time.perf_counter()
+    try:
+        yield
+    except BaseException as e:
+        registro['erro'] = type(e).__name__
+        raise
+    finally:
+        registro['ms'] = round((time.perf_counter() - inicio) * 1e3, 3)
+        rerun['pilha'].pop()
+
+
+@contextmanager
+def fragmento(ao_finalizar=None, **tags):
+    """Rerun de um fragmento executado sem o resto do script; fragmentos aninhados entram no mesmo rerun."""
+    externo = getattr(_local, 'fragmentos', 0) == 0
+    if externo:
+        iniciar_rerun('fragmento', **tags)
+    _local.fragmentos = getattr(_local, 'fragmentos', 0) + 1
+    try:
+        yield
+    finally:
+        _local.fragmentos -= 1
+        if externo:
+            spans = finalizar_rerun()
+            if ao_finalizar is not None:
+                ao_finalizar(spans)
+
+
+def finalizar_rerun():
+    """Fecha o rerun atual, grava seus spans no arquivo e os devolve (o primeiro é o rerun inteiro, com as marcas)."""
+    rerun = getattr(_local, 'rerun', None)
+    if rerun is None:
+        return []
+    _local.rerun = None
+
+    total = {'span': 'rerun', 'nivel': 0, 'tipo': rerun['tipo'], **rerun['tags'],
+             'ms': round((time.perf_counter() - rerun['inicio']) * 1e3, 3)}
+    spans = [total] + [{**s, 'nivel': s['nivel'] + 1} for s in rerun['spans']]
+    if _logger.isEnabledFor(logging.INFO):
+        base = {'ts': datetime.now(timezone.utc).isoformat(timespec='milliseconds'), 'deploy': DEPLOY,
+                **rerun['tags']}
+        for s in spans:
+            _logger.info(json.dumps({**base, **s}, ensure_ascii=False, default=str))
+    return spans
@@ -0,0 +1,101 @@
+"""Redução de pontos das séries dos gráficos de linha (LTTB), preservando a forma da curva.
+
+As séries anuais (cerca de 30 pontos) passam direto. Séries mais finas
+(mês, semana epidemiológica, dia) com mais de MAX_PONTOS pontos por traço são
+reduzidas pelo Largest-Triangle-Three-Buckets: o primeiro e o último ponto
+ficam e, em cada balde do meio, fica o ponto que forma o maior triângulo com
+o escolhido no balde anterior e a média do balde seguinte. Picos e vales
+sobrevivem, ao contrário de uma média ou de pegar um ponto a cada k.
+
+A redução acontece dentro dos construtores de figuras.py, então o resultado
+fica no cache de figuras junto com a chave do gráfico (que já inclui o
+período filtrado): cada recorte é reduzido uma vez.
+
+Alcance: a redução é fixa por traço (MAX_PONTOS para o período filtrado nos
+widgets). Não há escolha de resolução (ano, mês, semana epidemiológica), porque
+todas as fontes deste repositório são anuais. Também não há nova redução ao dar
+zoom: o st.plotly_chart só devolve seleções ao Python, não o intervalo visível
+(relayout), então não há faixa de zoom para reduzir nem para pôr na chave.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+# --- 1. PARÂMETROS ---
+# Pontos por traço; acima disso a série é reduzida. 0 desliga a redução.
+MAX_PONTOS = int(os.environ.get('VIGILEISH_MAX_PONTOS', '1000'))
+
+
+# --- 2. LTTB ---
+def _numerico(valores):
+    # Datas viram nanossegundos; anos e frações de ano já são números
+    valores = pd.Series(valores) if not isinstance(valores, pd.Series) else valores
+    if pd.api.types.is_datetime64_any_dtype(valores):
+        return valores.astype('int64').to_numpy(dtype='float64')
+    return valores.astype('float64').to_numpy(na_value=np.nan)
+
+
+def lttb(x, y, n):
+    """Posições dos n pontos escolhidos pelo LTTB, em ordem; x crescente."""
+    tamanho = len(x)
+    if n >= tamanho or n < 3:
+        return np.arange(tamanho)
+    x, y = _numerico(x), _numerico(y)
+    ausentes = np.isnan(y)
+    if ausentes.all():
+        return np.linspace(0, tamanho - 1, n).astype(np.int64)
+    if ausentes.any():
+        # Só para escolher os pontos: a série desenhada continua com as lacunas
+        y = np.interp(x, x[~ausentes], y[~ausentes])
+
+    # n - 2 baldes cobrindo os pontos entre o primeiro e o último
+    limites = np.linspace(1, tamanho - 1, n - 1).astype(np.int64)
+    contagens = np.diff(limites)
+    medias_x = np.add.reduceat(x[:tamanho - 1], limites[:-1]) / contagens
+    medias_y = np.add.reduceat(y[:tamanho - 1], limites[:-1]) / contagens
+    # O "balde seguinte" do último balde é o último ponto
+    proximo_x = np.append(medias_x[1:], x[-1])
+    proximo_y = np.append(medias_y[1:], y[-1])
+
+    # Baldes lado a lado numa matriz (balde, ponto, [x, y, 1]); os mais curtos
+    # repetem o último ponto, que nunca ganha de si mesmo no argmax
+    posicoes = np.minimum(limites[:-1, None] + np.arange(contagens.max())[None, :], limites[1:, None] - 1)
+    pontos = np.stack([x[posicoes], y[posicoes], np.ones(posicoes.shape)], axis=-1)
+
+    # A área do triângulo (a, ponto, média do próximo balde) é linear no ponto:
+    # |cx * x + cy * y + c0|, então cada balde custa um produto matriz-vetor
+    escolhidos = np.empty(n, dtype=np.int64)
+    escolhidos[0], escolhidos[-1] = 0, tamanho - 1
+    a = 0
+    for k in range(n - 2):
+        xa, ya = x[a], y[a]
+        cx, cy = proximo_y[k] - ya, xa - proximo_x[k]
+        area = np.abs(pontos[k] @ (cx, cy, -cx * xa - cy * ya))
+        a = posicoes[k, area.argmax()]
+        escolhidos[k + 1] = a
+    return escolhidos
+
+
+# --- 3. SÉRIES E TABELAS ---
+def serie(x, y, max_pontos=None):
+    """(x, y) de um traço com no máximo max_pontos pontos."""
+    max_pontos = MAX_PONTOS if max_pontos is None else max_pontos
+    if not max_pontos or len(x) <= max_pontos:
+        return x, y
+    posicoes = lttb(x, y, max_pontos)
+    return _selecionar(x, posicoes), _selecionar(y, posicoes)
+
+
+def tabela(df, x, y, max_pontos=None):
+    """Linhas de df escolhidas pelo LTTB sobre as colunas x e y (para plotly.express)."""
+    max_pontos = MAX_PONTOS if max_pontos is None else max_pontos
+    if not max_pontos or len(df) <= max_pontos:
+        return df
+    return df.iloc[lttb(df[x], df[y], max_pontos)]
+
+
+def _selecionar(valores, posicoes):
+    if isinstance(valores, (pd.Series, pd.Index)):
+        return valores[posicoes] if isinstance(valores, pd.Index) else valores.iloc[posicoes]
+    return np.asarray(valores)[posicoes]
@@ -0,0 +1,45 @@
+"""Sobe o painel com o aquecimento já em andamento (equivale a `streamlit run app.py`).
+
+Na thread principal são importados só o pandas, a camada de dados e
+plotly.graph_objects (via figuras.py). O aquecimento (aquecimento.py) carrega
+os dados e monta os gráficos padrão numa thread de fundo enquanto o servidor
+sobe; plotly.express e plotly.subplots são importados nessa thread, no
+primeiro gráfico que os usa. Com VIGILEISH_AQUECER vazio, eles só carregam
+quando uma sessão abre a primeira página com esses gráficos (ver paginas/).
+
+O app.py roda no mesmo processo e encontra o mesmo armazém e o mesmo cache de
+figuras: o primeiro visitante tem o tempo de um rerun já aquecido.
+
+Uso:
+    python servidor.py
+    python servidor.py --server.port 8080 --server.headless true
+    VIGILEISH_AQUECER=todos python servidor.py
+"""
+import logging
+import os
+import sys
+
+from streamlit.web import cli
+
+import aquecimento
+import dados
+
+APP = os.path.join(dados.BASE_DIR, 'app.py')
+
+
+def main():
+    # Progresso do aquecimento no log do servidor
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+    logger = logging.getLogger('vigileish.aquecimento')
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    aquecimento.iniciar(dados.armazem_do_processo())
+    # As opções da linha de comando vão direto para o `streamlit run`
+    cli.main(['run', APP, *sys.argv[1:]], prog_name='streamlit')
+
+
+if __name__ == '__main__':
+    main()
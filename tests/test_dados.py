@@ -0,0 +1,76 @@
+"""Parser de seções dos boletins e armazém de municípios (dados.py)."""
+import threading
+import time
+
+import pytest
+
+import dados
+
+CABECALHO = "ANO;SOROLOGIAS REALIZADAS;CÃES SOROPOSITIVOS;CÃES EUTANASIADOS"
+
+
+def _caninos(tmp_path, linhas):
+    caminho = tmp_path / dados.ARQ_CANINOS
+    caminho.write_bytes("\r\n".join(linhas).encode('iso-8859-1'))
+    return dados.ler_caninos(str(caminho))['caninos']
+
+
+def test_nota_e_linha_sem_rotulo_no_meio_da_secao(tmp_path):
+    df = _caninos(tmp_path, [
+        CABECALHO,
+        "2023;43.571;5.440;3.388",
+        "* Dados sujeitos a revisão;;;",
+        ";1.000;20;",
+        "2024;49.927;4.459;2.725",
+        "2025;50.723;4.090;2.445",
+    ])
+    assert df['Ano'].tolist() == [2023, 2024, 2025]
+    assert df['Sorologias'].tolist() == [43571, 49927, 50723]
+    assert str(df['Positivos'].dtype) == 'Int32'
+
+
+def test_secao_sem_rodape_da_pbh(tmp_path):
+    # Termina na linha vazia; o que vem depois é outra seção
+    df = _caninos(tmp_path, [
+        CABECALHO,
+        "2024;49.927;4.459;2.725",
+        "Nota: valores preliminares;;;",
+        ";;;",
+        "Regional;2024",
+        "Barreiro;12",
+    ])
+    assert df['Ano'].tolist() == [2024]
+    assert df['Eutanasiados'].tolist() == [2725]
+
+
+def test_secao_so_com_notas(tmp_path):
+    df = _caninos(tmp_path, [CABECALHO, "* Sem dados no período;;;"])
+    assert df.empty
+    assert df['Ano'].dtype == 'int16'
+
+
+def test_carga_com_erro_solta_o_lock_do_municipio():
+    armazem = dados.Armazem()
+    with pytest.raises(FileNotFoundError):
+        armazem.obter('0000000')
+    assert armazem._carregando == {}
+
+
+def test_sessao_que_espera_a_carga_solta_o_lock_do_municipio(monkeypatch):
+    carregar = dados.carregar_fontes
+
+    def devagar(pasta):
+        time.sleep(0.2)
+        return carregar(pasta)
+    monkeypatch.setattr(dados, 'carregar_fontes', devagar)
+
+    armazem = dados.Armazem()
+    # A segunda sessão chega durante a carga e sai pelo município já carregado
+    sessoes = [threading.Thread(target=armazem.obter, args=(dados.MUNICIPIO_PADRAO,)) for _ in range(2)]
+    sessoes[0].start()
+    time.sleep(0.05)
+    sessoes[1].start()
+    for sessao in sessoes:
+        sessao.join()
+    assert dados.MUNICIPIO_PADRAO in armazem.carregados()
+    assert armazem._carregando == {}
@@ -0,0 +1,33 @@
+"""Cache em disco das exportações (exportacao.py)."""
+import pytest
+
+import dados
+import exportacao
+
+
+@pytest.fixture
+def armazem(tmp_path, monkeypatch):
+    monkeypatch.setattr(exportacao, 'DIR_EXPORTACOES', str(tmp_path))
+    return dados.armazem_do_processo()
+
+
+def test_acerto_nao_deixa_lock_para_tras(armazem):
+    codigos = [dados.MUNICIPIO_PADRAO]
+    primeiro = exportacao.exportar(armazem, codigos, 'canina', 'csv')
+    segundo = exportacao.exportar(armazem, codigos, 'canina', 'csv')
+    assert primeiro == segundo
+    assert exportacao._gerando == {}
+
+
+def test_falha_na_gravacao_nao_deixa_lock_para_tras(armazem, monkeypatch):
+    def falhar(*args):
+        raise RuntimeError("disco cheio")
+    monkeypatch.setitem(exportacao.GRAVADORES, 'csv', falhar)
+    with pytest.raises(RuntimeError):
+        exportacao.exportar(armazem, [dados.MUNICIPIO_PADRAO], 'historico', 'csv')
+    assert exportacao._gerando == {}
+
+
+def test_conteudo_entrega_o_arquivo(armazem):
+    with exportacao.conteudo(armazem, [dados.MUNICIPIO_PADRAO], 'canina', 'csv') as arquivo:
+        assert arquivo.read().decode('utf-8-sig').startswith('Ano;')
@@ -0,0 +1,38 @@
+"""Envio direto dos gráficos (figuras.exibir) pelas APIs internas do Streamlit.
+
+Se uma versão nova do Streamlit mudar essas APIs, o painel continua de pé
+(mostrar cai para st.plotly_chart), mas estes testes falham: é o aviso para
+rever exibir antes de subir o limite de versão em requirements.txt.
+"""
+from streamlit.testing.v1 import AppTest
+
+import figuras
+
+
+def _app():
+    import plotly.graph_objects as go
+
+    import figuras
+
+    def construtor():
+        return go.Figure(go.Scatter(x=list(range(50)), y=[v * 1.5 for v in range(50)]))
+
+    figuras.mostrar(("teste", "Teste/linha", None, 14, None, None), construtor)
+
+
+def test_apis_internas_importaveis():
+    assert figuras.ENVIO_DIRETO
+
+
+def test_envio_direto_manda_o_json_compacto():
+    figuras.CACHE.limpar()
+    at = AppTest.from_function(_app).run()
+    assert not at.exception
+    # Um erro no caminho interno desligaria o envio direto e cairia no público
+    assert figuras.ENVIO_DIRETO
+    graficos = at.get("plotly_chart")
+    assert len(graficos) == 1
+    spec, altura, direto = figuras.CACHE.obter(("teste", "Teste/linha", None, 14, None, None), None)
+    assert direto
+    assert graficos[0].proto.spec == spec
+    assert '"bdata"' in spec